@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Crabada daemon that watches the game contract and, as soon as
+it is possible, reinforces, closes and settles the games of the
+given user; it replaces the closeMines, closeLoots, reinforceDefense
+and reinforceAttack cron jobs.
+
+Usage:
+    python3 -m bin.daemon <userAddress>
+
+Author:
+    @coccoinomane (Twitter)
+"""
+
+from src.bot.daemon import runDaemon
+from src.common.config import daemonPollIntervalInSeconds
+from src.helpers.general import secondOrNone
+from src.models.User import User
+from src.common.logger import logger
+from sys import argv
+
+userAddress = secondOrNone(argv)
+
+if not userAddress:
+    logger.error("Specify a user address")
+    exit(1)
+
+runDaemon(User(userAddress), daemonPollIntervalInSeconds)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Index the events of the game contract in a local SQLite database
+(storage/db/events.sqlite), backfilling the past ones first and then
+following the chain.
+
+The first run needs the block to start from; later runs resume from
+where the previous one stopped.
+
+Usage:
+    python3 -m bin.indexer [--from-block <blockNumber>] [--once] [--concurrency <n>]
+
+Author:
+    @coccoinomane (Twitter)
+"""
+
+from argparse import ArgumentParser
+from src.bot.indexer import runIndexer
+from src.common.config import daemonPollIntervalInSeconds, indexerConcurrency
+
+parser = ArgumentParser(description="Index the events of the game contract")
+parser.add_argument(
+    "--from-block", type=int, help="block to start from, if nothing is indexed yet"
+)
+parser.add_argument("--once", action="store_true", help="stop at the head of the chain")
+parser.add_argument(
+    "--concurrency",
+    type=int,
+    default=indexerConcurrency,
+    help="how many chunks of blocks to fetch at the same time",
+)
+args = parser.parse_args()
+
+runIndexer(
+    args.from_block, not args.once, daemonPollIntervalInSeconds, args.concurrency
+)
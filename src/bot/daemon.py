@@ -0,0 +1,315 @@
+"""
+Event-driven bot that acts on the games of a user as soon as they
+become actionable, rather than polling them from cron
+"""
+
+from functools import partial
+from threading import Lock, RLock
+from time import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, cast
+from hexbytes import HexBytes
+from web3._utils.events import event_abi_to_log_topic
+from web3.contract import ContractEvent
+from web3.types import EventData, FilterParams, LogReceipt
+from src.bot.looting.closeLoots import closeLoots
+from src.bot.looting.reinforceAttack import reinforceAttack
+from src.bot.mining.closeMines import closeMines
+from src.bot.mining.reinforceDefense import reinforceDefense
+from src.common.clients import makeCrabadaWeb3Client
+from src.common.config import nodeWsUri
+from src.common.logger import logger
+from src.helpers.mines import (
+    fetchOpenLootsOnChain,
+    fetchOpenMinesOnChain,
+    getCloseTime,
+    getReinforceWindowEndTime,
+    getSettleTime,
+)
+from src.libs.CrabadaWeb2Client.types import Game, TeamStatus
+from src.libs.CrabadaWeb3Client.CrabadaWeb3Client import CrabadaWeb3Client
+from src.libs.Scheduler.DeadlineScheduler import DeadlineScheduler
+from src.libs.Web3Watcher.Dispatcher import Dispatcher
+from src.libs.Web3Watcher.SubscriptionWatcher import SubscriptionWatcher
+from src.libs.Web3Watcher.Watcher import Watcher
+from src.models.User import User
+
+watchedEvents: List[str] = ["StartGame", "Fight", "Lend", "CloseGame", "SettleGame"]
+"""
+Events of the IdleGame contract that can make a game actionable
+"""
+
+retryDelayInSeconds: float = 60
+"""
+If a game is still open after its close or settle job ran (e.g. the
+tx reverted because the block was a tad early), try again after this
+many seconds
+"""
+
+openGames: dict[int, TeamStatus] = {}
+"""
+Open games of the user, by game ID, with the role of the user in
+the game (MINING or LOOTING)
+"""
+
+scheduler = DeadlineScheduler(logger=logger)
+"""
+Jobs to run when the games of the user become actionable, keyed
+by (game ID, action)
+"""
+
+lastAttempts: dict[Tuple[int, str], float] = {}
+"""
+When each close or settle job was last run, by job key
+"""
+
+gamesLock = RLock()
+"""
+Guards the open games, the scheduled jobs and the last attempts, so
+that refreshes triggered by events and by the scheduler do not
+interleave
+"""
+
+reinforceLock = Lock()
+"""
+The reinforce bots run one at a time, because they reserve crabs
+from the same inventory
+"""
+
+botLocks: dict[str, Lock] = {
+    closeMines.__name__: Lock(),
+    closeLoots.__name__: Lock(),
+    reinforceDefense.__name__: reinforceLock,
+    reinforceAttack.__name__: reinforceLock,
+}
+"""
+Lock of each bot, so that a bot never runs twice at the same time,
+while bots that do not share state (e.g. closing mines and reinforcing
+a loot) can run side by side
+"""
+
+decodedEvents: dict[Tuple[HexBytes, int], EventData] = {}
+"""
+Events decoded by getGameId(), by transaction hash and log index,
+waiting for handleLogEntry() to pick them up, so that each log entry
+is decoded only once
+"""
+
+
+def runDaemon(user: User, pollInterval: float = 2) -> None:
+    """
+    Watch the IdleGame contract for events involving the teams of the
+    given user, and reinforce, close and settle their games the moment
+    it becomes possible; never returns.
+    """
+    client = makeCrabadaWeb3Client()
+
+    # Catch up with what happened while we were not watching
+    for bot in [closeMines, closeLoots, reinforceDefense, reinforceAttack]:
+        runBot(bot, user)
+    refreshGames(user)
+    scheduler.start()
+
+    # Handle the events of different games on a pool of threads, so
+    # that a slow bot only delays the events waiting for the same game
+    # or for the same bot
+    eventsByTopic = getEventsByTopic(client)
+    dispatcher = Dispatcher(keyOf=partial(getGameId, eventsByTopic), logger=logger)
+    watcher = makeWatcher(client).setLogger(logger).setDispatcher(dispatcher)
+    watcher.addHandler(partial(handleLogEntry, user, eventsByTopic))
+    logger.info(f"Daemon started for user {str(user.address)}")
+    watcher.run(pollInterval)
+
+
+def handleLogEntry(
+    user: User,
+    eventsByTopic: dict[HexBytes, Type[ContractEvent]],
+    logEntry: LogReceipt,
+) -> None:
+    """
+    Decode an event of the IdleGame contract and, if it concerns the
+    user, run the bots that might have something to do
+    """
+    decodedEvent = decodedEvents.pop(getLogKey(logEntry), None) or decodeLogEntry(
+        eventsByTopic, logEntry
+    )
+    if not decodedEvent:
+        return
+    args = decodedEvent["args"]
+    teamIds = {t["id"] for t in user.getTeams()}
+    eventName = decodedEvent["event"]
+
+    if eventName == "StartGame" and args["teamId"] in teamIds:
+        logger.info(f"Mine {args['gameId']} started")
+        refreshGames(user)
+
+    elif eventName == "Fight" and args["defenseTeamId"] in teamIds:
+        logger.info(f"Fight in mine {args['gameId']}")
+        refreshGames(user)
+        runBot(reinforceDefense, user)
+
+    elif eventName == "Fight" and args["attackTeamId"] in teamIds:
+        logger.info(f"Fight in loot {args['gameId']}")
+        refreshGames(user)
+        runBot(reinforceAttack, user)
+
+    elif eventName == "Lend" and args["gameId"] in openGames:
+        logger.info(f"Crab {args['crabadaId']} lent in game {args['gameId']}")
+        refreshGames(user)
+        if openGames.get(args["gameId"]) == "MINING":
+            runBot(reinforceDefense, user)
+        elif openGames.get(args["gameId"]) == "LOOTING":
+            runBot(reinforceAttack, user)
+
+    elif eventName in ["CloseGame", "SettleGame"] and args["gameId"] in openGames:
+        logger.info(f"Game {args['gameId']} received {eventName}")
+        refreshGames(user)
+
+
+def getGameId(
+    eventsByTopic: dict[HexBytes, Type[ContractEvent]], logEntry: LogReceipt
+) -> Optional[int]:
+    """
+    Return the ID of the game an event refers to, if any, so that the
+    events of the same game are handled in order; the decoded event is
+    kept for handleLogEntry()
+    """
+    decodedEvent = decodeLogEntry(eventsByTopic, logEntry)
+    if not decodedEvent:
+        return None
+    decodedEvents[getLogKey(logEntry)] = decodedEvent
+    return cast(Optional[int], decodedEvent["args"].get("gameId"))
+
+
+def decodeLogEntry(
+    eventsByTopic: dict[HexBytes, Type[ContractEvent]], logEntry: LogReceipt
+) -> Optional[EventData]:
+    """
+    Decode a log entry of the IdleGame contract, or return None if it
+    is not one of the watched events
+    """
+    event = eventsByTopic.get(HexBytes(logEntry["topics"][0]))
+    if not event:
+        return None
+    return event().processLog(logEntry)
+
+
+def getLogKey(logEntry: LogReceipt) -> Tuple[HexBytes, int]:
+    """
+    Return a key that identifies a log entry
+    """
+    return (HexBytes(logEntry["transactionHash"]), logEntry["logIndex"])
+
+
+def runJob(user: User, bot: Callable[[User], Any], key: Tuple[int, str]) -> None:
+    """
+    Job run by the scheduler: run the given bot, if any, then read the
+    games again, which reschedules the jobs; if the games cannot be
+    read (e.g. the node is down), try the job again later
+    """
+    if bot:
+        with gamesLock:
+            lastAttempts[key] = time()
+        runBot(bot, user)
+    try:
+        refreshGames(user)
+    except Exception as e:
+        logger.error(f"Error refreshing the games of user {str(user.address)}: {e}")
+        scheduler.schedule(
+            key, time() + retryDelayInSeconds, partial(runJob, user, bot, key)
+        )
+
+
+def refreshGames(user: User) -> None:
+    """
+    Read the open games of the user from the chain, and update the
+    scheduled jobs accordingly
+    """
+    with gamesLock:
+        games = [(g, "MINING") for g in fetchOpenMinesOnChain(user)] + [
+            (g, "LOOTING") for g in fetchOpenLootsOnChain(user)
+        ]
+        gameIds = {g["game_id"] for (g, _) in games}
+        for gameId in set(openGames) - gameIds:
+            for action in ["close", "settle", "reinforceWindow"]:
+                scheduler.cancel((gameId, action))
+                lastAttempts.pop((gameId, action), None)
+        openGames.clear()
+        for (g, role) in games:
+            openGames[g["game_id"]] = role  # type: ignore
+            scheduleGame(user, g, role)  # type: ignore
+
+
+def scheduleGame(user: User, game: Game, role: TeamStatus) -> None:
+    """
+    Schedule the jobs of the given open game: close it (if mining) or
+    settle it (if looting) as soon as possible, and read it again when
+    its reinforce window closes
+    """
+    gameId = game["game_id"]
+    jobs: List[Tuple[str, Optional[float], Callable[[User], Any]]] = [
+        ("reinforceWindow", getReinforceWindowEndTime(game), None),
+        ("close", getCloseTime(game) if role == "MINING" else None, closeMines),
+        ("settle", getSettleTime(game) if role == "LOOTING" else None, closeLoots),
+    ]
+    for (action, at, bot) in jobs:
+        key = (gameId, action)
+        if at is None:
+            scheduler.cancel(key)
+            continue
+        if key in lastAttempts:
+            at = max(at, lastAttempts[key] + retryDelayInSeconds)
+        if scheduler.getDeadline(key) != at:
+            scheduler.schedule(key, at, partial(runJob, user, bot, key))
+
+
+def runBot(bot: Callable[[User], Any], user: User) -> Any:
+    """
+    Run one of the bots, logging rather than raising its errors,
+    so that the daemon stays up
+    """
+    try:
+        with botLocks[bot.__name__]:
+            return bot(user)
+    except Exception as e:
+        logger.error(f"Error running {bot.__name__} for user {str(user.address)}: {e}")
+        return None
+
+
+def makeWatcher(client: CrabadaWeb3Client) -> Watcher:
+    """
+    Return a watcher of the events of the IdleGame contract: if a
+    websocket node is configured, the watcher subscribes to the events,
+    otherwise it polls a filter
+    """
+    if nodeWsUri:
+        return SubscriptionWatcher(client, nodeWsUri).setFilterParams(
+            makeEventFilterParams(client)
+        )
+    return Watcher(client).setFilter(
+        client.w3.eth.filter(makeEventFilterParams(client))
+    )
+
+
+def makeEventFilterParams(client: CrabadaWeb3Client) -> FilterParams:
+    """
+    Return the params of a filter matching any of the watched events
+    of the IdleGame contract; the event arguments are not indexed, so
+    the filter cannot be narrowed down to the teams of the user
+    """
+    return {
+        "address": client.contractAddress,
+        "topics": [[t.hex() for t in getEventsByTopic(client)]],  # type: ignore
+    }
+
+
+def getEventsByTopic(
+    client: CrabadaWeb3Client,
+) -> dict[HexBytes, Type[ContractEvent]]:
+    """
+    Map the topic of each watched event to the event class
+    """
+    events = [client.contract.events[name] for name in watchedEvents]
+    return {
+        HexBytes(event_abi_to_log_topic(cast(Dict[str, Any], e._get_event_abi()))): e
+        for e in events
+    }
@@ -0,0 +1,59 @@
+"""
+Index the events of the IdleGame contract in a local database, so
+that the history of the games can be queried without the API
+"""
+
+from src.common.clients import makeCrabadaWeb3Client
+from src.common.config import indexerConcurrency
+from src.common.logger import logger
+from src.libs.EventScanner.EventScanner import EventScanner
+from src.libs.EventScanner.SqliteEventScannerState import SqliteEventScannerState
+
+eventsDbPath: str = "storage/db/events.sqlite"
+"""
+Where the indexed events are stored
+"""
+
+indexedArgs = ["gameId", "teamId", "attackTeamId", "defenseTeamId", "crabadaId"]
+"""
+Event arguments to index, so that the events of a game, a team or a
+crab can be queried quickly
+"""
+
+
+def makeIndexer(concurrency: int = indexerConcurrency) -> EventScanner:
+    """
+    Return a scanner of all the events of the IdleGame contract,
+    storing them in the local events database; it fetches up to the
+    given number of chunks of blocks at the same time
+    """
+    state = SqliteEventScannerState(eventsDbPath, indexedArgs)
+    return EventScanner(
+        makeCrabadaWeb3Client(), state, maxConcurrency=concurrency, logger=logger
+    )
+
+
+def runIndexer(
+    fromBlock: int = None,
+    follow: bool = True,
+    pollInterval: float = 2,
+    concurrency: int = indexerConcurrency,
+) -> None:
+    """
+    Backfill the events from where the previous run stopped, or from
+    the given block on the first run, then, if follow is True, keep
+    indexing new blocks as they come
+    """
+    indexer = makeIndexer(concurrency)
+    lastScannedBlock = indexer.state.getLastScannedBlock()
+    if lastScannedBlock is not None:
+        logger.info(f"Resuming indexer from block {lastScannedBlock + 1}")
+    indexer.run(fromBlock, follow, pollInterval, logProgress)
+
+
+def logProgress(startBlock: int, endBlock: int, currentBlock: int) -> None:
+    """
+    Log how far the indexer got in the range it is scanning
+    """
+    done = (currentBlock - startBlock + 1) / (endBlock - startBlock + 1)
+    logger.info(f"Indexed up to block {currentBlock} of {endBlock} ({done:.1%})")
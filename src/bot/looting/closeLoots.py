@@ -2,19 +2,24 @@
 Settle all loots of a given user
 """
 
+from functools import partial
+from web3.types import TxReceipt
 from src.common.logger import logger
 from src.common.txLogger import txLogger, logTx
-from src.helpers.instantMessage import sendIM
+from src.helpers.instantMessage import sendIM, withDigestIM
 from src.common.clients import makeCrabadaWeb3Client
 from src.helpers.mines import (
-    fetchOpenLoots,
+    fetchOpenLootsOnChain,
     mineCanBeSettled,
 )
+from src.helpers.store import invalidateUser
 from src.models.User import User
 from web3.exceptions import ContractLogicError
 from src.helpers.donate import maybeDonate
+from src.libs.Web3Client.TxPipeline import TxPipeline
 
 
+@withDigestIM("Close loots")
 def closeLoots(user: User) -> int:
     """
     Settle all open loot games that can be settled; return
@@ -23,15 +28,14 @@ def closeLoots(user: User) -> int:
     client = makeCrabadaWeb3Client(
         upperLimitForBaseFeeInGwei=user.config["closeLootMaxGasInGwei"]
     )
-    settleableMines = [g for g in fetchOpenLoots(user) if mineCanBeSettled(g)]
+    settleableMines = [g for g in fetchOpenLootsOnChain(user) if mineCanBeSettled(g)]
 
     if not settleableMines:
         logger.info(f"No loots to close for user {str(user.address)}")
         return 0
 
-    nClosedLoots = 0
-
-    # Close the settled loots
+    # Close the settled loots, without waiting for each tx to be mined
+    pipeline = TxPipeline(client)
     for g in settleableMines:
         # Close loot
         gameId = g["game_id"]
@@ -40,20 +44,27 @@ def closeLoots(user: User) -> int:
             txHash = client.settleGame(gameId)
         except ContractLogicError as e:
             logger.warning(f"Error closing loot {gameId}: {e}")
-            sendIM(f"Error closing loot {gameId}: {e}")
+            sendIM(f"Error closing loot {gameId}: {e}", urgent=True)
             continue
 
-        # Report
         txLogger.info(txHash)
-        txReceipt = client.getTransactionReceipt(txHash)
-        logTx(txReceipt)
-        if txReceipt["status"] != 1:
-            logger.error(f"Error closing loot {gameId}")
-            sendIM(f"Error closing Loot {gameId}")
-        else:
-            nClosedLoots += 1
-            logger.info(f"Loot {gameId} closed correctly")
-            sendIM(f"Loot {gameId} closed correctly")
-            maybeDonate(txReceipt)
-
-    return nClosedLoots
+        pipeline.add(txHash, partial(reportCloseLoot, gameId))
+
+    # Report as the txs get mined
+    txReceipts = pipeline.wait()
+    invalidateUser(user)  # the teams changed status
+    return len([r for r in txReceipts if r["status"] == 1])
+
+
+def reportCloseLoot(gameId: int, txReceipt: TxReceipt) -> None:
+    """
+    Log and notify the outcome of the tx that closed the given loot
+    """
+    logTx(txReceipt)
+    if txReceipt["status"] != 1:
+        logger.error(f"Error closing loot {gameId}")
+        sendIM(f"Error closing Loot {gameId}", urgent=True)
+    else:
+        logger.info(f"Loot {gameId} closed correctly")
+        sendIM(f"Loot {gameId} closed correctly")
+        maybeDonate(txReceipt)
@@ -2,23 +2,30 @@
 Helper functions to reinforce all loots of a given user
 """
 
+from functools import partial
 from web3.main import Web3
+from web3.types import TxReceipt
 from src.common.exceptions import NoSuitableReinforcementFound
 from src.common.logger import logger
 from src.common.txLogger import txLogger, logTx
-from src.helpers.instantMessage import sendIM
-from src.helpers.mines import fetchOpenLoots
+from src.helpers.instantMessage import sendIM, withDigestIM
+from src.helpers.mines import fetchOpenLootsOnChain
+from src.helpers.tavern import markCrabAsBorrowed
 from src.helpers.reinforce import looterCanReinforce
-from src.common.clients import makeCrabadaWeb3Client
+from src.common.clients import makeCrabadaWeb2Client, makeCrabadaWeb3Client
 from src.models.User import User
 from src.strategies.reinforce.ReinforceStrategy import ReinforceStrategy
-from src.strategies.reinforce.ReinforceStrategyFactory import getBestReinforcement
+from src.strategies.reinforce.ReinforceStrategyFactory import (
+    getBestReinforcement,
+    planReinforcements,
+)
 from time import sleep
-from src.common.config import reinforceDelayInSeconds
 from web3.exceptions import ContractLogicError
 from src.libs.Web3Client.exceptions import TransactionTooExpensive
+from src.libs.Web3Client.TxPipeline import TxPipeline
 
 
+@withDigestIM("Reinforce loots")
 def reinforceAttack(user: User) -> int:
     """
     Check if any of the teams of the user that are looting can be
@@ -32,32 +39,41 @@ def reinforceAttack(user: User) -> int:
     )
 
     # User's loots that can be reinforced
-    reinforceableMines = [m for m in fetchOpenLoots(user) if looterCanReinforce(m)]
+    reinforceableMines = [
+        m for m in fetchOpenLootsOnChain(user) if looterCanReinforce(m)
+    ]
 
     if not reinforceableMines:
         logger.info("No loots to reinforce for user " + str(user.address))
         return 0
 
-    # Reinforce the mines
-    nBorrowedReinforments = 0
+    # Choose the crabs for all mines at once, so that no crab is
+    # assigned twice and there is no need to wait between mines
+    maxPrice = user.config["reinforcementMaxPriceInTus"]
+    plan = planReinforcements(user, reinforceableMines, maxPrice)
+
+    # Reinforce the mines, without waiting for each tx to be mined
+    pipeline = TxPipeline(client)
     nb_attempts = 10
-    for mine in reinforceableMines:
+    for (mine, crab) in plan:
         mineId = mine["game_id"]
-        maxPrice = user.config["reinforcementMaxPriceInTus"]
 
         for attempt in range(nb_attempts):
             print(f"Mine {mineId}, reinforce attempt {attempt}")
 
-            # Find best reinforcement crab to borrow
-            try:
-                crab = getBestReinforcement(user, mine, maxPrice)
-            except NoSuitableReinforcementFound as e:
-                logger.warning(f"{e.__class__.__name__}: {e}")
-                break
+            # If the planned crab could not be borrowed, find another one
+            if attempt > 0:
+                try:
+                    crab = getBestReinforcement(user, mine, maxPrice)
+                except NoSuitableReinforcementFound as e:
+                    logger.warning(f"{e.__class__.__name__}: {e}")
+                    break
+
+                # Some strategies might return no reinforcement
+                if not crab:
+                    break
 
-            # Some strategies might return no reinforcement
-            if not crab:
-                break
+                ReinforceStrategy.reserveCrab(crab)
 
             crabId = crab["crabada_id"]
             price = crab["price"]
@@ -69,30 +85,35 @@ def reinforceAttack(user: User) -> int:
                 txHash = client.reinforceAttack(mineId, crabId, price)
             except (ContractLogicError, TransactionTooExpensive) as e:
                 logger.warning(f"Error reinforcing loot {mineId}: {e}")
-                sendIM(f"Error reinforcing loot {mineId}: {e}")
+                sendIM(f"Error reinforcing loot {mineId}: {e}", urgent=True)
 
                 ReinforceStrategy.mark_crab_bad(crab)
+                makeCrabadaWeb2Client().invalidateCrabsForLending()
                 sleep(2)
                 continue
 
-            # Report
-            txLogger.info(txHash)
-            txReceipt = client.getTransactionReceipt(txHash)
-            logTx(txReceipt)
-            if txReceipt["status"] != 1:
-                logger.error(f"Error reinforcing loot {mineId}")
-                sendIM(crabInfoMsg)
-                sendIM(f"Error reinforcing loot {mineId}")
-            else:
-                nBorrowedReinforments += 1
-                logger.info(f"Loot {mineId} reinforced correctly")
-                sendIM(crabInfoMsg)
-                sendIM(f"Loot {mineId} reinforced correctly")
-
-            # Wait some time to avoid renting the same crab for different teams
-            if len(reinforceableMines) > 1:
-                sleep(reinforceDelayInSeconds)
+            # The tavern has changed, do not pick the same crab again
+            markCrabAsBorrowed(crab)
 
+            txLogger.info(txHash)
+            pipeline.add(txHash, partial(reportReinforceAttack, mineId, crabInfoMsg))
             break
 
-    return nBorrowedReinforments
+    # Report as the txs get mined
+    txReceipts = pipeline.wait()
+    return len([r for r in txReceipts if r["status"] == 1])
+
+
+def reportReinforceAttack(mineId: int, crabInfoMsg: str, txReceipt: TxReceipt) -> None:
+    """
+    Log and notify the outcome of the tx that reinforced the given loot
+    """
+    logTx(txReceipt)
+    if txReceipt["status"] != 1:
+        logger.error(f"Error reinforcing loot {mineId}")
+        sendIM(crabInfoMsg, urgent=True)
+        sendIM(f"Error reinforcing loot {mineId}", urgent=True)
+    else:
+        logger.info(f"Loot {mineId} reinforced correctly")
+        sendIM(crabInfoMsg)
+        sendIM(f"Loot {mineId} reinforced correctly")
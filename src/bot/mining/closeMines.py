@@ -3,21 +3,26 @@ Helper functions to close (i.e. claim rewards from) all mines
 of a given user
 """
 
+from functools import partial
+from web3.types import TxReceipt
 from src.common.logger import logger
 from src.common.txLogger import txLogger, logTx
-from src.helpers.instantMessage import sendIM
+from src.helpers.instantMessage import sendIM, withDigestIM
 from src.common.clients import makeCrabadaWeb3Client
 from src.helpers.mines import (
-    fetchOpenMines,
+    fetchOpenMinesOnChain,
     getNextMineToFinish,
     getRemainingTimeFormatted,
     mineIsFinished,
 )
+from src.helpers.store import invalidateUser
 from src.models.User import User
 from web3.exceptions import ContractLogicError
 from src.helpers.donate import maybeDonate
+from src.libs.Web3Client.TxPipeline import TxPipeline
 
 
+@withDigestIM("Close mines")
 def closeMines(user: User) -> int:
     """
     Close all open mining games whose end time is due; return
@@ -26,7 +31,8 @@ def closeMines(user: User) -> int:
     client = makeCrabadaWeb3Client(
         upperLimitForBaseFeeInGwei=user.config["closeMineMaxGasInGwei"]
     )
-    openGames = fetchOpenMines(user)
+    # Read the mines from the chain, as the API might lag behind
+    openGames = fetchOpenMinesOnChain(user)
     finishedGames = [g for g in openGames if mineIsFinished(g)]
 
     # Print a useful message in case there aren't finished games
@@ -38,9 +44,8 @@ def closeMines(user: User) -> int:
         logger.info(message)
         return 0
 
-    nClosedGames = 0
-
-    # Close the finished games
+    # Close the finished games, without waiting for each tx to be mined
+    pipeline = TxPipeline(client)
     for g in finishedGames:
 
         # Close mine
@@ -50,20 +55,27 @@ def closeMines(user: User) -> int:
             txHash = client.closeGame(gameId)
         except ContractLogicError as e:
             logger.warning(f"Error closing mine {gameId}: {e}")
-            sendIM(f"Error closing mine {gameId}: {e}")
+            sendIM(f"Error closing mine {gameId}: {e}", urgent=True)
             continue
 
-        # Report
         txLogger.info(txHash)
-        txReceipt = client.getTransactionReceipt(txHash)
-        logTx(txReceipt)
-        if txReceipt["status"] != 1:
-            logger.error(f"Error closing mine {gameId}")
-            sendIM(f"Error closing mine {gameId}")
-        else:
-            nClosedGames += 1
-            logger.info(f"Mine {gameId} closed correctly")
-            sendIM(f"Mine {gameId} closed correctly")
-            maybeDonate(txReceipt)
+        pipeline.add(txHash, partial(reportCloseMine, gameId))
+
+    # Report as the txs get mined
+    txReceipts = pipeline.wait()
+    invalidateUser(user)  # the teams changed status
+    return len([r for r in txReceipts if r["status"] == 1])
+
 
-    return nClosedGames
+def reportCloseMine(gameId: int, txReceipt: TxReceipt) -> None:
+    """
+    Log and notify the outcome of the tx that closed the given mine
+    """
+    logTx(txReceipt)
+    if txReceipt["status"] != 1:
+        logger.error(f"Error closing mine {gameId}")
+        sendIM(f"Error closing mine {gameId}", urgent=True)
+    else:
+        logger.info(f"Mine {gameId} closed correctly")
+        sendIM(f"Mine {gameId} closed correctly")
+        maybeDonate(txReceipt)
@@ -2,23 +2,30 @@
 Helper functions to reinforce all mines of a given user
 """
 
+from functools import partial
 from web3.main import Web3
+from web3.types import TxReceipt
 from src.common.exceptions import NoSuitableReinforcementFound
 from src.common.logger import logger
 from src.common.txLogger import txLogger, logTx
-from src.helpers.mines import fetchOpenMines
+from src.helpers.mines import fetchOpenMinesOnChain
+from src.helpers.tavern import markCrabAsBorrowed
 from src.helpers.reinforce import minerCanReinforce
-from src.helpers.instantMessage import sendIM
-from src.common.clients import makeCrabadaWeb3Client
+from src.helpers.instantMessage import sendIM, withDigestIM
+from src.common.clients import makeCrabadaWeb2Client, makeCrabadaWeb3Client
 from src.models.User import User
 from src.strategies.reinforce.ReinforceStrategy import ReinforceStrategy
-from src.strategies.reinforce.ReinforceStrategyFactory import getBestReinforcement
+from src.strategies.reinforce.ReinforceStrategyFactory import (
+    getBestReinforcement,
+    planReinforcements,
+)
 from time import sleep
-from src.common.config import reinforceDelayInSeconds
 from web3.exceptions import ContractLogicError
 from src.libs.Web3Client.exceptions import TransactionTooExpensive
+from src.libs.Web3Client.TxPipeline import TxPipeline
 
 
+@withDigestIM("Reinforce mines")
 def reinforceDefense(user: User) -> int:
     """
     Check if any of the teams of the user that are mining can be
@@ -32,30 +39,39 @@ def reinforceDefense(user: User) -> int:
     )
 
     # User's mines that can be reinforced
-    reinforceableMines = [m for m in fetchOpenMines(user) if minerCanReinforce(m)]
+    reinforceableMines = [
+        m for m in fetchOpenMinesOnChain(user) if minerCanReinforce(m)
+    ]
 
     if not reinforceableMines:
         logger.info("No mines to reinforce for user " + str(user.address))
         return 0
 
-    # Reinforce the mines
-    nBorrowedReinforments = 0
+    # Choose the crabs for all mines at once, so that no crab is
+    # assigned twice and there is no need to wait between mines
+    maxPrice = user.config["reinforcementMaxPriceInTus"]
+    plan = planReinforcements(user, reinforceableMines, maxPrice)
+
+    # Reinforce the mines, without waiting for each tx to be mined
+    pipeline = TxPipeline(client)
     nb_attempts = 10
-    for mine in reinforceableMines:
+    for (mine, crab) in plan:
         mineId = mine["game_id"]
-        maxPrice = user.config["reinforcementMaxPriceInTus"]
-        
+
         for attempt in range(nb_attempts):
-            # Find best reinforcement crab to borrow
-            try:
-                crab = getBestReinforcement(user, mine, maxPrice)
-            except NoSuitableReinforcementFound as e:
-                logger.warning(f"{e.__class__.__name__}: {e}")
-                break
+            # If the planned crab could not be borrowed, find another one
+            if attempt > 0:
+                try:
+                    crab = getBestReinforcement(user, mine, maxPrice)
+                except NoSuitableReinforcementFound as e:
+                    logger.warning(f"{e.__class__.__name__}: {e}")
+                    break
 
-            # Some strategies might return no reinforcement
-            if not crab:
-                break
+                # Some strategies might return no reinforcement
+                if not crab:
+                    break
+
+                ReinforceStrategy.reserveCrab(crab)
 
             crabId = crab["crabada_id"]
             price = crab["price"]
@@ -67,30 +83,35 @@ def reinforceDefense(user: User) -> int:
                 txHash = client.reinforceDefense(mineId, crabId, price)
             except (ContractLogicError, TransactionTooExpensive) as e:
                 logger.warning(f"Error reinforcing mine {mineId}: {e}")
-                sendIM(f"Error reinforcing mine {mineId}: {e}")
+                sendIM(f"Error reinforcing mine {mineId}: {e}", urgent=True)
                 
                 ReinforceStrategy.mark_crab_bad(crab)
+                makeCrabadaWeb2Client().invalidateCrabsForLending()
                 sleep(2)
                 continue
 
-            # Report
-            txLogger.info(txHash)
-            txReceipt = client.getTransactionReceipt(txHash)
-            logTx(txReceipt)
-            if txReceipt["status"] != 1:
-                logger.error(f"Error reinforcing mine {mineId}")
-                sendIM(crabInfoMsg)
-                sendIM(f"Error reinforcing mine {mineId}")
-            else:
-                nBorrowedReinforments += 1
-                logger.info(f"Mine {mineId} reinforced correctly")
-                sendIM(crabInfoMsg)
-                sendIM(f"Mine {mineId} reinforced correctly")
-
-            # Wait some time to avoid renting the same crab for different teams
-            if len(reinforceableMines) > 1:
-                sleep(reinforceDelayInSeconds)
+            # The tavern has changed, do not pick the same crab again
+            markCrabAsBorrowed(crab)
 
+            txLogger.info(txHash)
+            pipeline.add(txHash, partial(reportReinforceDefense, mineId, crabInfoMsg))
             break
 
-    return nBorrowedReinforments
+    # Report as the txs get mined
+    txReceipts = pipeline.wait()
+    return len([r for r in txReceipts if r["status"] == 1])
+
+
+def reportReinforceDefense(mineId: int, crabInfoMsg: str, txReceipt: TxReceipt) -> None:
+    """
+    Log and notify the outcome of the tx that reinforced the given mine
+    """
+    logTx(txReceipt)
+    if txReceipt["status"] != 1:
+        logger.error(f"Error reinforcing mine {mineId}")
+        sendIM(crabInfoMsg, urgent=True)
+        sendIM(f"Error reinforcing mine {mineId}", urgent=True)
+    else:
+        logger.info(f"Mine {mineId} reinforced correctly")
+        sendIM(crabInfoMsg)
+        sendIM(f"Mine {mineId} reinforced correctly")
@@ -2,18 +2,24 @@
 Send a user's available teams mining
 """
 
+from functools import partial
+from web3.types import TxReceipt
 from src.common.logger import logger
 from src.common.txLogger import txLogger, logTx
-from src.helpers.instantMessage import sendIM
+from src.helpers.instantMessage import sendIM, withDigestIM
 from src.common.clients import makeCrabadaWeb3Client
 from src.helpers.teams import fetchAvailableTeamsForTask
+from src.helpers.store import invalidateUser
 from src.models.User import User
 from web3.exceptions import ContractLogicError
+from src.libs.Web3Client.TxPipeline import TxPipeline
 
 
+@withDigestIM("Send teams mining")
 def sendTeamsMining(user: User, loot_point_filter=False, limit=None) -> int:
     """
-    Send mining the available teams with the 'mine' task.
+    Send mining the available teams with the 'mine' task; if a
+    limit is given, send at most that many teams.
 
     Returns the opened mines
     """
@@ -33,8 +39,11 @@ def sendTeamsMining(user: User, loot_point_filter=False, limit=None) -> int:
         )
         return 0
 
-    # Send the teams
-    nSentTeams = 0
+    if limit is not None:
+        availableTeams = availableTeams[:limit]
+
+    # Send the teams, without waiting for each tx to be mined
+    pipeline = TxPipeline(client)
     for t in availableTeams:
 
         # Send team
@@ -44,22 +53,27 @@ def sendTeamsMining(user: User, loot_point_filter=False, limit=None) -> int:
             txHash = client.startGame(teamId)
         except ContractLogicError as e:
             logger.warning(f"Error sending team {teamId} mining: {e}")
-            sendIM(f"Error sending team {teamId} mining: {e}")
+            sendIM(f"Error sending team {teamId} mining: {e}", urgent=True)
             continue
 
-        # Report
         txLogger.info(txHash)
-        txReceipt = client.getTransactionReceipt(txHash)
-        logTx(txReceipt)
-        if txReceipt["status"] != 1:
-            logger.error(f"Error sending team {teamId} mining")
-            sendIM(f"Error sending team {teamId} mining")
-        else:
-            nSentTeams += 1
-            logger.info(f"Team {teamId} sent successfully")
-            sendIM(f"Team {teamId} sent successfully")
+        pipeline.add(txHash, partial(reportSendTeam, teamId))
+
+    # Report as the txs get mined
+    txReceipts = pipeline.wait()
+    invalidateUser(user)  # the teams changed status
+    return len([r for r in txReceipts if r["status"] == 1])
 
-        if limit is not None and nSentTeams >= limit:
-            break
 
-    return nSentTeams
+def reportSendTeam(teamId: int, txReceipt: TxReceipt) -> None:
+    """
+    Log and notify the outcome of the tx that sent the given team
+    mining
+    """
+    logTx(txReceipt)
+    if txReceipt["status"] != 1:
+        logger.error(f"Error sending team {teamId} mining")
+        sendIM(f"Error sending team {teamId} mining", urgent=True)
+    else:
+        logger.info(f"Team {teamId} sent successfully")
+        sendIM(f"Team {teamId} sent successfully")
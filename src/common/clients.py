@@ -3,19 +3,119 @@ by the scripts"""
 
 from typing import cast
 from eth_typing import Address
-from src.common.config import nodeUri, users
+from src.common.config import (
+    broadcastTxs,
+    nodeUris,
+    tavernCacheTtlInSeconds,
+    users,
+)
 from src.libs.CrabadaWeb3Client.CrabadaWeb3Client import CrabadaWeb3Client
 from src.libs.CrabadaWeb2Client.CrabadaWeb2Client import CrabadaWeb2Client
+from src.libs.CrabadaWeb2Client.AsyncCrabadaWeb2Client import AsyncCrabadaWeb2Client
+from src.libs.CrabadaWeb2Client.ResponseCache import ResponseCache
+from src.libs.CrabadaWeb2Client.GameStore import GameStore
 from src.libs.Web3Client.Erc20Web3Client import Erc20Web3Client
+from src.libs.Web3Client.GasLimitCache import GasLimitCache
+from src.libs.Web3Client.ProviderPool import ProviderPool
 from src.libs.Web3Client.Web3Client import Web3Client
 from src.libs.Web3Client.Web3ClientFactory import makeErc20Client, makeWeb3Client
 
+web2Client: CrabadaWeb2Client = None
+"""
+Client shared by all the callers of makeCrabadaWeb2Client(), so
+that they all reuse the same pool of HTTP connections.
+"""
+
 
 def makeCrabadaWeb2Client() -> CrabadaWeb2Client:
+    """
+    Return an initialized client to access Crabada's web endpoints;
+    the client is created once and then shared.
+
+    The listings of the tavern are cached for a few seconds, so that
+    all the reinforce strategies tried in a row share the same snapshot.
+    """
+    global web2Client
+    if not web2Client:
+        cache = ResponseCache({"/crabadas/lending": tavernCacheTtlInSeconds})
+        web2Client = CrabadaWeb2Client(cache=cache)
+    return web2Client
+
+
+asyncWeb2Client: AsyncCrabadaWeb2Client = None
+"""
+Asynchronous client shared by all the callers of
+makeAsyncCrabadaWeb2Client().
+"""
+
+
+def makeAsyncCrabadaWeb2Client() -> AsyncCrabadaWeb2Client:
     """
     Return an initialized client to access Crabada's web endpoints
+    asynchronously; the client is created once and then shared, so
+    use it from a single event loop.
+    """
+    global asyncWeb2Client
+    if not asyncWeb2Client:
+        asyncWeb2Client = AsyncCrabadaWeb2Client()
+    return asyncWeb2Client
+
+
+gameStore: GameStore = None
+"""
+Local database of games, teams and tavern listings, shared by all
+the callers of makeGameStore().
+"""
+
+
+def makeGameStore() -> GameStore:
+    """
+    Return the shared store of games, teams and tavern listings,
+    opening the database the first time
+    """
+    global gameStore
+    if not gameStore:
+        gameStore = GameStore("storage/db/crabada.sqlite")
+    return gameStore
+
+
+providerPool: ProviderPool = None
+"""
+Nodes of the chain, shared by all the clients created with the
+functions below, so that they reuse the same open connections
+and share what is known about the health of each node.
+"""
+
+
+def makeProviderPool() -> ProviderPool:
+    """
+    Return the shared pool of the nodes in WEB3_NODE_URI; the
+    first time, the nodes are pinged to open the connections and
+    to find the fastest one
+    """
+    global providerPool
+    if not providerPool:
+        providerPool = ProviderPool(nodeUris)
+        providerPool.warmUp()
+    return providerPool
+
+
+gasLimitCache: GasLimitCache = None
+"""
+Gas limits learnt from the transactions sent to Crabada's smart
+contracts, shared by all the clients and persisted across runs.
+"""
+
+
+def makeGasLimitCache() -> GasLimitCache:
+    """
+    Return the shared gas limit cache, loading it from file the
+    first time
     """
-    return CrabadaWeb2Client()
+    global gasLimitCache
+    if not gasLimitCache:
+        gasLimitCache = GasLimitCache("storage/cache/gasLimits.json")
+    return gasLimitCache
 
 
 def makeCrabadaWeb3Client(
@@ -23,13 +123,18 @@ def makeCrabadaWeb3Client(
 ) -> CrabadaWeb3Client:
     """
     Return an initialized client to interact with Crabada's
-    smart contracts
+    smart contracts; gas limits are taken from the shared cache
+    when possible, rather than estimated, and txs are sent to all
+    the nodes at once if WEB3_BROADCAST_TXS is set
     """
-    return CrabadaWeb3Client(
-        nodeUri=nodeUri,
+    client = CrabadaWeb3Client(
+        nodeUri=makeProviderPool(),
         privateKey=users[0]["privateKey"],
         upperLimitForBaseFeeInGwei=upperLimitForBaseFeeInGwei,
     )
+    client.setGasLimitCache(makeGasLimitCache())
+    client.setBroadcastTxs(bool(broadcastTxs))
+    return client
 
 
 def makeAvalancheClient() -> Web3Client:
@@ -39,7 +144,7 @@ def makeAvalancheClient() -> Web3Client:
     """
     return makeWeb3Client(
         "Avalanche",
-        nodeUri,
+        makeProviderPool(),
         privateKey=users[0]["privateKey"],
     )
 
@@ -52,7 +157,7 @@ def makeTusClient() -> Erc20Web3Client:
     tusContract = cast(Address, "0xf693248F96Fe03422FEa95aC0aFbBBc4a8FdD172")
     return makeErc20Client(
         "Avalanche",
-        nodeUri,
+        makeProviderPool(),
         tusContract,
         privateKey=users[0]["privateKey"],
     )
@@ -66,7 +171,7 @@ def makeCraClient() -> Erc20Web3Client:
     craContract = cast(Address, "0xa32608e873f9ddef944b24798db69d80bbb4d1ed")
     return makeErc20Client(
         "Avalanche",
-        nodeUri,
+        makeProviderPool(),
         craContract,
         privateKey=users[0]["privateKey"],
     )
@@ -8,7 +8,14 @@ from src.common.types import (
     ConfigTeam,
     ConfigUser,
 )
-from src.common.dotenv import getenv, parseBool, parseInt, parsePercentage
+from src.common.dotenv import (
+    getenv,
+    parseBool,
+    parseFloat,
+    parseInt,
+    parseListOfStrings,
+    parsePercentage,
+)
 from typing import Any, Dict, List
 from src.helpers.config import (
     parseGroupOfTeamsConfigs,
@@ -45,10 +52,16 @@ validateUsersConfigs(users)
 # General options
 ##################
 
-nodeUri = getenv("WEB3_NODE_URI")
-reinforceDelayInSeconds = parseInt("REINFORCE_DELAY_IN_SECONDS", 30)
+nodeUris = parseListOfStrings("WEB3_NODE_URI")
+nodeUri = nodeUris[0] if nodeUris else ""
+broadcastTxs = parseBool("WEB3_BROADCAST_TXS", False)
+nodeWsUri = getenv("WEB3_NODE_WS_URI")
 donatePercentage = parsePercentage("DONATE_PERCENTAGE", 0)
 donateFrequency = parseInt("DONATE_FREQUENCY", 10)
+tavernCacheTtlInSeconds = parseFloat("TAVERN_CACHE_TTL_IN_SECONDS", 2)
+daemonPollIntervalInSeconds = parseFloat("DAEMON_POLL_INTERVAL_IN_SECONDS", 2)
+storeMaxAgeInSeconds = parseFloat("STORE_MAX_AGE_IN_SECONDS", 30)
+indexerConcurrency = parseInt("INDEXER_CONCURRENCY", 4)
 
 ##################
 # Notifications
@@ -1,8 +1,8 @@
-from typing import Tuple, cast, List
+from typing import Tuple, List
 from src.common.logger import logger
-from src.common.clients import makeAvalancheClient, makeCraClient, makeTusClient
+from src.common.clients import makeCraClient, makeTusClient
 from src.common.config import donatePercentage, donateFrequency
-from web3.types import TxReceipt, Wei, Nonce
+from web3.types import TxReceipt, Wei
 from src.common.constants import eoas
 from src.helpers.instantMessage import sendIM
 from src.helpers.rewards import getTusAndCraRewardsFromTxReceipt
@@ -96,21 +96,20 @@ def donate(
     # How much should we donate?
     (tusDonation, craDonation) = getDonationAmounts(recentClaims, percentage)
 
-    # Initialize nonce and receipts
-    nonce = makeAvalancheClient().getNonce()
+    # Initialize receipts; the nonces are handled by the clients,
+    # which share the same nonce manager
     tusReceipt, craReceipt = None, None
 
     # Donate TUS
     if tusDonation:
         try:
             tusClient = makeTusClient()
-            txTus = tusClient.transfer(eoas["project"], tusDonation, nonce)
+            txTus = tusClient.transfer(eoas["project"], tusDonation)
             tusReceipt = tusClient.getTransactionReceipt(txTus)
             if tusReceipt["status"] != 1:
                 logger.error(
                     f"Error from TUS donation [tx={txTus}, status={tusReceipt['status']}"
                 )
-            nonce = cast(Nonce, nonce + 1)
         except Exception as e:
             logger.error(f"Could not send TUS donation > {e}")
 
@@ -118,7 +117,7 @@ def donate(
     if craDonation:
         try:
             craClient = makeCraClient()
-            txCra = craClient.transfer(eoas["project"], craDonation, nonce)
+            txCra = craClient.transfer(eoas["project"], craDonation)
             craReceipt = craClient.getTransactionReceipt(txCra)
             if craReceipt["status"] != 1:
                 logger.error(
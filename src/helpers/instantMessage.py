@@ -1,14 +1,30 @@
+from contextlib import contextmanager
+from functools import wraps
+from threading import local
+from typing import Any, Callable, Iterator, List, TypeVar
 from src.common.config import notifications, telegram
 from src.common.logger import logger
+from src.libs.MessageDispatcher.Digest import Digest
+from src.libs.MessageDispatcher.MessageDispatcher import MessageDispatcher
+from src.libs.MessageDispatcher.exceptions import RateLimited
 import requests
 import json
 
 
-def sendIM(body: str, forceSend: bool = False, silent: bool = True) -> bool:
+def sendIM(
+    body: str, forceSend: bool = False, silent: bool = True, urgent: bool = False
+) -> bool:
     """
     Send an instant message to the services configured in .env;
     so far only Telegram is supported.
 
+    The message is sent in the background, so that the caller does not
+    wait for the IM service; return False if the message could not be
+    queued without dropping an older one.
+
+    If a digest is open (see digestIM), the message is added to the
+    digest instead, unless it is urgent.
+
     Parameters
     ----------
     body : str
@@ -20,11 +36,89 @@ def sendIM(body: str, forceSend: bool = False, silent: bool = True) -> bool:
     silent : bool
         Send a silent notification, if the IM protocol supports it
         (Telegram does)
+    urgent : bool
+        Send the message right away, even if a digest is open; use it
+        for errors.
     """
 
     if not notifications["instantMessage"]["enable"] and not forceSend:
         return True
 
+    digests = getOpenDigests()
+    if digests and not urgent:
+        digests[-1].add(body)
+        return True
+
+    return dispatcher.submit(body, silent=silent)
+
+
+@contextmanager
+def digestIM(title: str = None, windowInSeconds: float = None) -> Iterator[Digest]:
+    """
+    Collect the messages sent with sendIM() in the current thread, and
+    send them as a single summary when the block exits; urgent messages
+    are still sent right away.
+
+        with digestIM("Close mines"):
+            sendIM("Mine 1 closed correctly")
+            sendIM("Mine 2 closed correctly")
+    """
+    digest = Digest(
+        lambda summary: dispatcher.submit(summary, silent=True),
+        title,
+        windowInSeconds=windowInSeconds,
+    )
+    digests = getOpenDigests()
+    digests.append(digest)
+    try:
+        yield digest
+    finally:
+        digests.pop()
+        digest.flush()
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def withDigestIM(title: str) -> Callable[[F], F]:
+    """
+    Decorator that collects the messages sent by the decorated function
+    in a digest, see digestIM()
+    """
+
+    def decorator(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with digestIM(title):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def getOpenDigests() -> List[Digest]:
+    """
+    Return the stack of digests open in the current thread
+    """
+    if not hasattr(threadState, "digests"):
+        threadState.digests = []
+    return threadState.digests
+
+
+threadState = local()
+"""
+Digests are per thread, so that the messages of a bot running in a
+thread do not end up in the digest of another thread
+"""
+
+
+def deliverIM(body: str, silent: bool = True) -> bool:
+    """
+    Actually send an instant message to the services configured in
+    .env; called in the background by the dispatcher of sendIM()
+    """
+
     notification_result = False
 
     try:
@@ -37,6 +131,8 @@ def sendIM(body: str, forceSend: bool = False, silent: bool = True) -> bool:
             )
         # NOTE <add more IM services here>
 
+    except RateLimited:
+        raise
     except:
         logger.warning("Notification Error!")
         return False
@@ -44,11 +140,18 @@ def sendIM(body: str, forceSend: bool = False, silent: bool = True) -> bool:
     return notification_result
 
 
+dispatcher = MessageDispatcher(deliverIM, logger=logger)
+"""
+Sends the instant messages in the background
+"""
+
+
 def sendTelegramMessage(
     body: str, apiKey: str, chatId: str, disableNotifications: bool = True
 ) -> bool:
     """
-    Send a Telegram message using the REST api.
+    Send a Telegram message using the REST api; raise RateLimited if
+    Telegram asks to wait before sending more messages.
 
     Docs: https://core.telegram.org/bots/api#sendmessage
     """
@@ -63,5 +166,8 @@ def sendTelegramMessage(
     data = json.dumps(data_dict)
 
     url = f"https://api.telegram.org/bot{apiKey}/sendMessage"
-    response = requests.post(url, data=data, headers=headers, timeout=1)
+    response = requests.post(url, data=data, headers=headers, timeout=5)
+    if response.status_code == 429:
+        retryAfter = response.json().get("parameters", {}).get("retry_after", 1)
+        raise RateLimited(retryAfter)
     return response.ok
@@ -5,8 +5,9 @@ Helper functions to handle Crabada mines / games
 from typing import List
 from src.helpers.dates import getPrettySeconds
 from time import time
-from src.common.clients import makeCrabadaWeb2Client
+from src.common.clients import makeCrabadaWeb3Client, makeGameStore
 from src.helpers.general import firstOrNone
+from src.helpers.store import asyncSyncGames, syncGames
 from src.libs.CrabadaWeb2Client.types import Game, GameProcess
 from src.models.User import User
 
@@ -169,6 +170,39 @@ def getRemainingTimeBeforeSettleFormatted(mine: Game) -> str:
     return getPrettySeconds(getRemainingTimeBeforeSettle(mine))
 
 
+def getCloseTime(mine: Game) -> int:
+    """
+    Timestamp at which the given mine can be closed by the miner
+    """
+    return mine["end_time"]
+
+
+def getReinforceWindowEndTime(mine: Game) -> int:
+    """
+    Timestamp at which the current reinforce window of the given
+    mine will close, or None if the mine was not attacked or the
+    attack is over
+    """
+    if not mineHasBeenAttacked(mine) or attackIsOver(mine):
+        return None
+    return getLastAction(mine)["transaction_time"] + 1800 + 1
+
+
+def getSettleTime(mine: Game) -> int:
+    """
+    Timestamp at which the given mine can be settled by the looter,
+    or None if it was not attacked or is already settled.
+
+    If the attack is not over, the settle time assumes that nobody will
+    reinforce anymore: it will move forward with each reinforcement.
+    """
+    if not mineHasBeenAttacked(mine) or mineIsSettled(mine):
+        return None
+    lastActionTime = getLastAction(mine)["transaction_time"]
+    attackOverTime = getReinforceWindowEndTime(mine) or lastActionTime
+    return max(attackOverTime, mine["start_time"] + 3600 + 60 * 3 + 1)
+
+
 def getTimesLooterReinforced(mine: Game) -> int:
     """
     Number of times the looter has reinforced so far
@@ -214,7 +248,8 @@ def getElapsedTimeSinceLastAction(mine: Game) -> int:
 def fetchOpenMines(user: User) -> List[Game]:
     """
     Fetch all open mines that were opened by teams
-    belonging to the given user
+    belonging to the given user; they are read from the local
+    store, which is synced with the API only if stale
     """
 
     teamIds = [t["id"] for t in user.getTeams()]
@@ -222,17 +257,14 @@ def fetchOpenMines(user: User) -> List[Game]:
     if not teamIds:
         return []
 
-    openGames = makeCrabadaWeb2Client().listMines(
-        {"limit": len(teamIds) * 2, "status": "open", "user_address": user.address}
-    )
-
-    return [g for g in openGames if g["team_id"] in teamIds]
+    syncGames(user)
+    return makeGameStore().listOpenGamesOfTeams(teamIds, "team_id")
 
 
 def fetchOpenLoots(user: User) -> List[Game]:
     """
     Fetch all mines that are being looted by teams
-    belonging to the given user
+    belonging to the given user; see fetchOpenMines()
     """
 
     teamIds = [t["id"] for t in user.getTeams()]
@@ -240,8 +272,73 @@ def fetchOpenLoots(user: User) -> List[Game]:
     if not teamIds:
         return []
 
-    openLoots = makeCrabadaWeb2Client().listMines(
-        {"limit": len(teamIds) * 2, "status": "open", "looter_address": user.address}
-    )
+    syncGames(user)
+    return makeGameStore().listOpenGamesOfTeams(teamIds, "attack_team_id")
+
+
+def fetchOpenMinesOnChain(user: User) -> List[Game]:
+    """
+    Same as fetchOpenMines, but read straight from the contract,
+    so that the result does not lag behind the chain like the API.
+
+    The games miss the fields that are not stored on chain, e.g.
+    the reward estimates; see CrabadaWeb3Client.getGames()
+    """
+    return fetchOpenGamesOnChain(user, "MINING")
+
+
+def fetchOpenLootsOnChain(user: User) -> List[Game]:
+    """
+    Same as fetchOpenLoots, but read straight from the contract;
+    see fetchOpenMinesOnChain()
+    """
+    return fetchOpenGamesOnChain(user, "LOOTING")
+
+
+def fetchOpenGamesOnChain(user: User, teamStatus: str) -> List[Game]:
+    """
+    Read from the contract the open games of the teams of the
+    given user that have the given status (MINING or LOOTING); it
+    takes a few multicalls, regardless of the number of teams.
+    """
+
+    teamIds = [t["id"] for t in user.getTeams()]
+
+    if not teamIds:
+        return []
+
+    client = makeCrabadaWeb3Client()
+    teams = client.getTeams(teamIds)
+    gameIds = [t["game_id"] for t in teams if t["status"] == teamStatus]
+
+    return [g for g in client.getGames(gameIds) if mineIsOpen(g)]
+
+
+async def asyncFetchOpenMines(user: User) -> List[Game]:
+    """
+    Same as fetchOpenMines, but asynchronous, so that the mines
+    of many users can be fetched concurrently
+    """
+
+    teamIds = [t["id"] for t in user.getTeams()]
+
+    if not teamIds:
+        return []
+
+    await asyncSyncGames(user)
+    return makeGameStore().listOpenGamesOfTeams(teamIds, "team_id")
+
+
+async def asyncFetchOpenLoots(user: User) -> List[Game]:
+    """
+    Same as fetchOpenLoots, but asynchronous, so that the loots
+    of many users can be fetched concurrently
+    """
+
+    teamIds = [t["id"] for t in user.getTeams()]
+
+    if not teamIds:
+        return []
 
-    return [g for g in openLoots if g["attack_team_id"] in teamIds]
+    await asyncSyncGames(user)
+    return makeGameStore().listOpenGamesOfTeams(teamIds, "attack_team_id")
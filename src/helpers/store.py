@@ -0,0 +1,167 @@
+"""
+Helper functions to keep the local store of games, teams and tavern
+listings in sync with the Crabada API
+"""
+
+from typing import Any, List, Literal, Tuple
+from src.common.clients import (
+    makeAsyncCrabadaWeb2Client,
+    makeCrabadaWeb2Client,
+    makeGameStore,
+)
+from src.common.config import storeMaxAgeInSeconds
+from src.libs.CrabadaWeb2Client.AsyncCrabadaWeb2Client import AsyncCrabadaWeb2Client
+from src.libs.CrabadaWeb2Client.types import CrabForLending, Game, Team
+from src.models.User import User
+
+openGameQueries: List[Tuple[str, Literal["team_id", "attack_team_id"]]] = [
+    ("user_address", "team_id"),
+    ("looter_address", "attack_team_id"),
+]
+"""
+Address param of the API and team key of the games, for the mines
+and the loots of a user
+"""
+
+
+def syncGames(user: User, force: bool = False) -> None:
+    """
+    Store the open games of the given user, both mines and loots,
+    unless they were synced less than STORE_MAX_AGE_IN_SECONDS ago.
+
+    The API cannot list the games changed since a given time, but
+    only open games can change; so we pull just those, and mark as
+    closed the stored games that are not open anymore.
+    """
+    store = makeGameStore()
+    name = getSyncName(user, "games")
+    if not force and store.isFresh(name, storeMaxAgeInSeconds):
+        return
+
+    client = makeCrabadaWeb2Client()
+    for (addressParam, teamKey) in openGameQueries:
+        games = list(client.iterMines({"status": "open", addressParam: user.address}))
+        storeOpenGames(user, games, teamKey)
+
+    store.markSynced(name)
+
+
+async def asyncSyncGames(user: User, force: bool = False) -> None:
+    """
+    Same as syncGames(), but the API is queried asynchronously
+    """
+    store = makeGameStore()
+    name = getSyncName(user, "games")
+    if not force and store.isFresh(name, storeMaxAgeInSeconds):
+        return
+
+    client = makeAsyncCrabadaWeb2Client()
+    for (addressParam, teamKey) in openGameQueries:
+        query = {"status": "open", addressParam: user.address}
+        games = [g async for g in client.iterMines(query)]
+        storeOpenGames(user, games, teamKey)
+
+    store.markSynced(name)
+
+
+def storeOpenGames(
+    user: User, games: List[Game], teamKey: Literal["team_id", "attack_team_id"]
+) -> None:
+    """
+    Store the given open games of the user, and mark as closed the
+    stored games of the user that are not among them
+    """
+    store = makeGameStore()
+    teamIds = [t["id"] for t in user.getTeams()]
+    store.upsertGames(games)
+    store.closeGamesExcept([g["game_id"] for g in games], teamIds, teamKey)
+
+
+def syncAvailableTeams(user: User, force: bool = False) -> None:
+    """
+    Store the teams that the API lists as available for the given
+    user (is_team_available=1), unless they were synced less than
+    STORE_MAX_AGE_IN_SECONDS ago
+    """
+    store = makeGameStore()
+    name = getSyncName(user, "availableTeams")
+    if not force and store.isFresh(name, storeMaxAgeInSeconds):
+        return
+
+    teams = makeCrabadaWeb2Client().iterTeams(user.address, {"is_team_available": 1})
+    store.replaceAvailableTeams(user.address, teams)
+    store.markSynced(name)
+
+
+async def asyncSyncAvailableTeams(user: User, force: bool = False) -> None:
+    """
+    Same as syncAvailableTeams(), but the API is queried
+    asynchronously
+    """
+    store = makeGameStore()
+    name = getSyncName(user, "availableTeams")
+    if not force and store.isFresh(name, storeMaxAgeInSeconds):
+        return
+
+    client = makeAsyncCrabadaWeb2Client()
+    query = {"is_team_available": 1}
+    teams: List[Team] = [t async for t in client.iterTeams(user.address, query)]
+    store.replaceAvailableTeams(user.address, teams)
+    store.markSynced(name)
+
+
+def syncCrabsForLending(
+    queries: List[dict[str, Any]], maxAgeInSeconds: float, force: bool = False
+) -> None:
+    """
+    Store the crabs listed in the tavern by the given queries, unless
+    they were synced less than maxAgeInSeconds ago, so that scripts
+    running at the same time share the same listing
+    """
+    store = makeGameStore()
+    name = "crabsForLending"
+    if not force and store.isFresh(name, maxAgeInSeconds):
+        return
+
+    client = makeCrabadaWeb2Client()
+    crabs: List[CrabForLending] = []
+    for query in queries:
+        crabs += client.listCrabsForLending(query)
+    store.replaceCrabsForLending(crabs)
+    store.markSynced(name)
+
+
+async def asyncSyncCrabsForLending(
+    client: AsyncCrabadaWeb2Client,
+    queries: List[dict[str, Any]],
+    maxAgeInSeconds: float,
+    force: bool = False,
+) -> None:
+    """
+    Same as syncCrabsForLending(), but the tavern is queried
+    asynchronously with the given client
+    """
+    store = makeGameStore()
+    name = "crabsForLending"
+    if not force and store.isFresh(name, maxAgeInSeconds):
+        return
+
+    crabs: List[CrabForLending] = []
+    for query in queries:
+        crabs += await client.listCrabsForLending(query)
+    store.replaceCrabsForLending(crabs)
+    store.markSynced(name)
+
+
+def invalidateUser(user: User) -> None:
+    """
+    Make sure that the next read of the games and teams of the given
+    user goes to the API, e.g. because we just sent a team mining
+    """
+    store = makeGameStore()
+    store.invalidate(getSyncName(user, "games"))
+    store.invalidate(getSyncName(user, "availableTeams"))
+
+
+def getSyncName(user: User, what: str) -> str:
+    return f"{what}:{str(user.address).lower()}"
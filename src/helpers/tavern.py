@@ -0,0 +1,116 @@
+"""
+Helper functions to share a single snapshot of the tavern between
+all reinforce strategies, and between the scripts that run at the
+same time, through the local store
+"""
+
+from contextlib import contextmanager
+from time import monotonic
+from typing import Any, Iterator, List
+from src.common.clients import makeCrabadaWeb2Client, makeGameStore
+from src.common.config import tavernCacheTtlInSeconds
+from src.helpers.store import asyncSyncCrabsForLending, syncCrabsForLending
+from src.libs.CrabadaWeb2Client.AsyncCrabadaWeb2Client import AsyncCrabadaWeb2Client
+from src.libs.CrabadaWeb2Client.TavernBook import TavernBook
+from src.libs.CrabadaWeb2Client.types import CrabForLending
+
+tavernBookQueries: List[dict[str, Any]] = [
+    {"limit": 100, "orderBy": "price", "order": "asc"},
+    {"limit": 100, "orderBy": "battle_point", "order": "desc"},
+    {"limit": 100, "orderBy": "mine_point", "order": "desc"},
+]
+"""
+Listings of the tavern that make up the book: the cheapest crabs
+and the crabs with the highest stats
+"""
+
+tavernBook: TavernBook = None
+tavernBookExpiresAt: float = 0
+
+tavernBookPins: int = 0
+"""
+How many pinTavernBook() blocks are open; while any is, the
+book is not refreshed
+"""
+
+
+def getTavernBook() -> TavernBook:
+    """
+    Return the shared tavern book, building it again if it is older
+    than TAVERN_CACHE_TTL_IN_SECONDS, unless the book is pinned; the
+    book is built from the listing in the local store, which is
+    synced with the tavern if it is as old
+    """
+    if isTavernBookStale():
+        syncCrabsForLending(tavernBookQueries, tavernCacheTtlInSeconds)
+        buildTavernBook()
+    return tavernBook
+
+
+async def asyncGetTavernBook(client: AsyncCrabadaWeb2Client) -> TavernBook:
+    """
+    Same as getTavernBook(), but the tavern is queried
+    asynchronously with the given client
+    """
+    if isTavernBookStale():
+        await asyncSyncCrabsForLending(
+            client, tavernBookQueries, tavernCacheTtlInSeconds
+        )
+        buildTavernBook()
+    return tavernBook
+
+
+def isTavernBookStale() -> bool:
+    """
+    Whether the tavern book needs to be built (again)
+    """
+    isExpired = monotonic() >= tavernBookExpiresAt and not tavernBookPins
+    return not tavernBook or isExpired
+
+
+def buildTavernBook() -> None:
+    """
+    Build the tavern book from the listing in the local store
+    """
+    global tavernBook, tavernBookExpiresAt
+    tavernBook = TavernBook(makeGameStore().listCrabsForLending())
+    tavernBookExpiresAt = monotonic() + tavernCacheTtlInSeconds
+
+
+@contextmanager
+def pinTavernBook() -> Iterator[None]:
+    """
+    Keep using the same tavern book until the block exits, even if it
+    expires in the meantime, so that the strategies of many games share
+    a single snapshot of the tavern, even with a TTL of 0.
+
+        with pinTavernBook():
+            for game in games:
+                getBestReinforcement(user, game, maxPrice)
+    """
+    global tavernBookPins
+    tavernBookPins += 1
+    try:
+        yield
+    finally:
+        tavernBookPins -= 1
+
+
+def removeFromTavernBook(crab: CrabForLending) -> None:
+    """
+    Remove the given crab from the shared tavern book, if it is
+    there, so that no strategy will pick it again
+    """
+    if tavernBook:
+        tavernBook.removeCrab(crab["crabada_id"])
+
+
+def markCrabAsBorrowed(crab: CrabForLending) -> None:
+    """
+    Forget the given crab, which has just been borrowed, from the
+    tavern book, from the stored listing and from the cached listings
+    of the tavern
+    """
+    removeFromTavernBook(crab)
+    makeGameStore().removeCrabForLending(crab["crabada_id"])
+    makeCrabadaWeb2Client().invalidateCrabsForLending()
@@ -2,13 +2,15 @@ from typing import List
 from src.common.types import TeamTask
 from src.libs.CrabadaWeb2Client.types import Team
 from src.models.User import User
-from src.common.clients import makeCrabadaWeb2Client
+from src.common.clients import makeGameStore
+from src.helpers.store import asyncSyncAvailableTeams, syncAvailableTeams
 
 
 def fetchAvailableTeamsForTask(user: User, task: TeamTask) -> List[Team]:
     """
     Fetch available teams from Crabada, and return only those
-    that are supposed to perform the given task
+    that are supposed to perform the given task; the teams are read
+    from the local store, which is synced with the API only if stale
     """
 
     # Teams that are supposed to perform the given task
@@ -17,10 +19,20 @@ def fetchAvailableTeamsForTask(user: User, task: TeamTask) -> List[Team]:
     if not ids:
         return []
 
-    # Fetch list of available teams
-    availableTeams = makeCrabadaWeb2Client().listTeams(
-        user.address, {"is_team_available": 1, "limit": len(ids) * 2, "page": 1}
-    )
+    syncAvailableTeams(user)
+    return makeGameStore().listAvailableTeams(ids)
 
-    # Intersect teams with the task with available teams
-    return [t for t in availableTeams if t["team_id"] in ids]
+
+async def asyncFetchAvailableTeamsForTask(user: User, task: TeamTask) -> List[Team]:
+    """
+    Same as fetchAvailableTeamsForTask, but asynchronous, so that
+    the teams of many users can be fetched concurrently
+    """
+
+    ids = [t["id"] for t in user.getTeamsByTask(task)]
+
+    if not ids:
+        return []
+
+    await asyncSyncAvailableTeams(user)
+    return makeGameStore().listAvailableTeams(ids)
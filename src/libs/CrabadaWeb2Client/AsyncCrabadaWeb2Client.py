@@ -0,0 +1,272 @@
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, List
+from eth_typing import Address
+import aiohttp
+import asyncio
+
+from src.libs.CrabadaWeb2Client.CrabadaWeb2Client import CrabadaWeb2Client
+from src.libs.CrabadaWeb2Client.types import (
+    CrabForLending,
+    Game,
+    Team,
+    CrabFromInventory,
+)
+
+
+class AsyncCrabadaWeb2Client:
+    """
+    Access the HTTP endpoints of the Crabada P2E game, asynchronously.
+
+    The client has the same surface of CrabadaWeb2Client, but each
+    method is a coroutine; all requests share the same pool of
+    keep-alive connections, so that many of them can be awaited
+    concurrently, for example with asyncio.gather().
+
+    The connection pool is bound to the event loop where it is first
+    used: use the client from a single event loop, and await close()
+    once you are done with it (or use the client as an async context
+    manager).
+
+    Attributes
+    ----------------------
+    poolSize: int = 10 | Max number of simultaneous connections (optional)
+    timeout: float = 10 | Timeout in seconds for each request (optional)
+    """
+
+    baseUri = CrabadaWeb2Client.baseUri
+    browserHeaders = CrabadaWeb2Client.browserHeaders
+
+    def __init__(self, poolSize: int = 10, timeout: float = 10) -> None:
+        self.poolSize: int = poolSize
+        self.timeout: float = timeout
+        self.session: aiohttp.ClientSession = None
+
+    async def __aenter__(self) -> "AsyncCrabadaWeb2Client":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def getSession(self) -> aiohttp.ClientSession:
+        """
+        Return the session of the client, creating it if needed;
+        must be called from within a running event loop
+        """
+        if not self.session or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.poolSize),
+                headers=self.browserHeaders,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    async def close(self) -> None:
+        """
+        Close the connection pool
+        """
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+    async def get(self, url: str, params: dict[str, Any] = {}) -> Any:
+        """
+        Make a GET request using the client's session and return
+        the decoded JSON response
+        """
+        async with self.getSession().get(
+            url, params=self.stringifyParams(params)
+        ) as response:
+            return await response.json(content_type=None)
+
+    async def getMine(self, mineId: int, params: dict[str, Any] = {}) -> Game:
+        """Get information from the given mine"""
+        res = await self.getMine_Raw(mineId, params)
+        return res["result"]
+
+    async def getMine_Raw(self, mineId: int, params: dict[str, Any] = {}) -> Any:
+        url = self.baseUri + "/mine/" + str(mineId)
+        return await self.get(url, params)
+
+    async def listMines(self, params: dict[str, Any] = {}) -> List[Game]:
+        """
+        Get all mines; see CrabadaWeb2Client.listMines() for
+        the parameters.
+        """
+        res = await self.listMines_Raw(params)
+        try:
+            return res["result"]["data"] or []
+        except:
+            return []
+
+    async def listMines_Raw(self, params: dict[str, Any] = {}) -> Any:
+        url = self.baseUri + "/mines"
+        defaultParams: dict[str, Any] = {"limit": 5, "page": 1}
+        actualParams = defaultParams | params
+        return await self.get(url, actualParams)
+
+    def iterMines(
+        self,
+        params: dict[str, Any] = {},
+        until: Callable[[Game], bool] = None,
+        pageSize: int = 100,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Game]:
+        """
+        Iterate asynchronously over the mines matching the given params,
+        across all pages; see iterPages() for the meaning of the arguments.
+        """
+        return self.iterPages(
+            lambda page: self.listMines_Raw(params | {"limit": pageSize, "page": page}),
+            until,
+            prefetch,
+        )
+
+    async def listTeams(
+        self, userAddress: Address, params: dict[str, Any] = {}
+    ) -> List[Team]:
+        """
+        Get all teams of a given user address; see
+        CrabadaWeb2Client.listTeams() for the parameters.
+        """
+        res = await self.listTeams_Raw(userAddress, params)
+        try:
+            return res["result"]["data"] or []
+        except:
+            return []
+
+    async def listTeams_Raw(
+        self, userAddress: Address, params: dict[str, Any] = {}
+    ) -> Any:
+        url = self.baseUri + "/teams"
+        defaultParams: dict[str, Any] = {
+            "limit": 5,
+            "page": 1,
+        }
+        actualParams = defaultParams | params
+        actualParams["user_address"] = userAddress
+        return await self.get(url, actualParams)
+
+    def iterTeams(
+        self,
+        userAddress: Address,
+        params: dict[str, Any] = {},
+        until: Callable[[Team], bool] = None,
+        pageSize: int = 100,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Team]:
+        """
+        Iterate asynchronously over the teams of the given user address,
+        across all pages; see iterPages() for the meaning of the arguments.
+        """
+        return self.iterPages(
+            lambda page: self.listTeams_Raw(
+                userAddress, params | {"limit": pageSize, "page": page}
+            ),
+            until,
+            prefetch,
+        )
+
+    async def listCrabsForLending(
+        self, params: dict[str, Any] = {}
+    ) -> List[CrabForLending]:
+        """
+        Get all crabs available for lending as reinforcements; see
+        CrabadaWeb2Client.listCrabsForLending() for the parameters.
+        """
+        res = await self.listCrabsForLending_Raw(params)
+        try:
+            return res["result"]["data"] or []
+        except:
+            return []
+
+    async def listCrabsForLending_Raw(self, params: dict[str, Any] = {}) -> Any:
+        url = self.baseUri + "/crabadas/lending"
+        defaultParams: dict[str, Any] = {
+            "limit": 10,
+            "page": 1,
+            "orderBy": "price",
+            "order": "asc",
+        }
+        actualParams = defaultParams | params
+        return await self.get(url, actualParams)
+
+    def iterCrabsForLending(
+        self,
+        params: dict[str, Any] = {},
+        until: Callable[[CrabForLending], bool] = None,
+        pageSize: int = 100,
+        prefetch: int = 1,
+    ) -> AsyncIterator[CrabForLending]:
+        """
+        Iterate asynchronously over the crabs available for lending,
+        across all pages; see iterPages() for the meaning of the arguments.
+        """
+        return self.iterPages(
+            lambda page: self.listCrabsForLending_Raw(
+                params | {"limit": pageSize, "page": page}
+            ),
+            until,
+            prefetch,
+        )
+
+    async def listCrabsFromInventory(
+        self, userAddress: Address, params: dict[str, Any] = {}
+    ) -> List[CrabFromInventory]:
+        """
+        Get all crabs available as reinforcements from the user's
+        own inventory.
+        """
+        res = await self.listCrabsFromInventory_Raw(userAddress, params)
+        try:
+            return res["result"]["data"] or []
+        except:
+            return []
+
+    async def listCrabsFromInventory_Raw(
+        self, userAddress: Address, params: dict[str, Any] = {}
+    ) -> Any:
+        url = self.baseUri + "/crabadas/can-join-team"
+        actualParams = params | {"user_address": userAddress}
+        return await self.get(url, actualParams)
+
+    async def iterPages(
+        self,
+        fetchPage: Callable[[int], Awaitable[Any]],
+        until: Callable[[Any], bool] = None,
+        prefetch: int = 1,
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate asynchronously over the items of a paginated list
+        endpoint, following the 'totalPages' field of the response.
+
+        Works like CrabadaWeb2Client.iterPages(): the following pages
+        are fetched concurrently, with at most 'prefetch' requests in
+        flight, while the caller processes the current one.
+        """
+        response = await fetchPage(1)
+        totalPages = CrabadaWeb2Client.getTotalPages(response)
+        nextPage = 2
+        pending: Deque[asyncio.Task[Any]] = deque()
+
+        try:
+            while True:
+                while nextPage <= totalPages and len(pending) < max(1, prefetch):
+                    pending.append(asyncio.ensure_future(fetchPage(nextPage)))
+                    nextPage += 1
+                for item in CrabadaWeb2Client.getPageData(response):
+                    yield item
+                    if until and until(item):
+                        return
+                if not pending:
+                    return
+                response = await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    def stringifyParams(params: dict[str, Any]) -> dict[str, str]:
+        """
+        Contrary to requests, aiohttp accepts only strings as query
+        values, so we need to cast them
+        """
+        return {k: str(v) for k, v in params.items() if v is not None}
@@ -1,9 +1,13 @@
-from typing import Any, List, cast
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterator, List, cast
 from eth_typing import Address
 import requests
+from requests.adapters import HTTPAdapter
 from src.helpers.general import firstOrNone, secondOrNone
 from web3.types import Wei
 
+from src.libs.CrabadaWeb2Client.ResponseCache import ResponseCache
 from src.libs.CrabadaWeb2Client.types import (
     CrabForLending,
     Game,
@@ -20,6 +24,26 @@ class CrabadaWeb2Client:
     in order to get the full JSON response. By default it is false,
     which means you only get the data contained in the response (a
     list for list endpoints, a dict for specific endpoints)
+
+    List endpoints return a single page of results; to go through
+    all pages, use the 'iter' methods (iterMines, iterTeams, etc),
+    which fetch the pages on demand.
+
+    Requests are made through a pooled, keep-alive HTTP session owned
+    by the client, so that consecutive calls reuse the same TCP+TLS
+    connection to the server; for this reason, prefer sharing a single
+    instance of the client rather than creating a new one for each
+    call (see makeCrabadaWeb2Client() in src/common/clients.py).
+
+    Optionally, responses can be cached for a short time by passing a
+    ResponseCache; this is useful for the tavern, which is queried
+    over and over again while looking for reinforcements.
+
+    Attributes
+    ----------------------
+    poolSize: int = 10 | Max number of connections to keep alive (optional)
+    timeout: float = 10 | Timeout in seconds for each request (optional)
+    cache: ResponseCache = None | Cache for the responses (optional)
     """
 
     baseUri = "https://idle-api.crabada.com/public/idle"
@@ -37,8 +61,58 @@ class CrabadaWeb2Client:
         "sec-fetch-site": "same-site",
         "sec-gpc": "1",
         "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.79 Safari/537.36",
+        "accept-encoding": "gzip, deflate",
+        "connection": "keep-alive",
     }
 
+    def __init__(
+        self, poolSize: int = 10, timeout: float = 10, cache: ResponseCache = None
+    ) -> None:
+        self.poolSize: int = poolSize
+        self.timeout: float = timeout
+        self.cache: ResponseCache = cache
+        self.session: requests.Session = self.makeSession(poolSize)
+
+    def makeSession(self, poolSize: int) -> requests.Session:
+        """
+        Return an HTTP session that keeps up to poolSize connections
+        alive, and that sends the browser headers with each request
+        """
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=poolSize)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.browserHeaders)
+        return session
+
+    def get(self, url: str, params: dict[str, Any] = {}) -> Any:
+        """
+        Make a GET request using the client's session and return
+        the decoded JSON response; if the endpoint is cached, the
+        response might come from the cache
+        """
+        path = url.removeprefix(self.baseUri)
+        if not self.cache or not self.cache.isCacheable(path):
+            return self.session.get(url, params=params, timeout=self.timeout).json()
+
+        cached = self.cache.get(path, params)
+        if cached is not None:
+            return cached
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        decoded = response.json()
+        if response.ok:
+            self.cache.set(path, params, decoded)
+        return decoded
+
+    def invalidateCache(self, path: str = None) -> None:
+        """
+        Forget the cached responses of the given endpoint path
+        (e.g. "/crabadas/lending"), or of all endpoints if no path
+        is given
+        """
+        if self.cache:
+            self.cache.invalidate(path)
+
     def getMine(self, mineId: int, params: dict[str, Any] = {}) -> Game:
         """Get information from the given mine"""
         res = self.getMine_Raw(mineId, params)
@@ -46,7 +120,7 @@ class CrabadaWeb2Client:
 
     def getMine_Raw(self, mineId: int, params: dict[str, Any] = {}) -> Any:
         url = self.baseUri + "/mine/" + str(mineId)
-        return requests.get(url, headers=self.browserHeaders, params=params).json()
+        return self.get(url, params)
 
     def listMines(self, params: dict[str, Any] = {}) -> List[Game]:
         """
@@ -107,12 +181,24 @@ class CrabadaWeb2Client:
         url = self.baseUri + "/mines"
         defaultParams: dict[str, Any] = {"limit": 5, "page": 1}
         actualParams = defaultParams | params
-        response = requests.get(
-            url,
-            headers=self.browserHeaders,
-            params=actualParams,
+        return self.get(url, actualParams)
+
+    def iterMines(
+        self,
+        params: dict[str, Any] = {},
+        until: Callable[[Game], bool] = None,
+        pageSize: int = 100,
+        prefetch: int = 1,
+    ) -> Iterator[Game]:
+        """
+        Iterate over the mines matching the given params, across all
+        pages; see iterPages() for the meaning of the arguments.
+        """
+        return self.iterPages(
+            lambda page: self.listMines_Raw(params | {"limit": pageSize, "page": page}),
+            until,
+            prefetch,
         )
-        return response.json()
 
     def getTeam(self) -> None:
         raise Exception("The team route does not exit on the server!")
@@ -151,9 +237,27 @@ class CrabadaWeb2Client:
         }
         actualParams = defaultParams | params
         actualParams["user_address"] = userAddress
-        return requests.get(
-            url, headers=self.browserHeaders, params=actualParams
-        ).json()
+        return self.get(url, actualParams)
+
+    def iterTeams(
+        self,
+        userAddress: Address,
+        params: dict[str, Any] = {},
+        until: Callable[[Team], bool] = None,
+        pageSize: int = 100,
+        prefetch: int = 1,
+    ) -> Iterator[Team]:
+        """
+        Iterate over the teams of the given user address, across all
+        pages; see iterPages() for the meaning of the arguments.
+        """
+        return self.iterPages(
+            lambda page: self.listTeams_Raw(
+                userAddress, params | {"limit": pageSize, "page": page}
+            ),
+            until,
+            prefetch,
+        )
 
     def listCrabsForLending(self, params: dict[str, Any] = {}) -> List[CrabForLending]:
         """
@@ -202,9 +306,33 @@ class CrabadaWeb2Client:
             "order": "asc",
         }
         actualParams = defaultParams | params
-        return requests.get(
-            url, headers=self.browserHeaders, params=actualParams
-        ).json()
+        return self.get(url, actualParams)
+
+    def invalidateCrabsForLending(self) -> None:
+        """
+        Forget the cached listings of the tavern; call it after borrowing
+        a crab, so that the next query will not return it
+        """
+        self.invalidateCache("/crabadas/lending")
+
+    def iterCrabsForLending(
+        self,
+        params: dict[str, Any] = {},
+        until: Callable[[CrabForLending], bool] = None,
+        pageSize: int = 100,
+        prefetch: int = 1,
+    ) -> Iterator[CrabForLending]:
+        """
+        Iterate over the crabs available for lending, across all
+        pages; see iterPages() for the meaning of the arguments.
+        """
+        return self.iterPages(
+            lambda page: self.listCrabsForLending_Raw(
+                params | {"limit": pageSize, "page": page}
+            ),
+            until,
+            prefetch,
+        )
 
     def listCrabsFromInventory(
         self, userAddress: Address, params: dict[str, Any] = {}
@@ -224,4 +352,73 @@ class CrabadaWeb2Client:
     ) -> Any:
         url = self.baseUri + "/crabadas/can-join-team"
         params["user_address"] = userAddress
-        return requests.get(url, headers=self.browserHeaders, params=params).json()
+        return self.get(url, params)
+
+    def iterPages(
+        self,
+        fetchPage: Callable[[int], Any],
+        until: Callable[[Any], bool] = None,
+        prefetch: int = 1,
+    ) -> Iterator[Any]:
+        """
+        Iterate over the items of a paginated list endpoint, following
+        the 'totalPages' field of the response.
+
+        While the caller processes the items of a page, the following
+        pages are fetched in the background, with at most 'prefetch'
+        requests in flight at the same time.
+
+        The iteration stops after the last page, after the first item
+        for which until(item) is true, or as soon as the caller stops
+        consuming the iterator.
+
+        :param fetchPage: Function that returns the raw response for the
+        given page number, starting from 1
+        :param until: Optional predicate that ends the iteration early
+        :param prefetch: Max number of pages to fetch ahead of the caller
+        """
+        firstPage = fetchPage(1)
+        totalPages = self.getTotalPages(firstPage)
+        nextPage = 2
+        pending: Deque[Future[Any]] = deque()
+
+        with ThreadPoolExecutor(max_workers=max(1, prefetch)) as executor:
+            try:
+                response = firstPage
+                while True:
+                    # Keep the next pages coming while the caller is busy
+                    while nextPage <= totalPages and len(pending) < max(1, prefetch):
+                        pending.append(executor.submit(fetchPage, nextPage))
+                        nextPage += 1
+                    for item in self.getPageData(response):
+                        yield item
+                        if until and until(item):
+                            return
+                    if not pending:
+                        return
+                    response = pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def getPageData(response: Any) -> List[Any]:
+        """
+        Return the list of items in the raw response of a list
+        endpoint, or an empty list if there are none
+        """
+        try:
+            return response["result"]["data"] or []
+        except:
+            return []
+
+    @staticmethod
+    def getTotalPages(response: Any) -> int:
+        """
+        Return the number of pages available for the query made
+        to a list endpoint, based on its raw response
+        """
+        try:
+            return int(response["result"]["totalPages"] or 1)
+        except:
+            return 1
@@ -0,0 +1,352 @@
+import json
+import os
+import sqlite3
+from threading import Lock
+from time import time
+from typing import Any, Iterable, List, Literal
+from eth_typing import Address
+from src.helpers.price import weiToTus
+from src.libs.CrabadaWeb2Client.types import CrabForLending, Game, GameProcess, Team
+
+
+class GameStore:
+    """
+    Local SQLite store of games, available teams and crabs for lending,
+    as returned by the Crabada API, so that they do not need to be
+    fetched again by each script.
+
+    Each row holds the full JSON returned by the API, plus the columns
+    needed to query it with an index; the process of each game is kept
+    in its own table, one row per action.
+
+    The store also records when each piece of data was last synced
+    from the API (see markSynced and isFresh), so that callers can
+    decide whether they need to sync it again.
+
+    The database runs in WAL mode, so that several scripts can read it
+    while another one writes to it.
+
+    Attributes
+    ----------------------
+    filePath: str | Path of the SQLite database; use ":memory:" for a throwaway store
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS games (
+            game_id INTEGER PRIMARY KEY,
+            team_id INTEGER,
+            attack_team_id INTEGER,
+            owner TEXT,
+            attack_team_owner TEXT,
+            status TEXT,
+            end_time INTEGER,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS games_team ON games (team_id, status);
+        CREATE INDEX IF NOT EXISTS games_attack_team ON games (attack_team_id, status);
+        CREATE INDEX IF NOT EXISTS games_owner ON games (owner, status);
+        CREATE INDEX IF NOT EXISTS games_attack_owner ON games (attack_team_owner, status);
+
+        CREATE TABLE IF NOT EXISTS game_processes (
+            game_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            transaction_time INTEGER NOT NULL,
+            PRIMARY KEY (game_id, position)
+        );
+
+        CREATE TABLE IF NOT EXISTS available_teams (
+            team_id INTEGER PRIMARY KEY,
+            owner TEXT NOT NULL,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS available_teams_owner ON available_teams (owner);
+
+        CREATE TABLE IF NOT EXISTS crabs_for_lending (
+            crabada_id INTEGER PRIMARY KEY,
+            price_in_tus REAL NOT NULL,
+            battle_point INTEGER,
+            mine_point INTEGER,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS crabs_for_lending_price ON crabs_for_lending (price_in_tus);
+
+        CREATE TABLE IF NOT EXISTS sync_cursors (
+            name TEXT PRIMARY KEY,
+            synced_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, filePath: str) -> None:
+        self.filePath: str = filePath
+        if filePath != ":memory:":
+            os.makedirs(os.path.dirname(filePath) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(filePath, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = Lock()
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(self.schema)
+
+    ####################
+    # Games
+    ####################
+
+    def upsertGames(self, games: Iterable[Game]) -> None:
+        """
+        Insert the given games, or replace them if already stored,
+        together with their process
+        """
+        now = time()
+        with self.lock, self.connection:
+            for g in games:
+                self.connection.execute(
+                    "REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        g["game_id"],
+                        g.get("team_id"),
+                        g.get("attack_team_id"),
+                        self.normalizeAddress(g.get("owner")),
+                        self.normalizeAddress(g.get("attack_team_owner")),
+                        g.get("status"),
+                        g.get("end_time"),
+                        json.dumps({k: v for (k, v) in g.items() if k != "process"}),
+                        now,
+                    ),
+                )
+                self.connection.execute(
+                    "DELETE FROM game_processes WHERE game_id = ?", (g["game_id"],)
+                )
+                self.connection.executemany(
+                    "INSERT INTO game_processes VALUES (?, ?, ?, ?)",
+                    [
+                        (g["game_id"], i, p["action"], p["transaction_time"])
+                        for (i, p) in enumerate(g.get("process") or [])
+                    ],
+                )
+
+    def closeGamesExcept(
+        self,
+        keepGameIds: Iterable[int],
+        teamIds: Iterable[int],
+        teamKey: Literal["team_id", "attack_team_id"],
+    ) -> int:
+        """
+        Mark as closed the open games of the given teams that are not
+        among the given ones, e.g. because the API does not list them as
+        open anymore; return the number of games closed
+        """
+        (teamIds, keepGameIds) = (list(teamIds), list(keepGameIds))
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                f"""UPDATE games
+                    SET status = 'close',
+                        data = json_set(data, '$.status', 'close'),
+                        updated_at = ?
+                    WHERE status = 'open'
+                    AND {teamKey} IN ({self.placeholders(teamIds)})
+                    AND game_id NOT IN ({self.placeholders(keepGameIds)})""",
+                [time(), *teamIds, *keepGameIds],
+            )
+            return cursor.rowcount
+
+    def getGame(self, gameId: int) -> Game:
+        """
+        Return the stored game with the given ID, or None
+        """
+        games = self.queryGames("game_id = ?", [gameId])
+        return games[0] if games else None
+
+    def listOpenGamesOfTeams(
+        self, teamIds: Iterable[int], teamKey: Literal["team_id", "attack_team_id"]
+    ) -> List[Game]:
+        """
+        Return the open games played by the given teams, where teamKey
+        is either 'team_id' for mines or 'attack_team_id' for loots
+        """
+        teamIds = list(teamIds)
+        return self.queryGames(
+            f"status = 'open' AND {teamKey} IN ({self.placeholders(teamIds)})",
+            teamIds,
+        )
+
+    def queryGames(self, where: str, params: List[Any]) -> List[Game]:
+        """
+        Return the stored games matching the given SQL condition,
+        ordered by game ID
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT game_id, data FROM games WHERE {where} ORDER BY game_id",
+                params,
+            ).fetchall()
+            processes = self.getProcesses([r["game_id"] for r in rows])
+        return [
+            json.loads(r["data"]) | {"process": processes.get(r["game_id"], [])}
+            for r in rows
+        ]
+
+    def getProcesses(self, gameIds: List[int]) -> dict[int, List[GameProcess]]:
+        """
+        Return the process of the given games, by game ID; call with
+        the lock held
+        """
+        rows = self.connection.execute(
+            f"""SELECT * FROM game_processes
+                WHERE game_id IN ({self.placeholders(gameIds)})
+                ORDER BY game_id, position""",
+            gameIds,
+        ).fetchall()
+        processes: dict[int, List[GameProcess]] = {}
+        for r in rows:
+            processes.setdefault(r["game_id"], []).append(
+                {"action": r["action"], "transaction_time": r["transaction_time"]}
+            )
+        return processes
+
+    ####################
+    # Teams
+    ####################
+
+    def replaceAvailableTeams(self, owner: Address, teams: Iterable[Team]) -> None:
+        """
+        Replace the stored available teams of the given user with the
+        given ones, i.e. the teams the API lists as available
+        """
+        now = time()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM available_teams WHERE owner = ?",
+                (self.normalizeAddress(owner),),
+            )
+            self.connection.executemany(
+                "REPLACE INTO available_teams VALUES (?, ?, ?, ?)",
+                [
+                    (t["team_id"], self.normalizeAddress(owner), json.dumps(t), now)
+                    for t in teams
+                ],
+            )
+
+    def listAvailableTeams(self, teamIds: Iterable[int]) -> List[Team]:
+        """
+        Return the stored available teams with the given IDs
+        """
+        teamIds = list(teamIds)
+        with self.lock:
+            rows = self.connection.execute(
+                f"""SELECT data FROM available_teams
+                    WHERE team_id IN ({self.placeholders(teamIds)})
+                    ORDER BY team_id""",
+                teamIds,
+            ).fetchall()
+        return [json.loads(r["data"]) for r in rows]
+
+    ####################
+    # Crabs for lending
+    ####################
+
+    def replaceCrabsForLending(self, crabs: Iterable[CrabForLending]) -> None:
+        """
+        Replace the stored tavern listing with the given crabs; the
+        price is indexed in TUS, as prices in wei do not fit in an
+        SQLite integer
+        """
+        now = time()
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM crabs_for_lending")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO crabs_for_lending VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        c["crabada_id"],
+                        float(weiToTus(c["price"])),
+                        c.get("battle_point"),
+                        c.get("mine_point"),
+                        json.dumps(c),
+                        now,
+                    )
+                    for c in crabs
+                ],
+            )
+
+    def listCrabsForLending(self, limit: int = None) -> List[CrabForLending]:
+        """
+        Return the stored tavern listing, cheapest crabs first; return
+        at most 'limit' crabs, if given
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT data FROM crabs_for_lending ORDER BY price_in_tus LIMIT ?",
+                (-1 if limit is None else limit,),
+            ).fetchall()
+        return [json.loads(r["data"]) for r in rows]
+
+    def removeCrabForLending(self, crabId: int) -> None:
+        """
+        Remove the given crab from the stored tavern listing, e.g.
+        because it was just borrowed
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM crabs_for_lending WHERE crabada_id = ?", (crabId,)
+            )
+
+    ####################
+    # Sync cursors
+    ####################
+
+    def markSynced(self, name: str, syncedAt: float = None) -> None:
+        """
+        Record that the data with the given name (e.g. the open games
+        of a user) has just been synced from the API
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "REPLACE INTO sync_cursors VALUES (?, ?)",
+                (name, time() if syncedAt is None else syncedAt),
+            )
+
+    def getSyncedAt(self, name: str) -> float:
+        """
+        Return when the data with the given name was last synced, or
+        None if it never was
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT synced_at FROM sync_cursors WHERE name = ?", (name,)
+            ).fetchone()
+        return row["synced_at"] if row else None
+
+    def isFresh(self, name: str, maxAgeInSeconds: float) -> bool:
+        """
+        Whether the data with the given name was synced less than
+        maxAgeInSeconds ago
+        """
+        syncedAt = self.getSyncedAt(name)
+        return syncedAt is not None and time() - syncedAt < maxAgeInSeconds
+
+    def invalidate(self, name: str) -> None:
+        """
+        Forget when the data with the given name was synced, so that
+        it will be synced again on next use
+        """
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM sync_cursors WHERE name = ?", (name,))
+
+    ####################
+    # Utils
+    ####################
+
+    @staticmethod
+    def placeholders(values: List[Any]) -> str:
+        return ", ".join("?" for _ in values)
+
+    @staticmethod
+    def normalizeAddress(address: Any) -> Any:
+        """
+        The API is not consistent with the case of addresses
+        """
+        return address.lower() if isinstance(address, str) else address
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+from copy import deepcopy
+from threading import Lock
+from time import monotonic
+from typing import Any, Tuple
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class ResponseCache:
+    """
+    Short-lived, size-bounded cache for the responses of the Crabada
+    HTTP endpoints.
+
+    Only the endpoints listed in 'ttls' are cached, each for its own
+    number of seconds; the key of an entry is the endpoint path together
+    with its normalised query params, so that the same query made with
+    params in a different order, or with a number instead of a string,
+    hits the same entry.
+
+    When the cache is full, the least recently used entry is evicted.
+    Call invalidate() whenever you know that a cached response has gone
+    stale, e.g. after borrowing a crab from the tavern.
+
+    Attributes
+    ----------------------
+    ttls: dict[str, float] | Seconds to cache each endpoint for, keyed by path (e.g. "/crabadas/lending")
+    maxSize: int = 256 | Max number of responses to keep (optional)
+    """
+
+    def __init__(self, ttls: dict[str, float], maxSize: int = 256) -> None:
+        self.ttls: dict[str, float] = ttls
+        self.maxSize: int = maxSize
+        self.entries: OrderedDict[CacheKey, Tuple[float, Any]] = OrderedDict()
+        self.lock = Lock()
+
+    def isCacheable(self, path: str) -> bool:
+        """
+        Whether responses from the given endpoint are cached at all
+        """
+        return self.ttls.get(path, 0) > 0
+
+    def get(self, path: str, params: dict[str, Any]) -> Any:
+        """
+        Return a copy of the cached response for the given query, or
+        None if there is no fresh response in the cache
+        """
+        key = self.makeKey(path, params)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            (expiresAt, response) = entry
+            if monotonic() >= expiresAt:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        return deepcopy(response)
+
+    def set(self, path: str, params: dict[str, Any], response: Any) -> None:
+        """
+        Store the response to the given query, if its endpoint is
+        cacheable
+        """
+        if not self.isCacheable(path):
+            return
+        key = self.makeKey(path, params)
+        expiresAt = monotonic() + self.ttls[path]
+        with self.lock:
+            self.entries[key] = (expiresAt, deepcopy(response))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxSize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, path: str = None) -> None:
+        """
+        Drop the cached responses of the given endpoint, or of all
+        endpoints if no path is given
+        """
+        with self.lock:
+            if path is None:
+                self.entries.clear()
+                return
+            for key in [k for k in self.entries if k[0] == path]:
+                del self.entries[key]
+
+    @staticmethod
+    def makeKey(path: str, params: dict[str, Any]) -> CacheKey:
+        """
+        Normalise the query params into a hashable key: params are
+        sorted by name, values are cast to string and empty values
+        are dropped, just like they would be in the query string
+        """
+        return (
+            path,
+            tuple(sorted((str(k), str(v)) for k, v in params.items() if v is not None)),
+        )
@@ -0,0 +1,124 @@
+from bisect import bisect_left, insort
+from typing import Iterable, Iterator, List, Literal, Tuple
+from web3.types import Wei
+
+from src.libs.CrabadaWeb2Client.types import CrabForLending
+
+TavernStat = Literal["price", "battle_point", "mine_point"]
+IndexKey = Tuple[int, int, int]
+
+
+class TavernBook:
+    """
+    In-memory order book of the crabs available for lending, built
+    from one or more pages of CrabadaWeb2Client.listCrabsForLending().
+
+    The book keeps a sorted index for each of price, battle_point and
+    mine_point, so that strategies can ask for the best crabs by a
+    given stat without re-sorting the tavern on each call. Crabs can
+    be removed from the book as soon as they are borrowed or found to
+    be unusable.
+
+    The best crabs by price are the cheapest ones; the best crabs by
+    battle_point or mine_point are those with the highest stat, and,
+    among crabs with the same stat, the cheapest ones.
+    """
+
+    stats: Tuple[TavernStat, ...] = ("price", "battle_point", "mine_point")
+
+    def __init__(self, crabs: Iterable[CrabForLending] = []) -> None:
+        self.crabs: dict[int, CrabForLending] = {}
+        self.indexes: dict[TavernStat, List[IndexKey]] = {s: [] for s in self.stats}
+        self.addCrabs(crabs)
+
+    def __len__(self) -> int:
+        return len(self.crabs)
+
+    def __contains__(self, crabId: int) -> bool:
+        return crabId in self.crabs
+
+    def addCrabs(self, crabs: Iterable[CrabForLending]) -> None:
+        """
+        Add the given crabs to the book; a crab that is already in
+        the book is replaced with the newer listing
+        """
+        for crab in crabs:
+            self.removeCrab(crab["crabada_id"])
+            self.crabs[crab["crabada_id"]] = crab
+            for stat in self.stats:
+                insort(self.indexes[stat], self.makeKey(stat, crab))
+
+    def removeCrab(self, crabId: int) -> CrabForLending:
+        """
+        Remove the crab with the given ID from the book and return
+        it; return None if the crab is not in the book
+        """
+        crab = self.crabs.pop(crabId, None)
+        if crab is None:
+            return None
+        for stat in self.stats:
+            index = self.indexes[stat]
+            del index[bisect_left(index, self.makeKey(stat, crab))]
+        return crab
+
+    def removeCrabs(self, crabIds: Iterable[int]) -> None:
+        """
+        Remove from the book all crabs with the given IDs
+        """
+        for crabId in crabIds:
+            self.removeCrab(crabId)
+
+    def iterBy(
+        self, stat: TavernStat, maxPriceInWei: Wei = None
+    ) -> Iterator[CrabForLending]:
+        """
+        Iterate over the crabs in the book, best first according to
+        the given stat, skipping those that cost maxPriceInWei or more.
+        """
+        index = self.indexes[stat]
+        if stat == "price":
+            end = len(index)
+            if maxPriceInWei is not None:
+                end = bisect_left(index, (maxPriceInWei,))
+            for i in range(end):
+                yield self.crabs[index[i][2]]
+            return
+        for (_, price, crabId) in index:
+            if maxPriceInWei is None or price < maxPriceInWei:
+                yield self.crabs[crabId]
+
+    def listBy(
+        self, stat: TavernStat, maxPriceInWei: Wei = None, limit: int = None
+    ) -> List[CrabForLending]:
+        """
+        Return the best crabs according to the given stat, cheaper
+        than maxPriceInWei; return at most 'limit' crabs, if given
+        """
+        crabs: List[CrabForLending] = []
+        for crab in self.iterBy(stat, maxPriceInWei):
+            if limit is not None and len(crabs) >= limit:
+                break
+            crabs.append(crab)
+        return crabs
+
+    def nthBy(
+        self, stat: TavernStat, n: int, maxPriceInWei: Wei = None
+    ) -> CrabForLending:
+        """
+        Return the best crab according to the given stat and cheaper
+        than maxPriceInWei, skipping the first n such crabs; return
+        None if there are not enough crabs
+        """
+        for i, crab in enumerate(self.iterBy(stat, maxPriceInWei)):
+            if i == n:
+                return crab
+        return None
+
+    @staticmethod
+    def makeKey(stat: TavernStat, crab: CrabForLending) -> IndexKey:
+        """
+        Key used to sort the crabs in the index of the given stat
+        """
+        if stat == "price":
+            return (crab["price"], 0, crab["crabada_id"])
+        return (-crab[stat], crab["price"], crab["crabada_id"])
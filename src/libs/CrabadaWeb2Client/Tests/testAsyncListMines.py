@@ -0,0 +1,25 @@
+from src.common.config import users
+from src.libs.CrabadaWeb2Client.AsyncCrabadaWeb2Client import AsyncCrabadaWeb2Client
+from pprint import pprint
+import asyncio
+
+# VARS
+userAddress = users[0]["address"]
+
+# TEST FUNCTIONS
+async def test() -> None:
+    async with AsyncCrabadaWeb2Client() as client:
+        openMines, allMines = await asyncio.gather(
+            client.listMines(
+                {"limit": 3, "status": "open", "user_address": userAddress}
+            ),
+            client.listMines({"limit": 3, "user_address": userAddress}),
+        )
+    print(">>> OPEN MINES/GAMES")
+    pprint(openMines)
+    print(">>> ALL MINES/GAMES (open and closed)")
+    pprint(allMines)
+
+
+# EXECUTE
+asyncio.run(test())
@@ -0,0 +1,28 @@
+from src.common.config import users
+from src.libs.CrabadaWeb2Client.CrabadaWeb2Client import CrabadaWeb2Client
+from src.helpers.general import secondOrNone
+from sys import argv
+
+# VARS
+client = CrabadaWeb2Client()
+userAddress = users[0]["address"]
+pageSize = int(secondOrNone(argv) or 10)
+
+# TEST FUNCTIONS
+def test() -> None:
+    params = {"user_address": userAddress}
+    mines = list(client.iterMines(params, pageSize=pageSize, prefetch=2))
+    print(f">>> FETCHED {len(mines)} MINES/GAMES IN PAGES OF {pageSize}")
+    print([m["game_id"] for m in mines])
+
+
+def testUntil() -> None:
+    params = {"user_address": userAddress, "status": "open"}
+    mines = list(client.iterMines(params, until=lambda m: True, pageSize=pageSize))
+    print(">>> ONLY THE FIRST OPEN MINE/GAME")
+    print([m["game_id"] for m in mines])
+
+
+# EXECUTE
+test()
+testUntil()
@@ -0,0 +1,24 @@
+from time import perf_counter
+from src.libs.CrabadaWeb2Client.CrabadaWeb2Client import CrabadaWeb2Client
+from src.libs.CrabadaWeb2Client.ResponseCache import ResponseCache
+
+# VARS
+client = CrabadaWeb2Client(cache=ResponseCache({"/crabadas/lending": 10}))
+params = {"limit": 100, "orderBy": "price", "order": "asc"}
+
+# TEST FUNCTIONS
+def timedList() -> float:
+    start = perf_counter()
+    client.listCrabsForLending(params)
+    return perf_counter() - start
+
+
+def test() -> None:
+    print(f"First query: {timedList():.3f}s")
+    print(f"Second query (cached): {timedList():.3f}s")
+    client.invalidateCrabsForLending()
+    print(f"Third query (after invalidation): {timedList():.3f}s")
+
+
+# EXECUTE
+test()
@@ -0,0 +1,32 @@
+from typing import List
+from src.libs.CrabadaWeb2Client.CrabadaWeb2Client import CrabadaWeb2Client
+from src.libs.CrabadaWeb2Client.TavernBook import TavernBook
+from src.libs.CrabadaWeb2Client.types import CrabForLending
+from src.helpers.price import tusToWei, weiToTus
+
+# VARS
+client = CrabadaWeb2Client()
+maxPrice = tusToWei(25)
+book = TavernBook(client.listCrabsForLending({"limit": 100, "orderBy": "price"}))
+book.addCrabs(client.listCrabsForLending({"limit": 100, "orderBy": "battle_point"}))
+
+# TEST FUNCTIONS
+def printCrabs(crabs: List[CrabForLending]) -> None:
+    for c in crabs:
+        print(
+            f"  crab {c['crabada_id']}: {weiToTus(c['price'])} TUS, BP={c['battle_point']}, MP={c['mine_point']}"
+        )
+
+
+def test() -> None:
+    print(f">>> BOOK WITH {len(book)} CRABS")
+    print(">>> CHEAPEST")
+    printCrabs(book.listBy("price", limit=3))
+    print(">>> HIGHEST BP UNDER 25 TUS")
+    printCrabs(book.listBy("battle_point", maxPrice, limit=3))
+    print(">>> HIGHEST BP UNDER 25 TUS, SKIPPING THE FIRST TWO")
+    printCrabs([book.nthBy("battle_point", 2, maxPrice)])
+
+
+# EXECUTE
+test()
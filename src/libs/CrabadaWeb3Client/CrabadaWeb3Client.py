@@ -1,12 +1,16 @@
-from typing import cast
+from typing import Any, List, Union, cast
 from eth_typing import Address
 from hexbytes import HexBytes
+from web3.contract import ContractFunction
+from web3.constants import ADDRESS_ZERO
+from web3.exceptions import ContractLogicError
 from web3.types import TxParams, Wei
 from src.libs.Web3Client.Web3Client import Web3Client
 from src.libs.Web3Client.AvalancheCWeb3Client import AvalancheCWeb3Client
+from src.libs.Web3Client.ProviderPool import ProviderPool
+from src.libs.CrabadaWeb2Client.types import Game, GameProcess, Team
 from eth_typing.encoding import HexStr
 import os
-from time import sleep
 
 class CrabadaWeb3Client(AvalancheCWeb3Client):
     """
@@ -23,7 +27,7 @@ class CrabadaWeb3Client(AvalancheCWeb3Client):
 
     def __init__(
         self,
-        nodeUri: str,
+        nodeUri: Union[str, ProviderPool],
         privateKey: str = None,
         maxPriorityFeePerGasInGwei: float = 1,
         upperLimitForBaseFeeInGwei: float = float("inf"),
@@ -37,14 +41,115 @@ class CrabadaWeb3Client(AvalancheCWeb3Client):
             abi=self.abi,
         )
 
+    ####################
+    # Read
+    ####################
+
+    def getTeams(self, teamIds: List[int]) -> List[Team]:
+        """
+        Read the state of the given teams from the contract, with a
+        couple of multicalls regardless of the number of teams.
+
+        Only the fields stored on chain are filled: owner, crabs, battle
+        and time points, current game, status and, for mining teams,
+        mining times. Teams that do not exist are skipped.
+        """
+        multicall = self.getMulticall()
+        fns = self.contract.functions
+        teamInfos = multicall.call([fns.getTeamInfo(id) for id in teamIds])
+        teams = [
+            self.makeTeam(id, info)
+            for (id, info) in zip(teamIds, teamInfos)
+            if info and info[0] != ADDRESS_ZERO
+        ]
+
+        # Tell mining teams from looting teams
+        busyTeams = [t for t in teams if t["game_id"]]
+        gameInfos = multicall.call(
+            [fns.getGameBasicInfo(t["game_id"]) for t in busyTeams]
+        )
+        for (team, gameInfo) in zip(busyTeams, gameInfos):
+            if not gameInfo:
+                continue
+            (defenseTeamId, _, _, startTime, duration, _) = gameInfo
+            if defenseTeamId != team["team_id"]:
+                team["status"] = "LOOTING"
+                continue
+            team["status"] = "MINING"
+            team["game_type"] = "mining"
+            team["game_start_time"] = startTime
+            team["mine_start_time"] = startTime
+            team["mine_end_time"] = startTime + duration
+            team["game_end_time"] = startTime + duration
+        return teams
+
+    def getGames(self, gameIds: List[int]) -> List[Game]:
+        """
+        Read the state of the given games from the contract, with a
+        couple of multicalls regardless of the number of games.
+
+        Only the fields stored on chain are filled: teams and their
+        owners, points, rewards, times, status and process. Estimates
+        and crab details are left out. Games that do not exist are
+        skipped.
+
+        The contract does not record when a game was settled: settled
+        games get a 'settle' action with the time of the last action.
+        """
+        multicall = self.getMulticall()
+        fns = self.contract.functions
+        results = multicall.call(
+            [
+                fn(id)
+                for id in gameIds
+                for fn in (
+                    fns.getGameBasicInfo,
+                    fns.getGameBattleInfo,
+                    fns.getLootingStatsInfo,
+                    fns.getBattleTimePoint,
+                )
+            ]
+        )
+        games = [
+            self.makeGame(id, *results[4 * i : 4 * i + 4])
+            for (i, id) in enumerate(gameIds)
+            if all(results[4 * i : 4 * i + 4]) and results[4 * i][0] != 0
+        ]
+
+        # The owners of the teams, and whether the game is still open
+        teamIds = list(
+            {g["team_id"] for g in games}
+            | {g["attack_team_id"] for g in games if g["attack_team_id"]}
+        )
+        teamInfos = dict(
+            zip(teamIds, multicall.call([fns.getTeamInfo(id) for id in teamIds]))
+        )
+        for g in games:
+            defenseTeam = teamInfos.get(g["team_id"])
+            attackTeam = teamInfos.get(g["attack_team_id"])
+            if defenseTeam:
+                g["owner"] = defenseTeam[0]
+                g["status"] = "open" if defenseTeam[6] == g["game_id"] else "close"
+            if attackTeam:
+                g["attack_team_owner"] = attackTeam[0]
+                # The looting team is freed once the game is settled
+                if attackTeam[6] != g["game_id"]:
+                    g["process"].append({
+                        "action": "settle",
+                        "transaction_time": g["process"][-1]["transaction_time"],
+                    })
+        return games
+
+    ####################
+    # Write
+    ####################
+
     def startGame(self, teamId: int) -> HexStr:
         """
         Send crabs to mine
         """
-        tx: TxParams = self.buildContractTransaction(
-            self.contract.functions.startGame(teamId),
-        )
-        return self.signAndSendTransaction(tx)
+        contract_fn = self.contract.functions.startGame(teamId)
+        return self.simulateAndSend(contract_fn)
 
     def attack(
         self, gameId: int, teamId: int, expiredTime: int, certificate: HexBytes
@@ -52,30 +157,22 @@ class CrabadaWeb3Client(AvalancheCWeb3Client):
         """
         Attack an open mine
         """
-        tx: TxParams = self.buildContractTransaction(
-            self.contract.functions.attack(gameId, teamId, expiredTime, certificate),
-        )
-        return self.signAndSendTransaction(tx)
+        contract_fn = self.contract.functions.attack(gameId, teamId, expiredTime, certificate)
+        return self.simulateAndSend(contract_fn)
 
     def closeGame(self, gameId: int) -> HexStr:
         """
         Close mining game, claim reward & send crabs back home
         """
-        contract_fn =  self.contract.functions.closeGame(gameId)
-        contract_fn.call({'from': self.userAddress})
-
-        tx: TxParams = self.buildContractTransaction(contract_fn)
-        return self.signAndSendTransaction(tx)
+        contract_fn = self.contract.functions.closeGame(gameId)
+        return self.simulateAndSend(contract_fn)
 
     def settleGame(self, gameId: int) -> HexStr:
         """
         Close looting game, claim reward & send crabs back home
         """
         contract_fn = self.contract.functions.settleGame(gameId)
-        contract_fn.call({'from': self.userAddress})
-
-        tx: TxParams = self.buildContractTransaction(contract_fn)
-        return self.signAndSendTransaction(tx)
+        return self.simulateAndSend(contract_fn)
 
     def reinforceDefense(self, gameId: int, crabadaId: int, borrowPrice: Wei) -> HexStr:
         """
@@ -84,12 +181,7 @@ class CrabadaWeb3Client(AvalancheCWeb3Client):
         """
 
         contract_fn = self.contract.functions.reinforceDefense(gameId, crabadaId, borrowPrice)
-        contract_fn.call({'from': self.userAddress})
-        sleep(2)
-        contract_fn.call({'from': self.userAddress})
-
-        tx: TxParams = self.buildContractTransaction(contract_fn)
-        return self.signAndSendTransaction(tx)
+        return self.simulateAndSend(contract_fn)
 
     def reinforceAttack(self, gameId: int, crabadaId: int, borrowPrice: Wei) -> HexStr:
         """
@@ -98,9 +190,134 @@ class CrabadaWeb3Client(AvalancheCWeb3Client):
         """
 
         contract_fn = self.contract.functions.reinforceAttack(gameId, crabadaId, borrowPrice)
-        contract_fn.call({'from': self.userAddress})
-        sleep(2)
-        contract_fn.call({'from': self.userAddress})
+        return self.simulateAndSend(contract_fn)
+
+    ####################
+    # Decode
+    ####################
+
+    @staticmethod
+    def makeTeam(teamId: int, teamInfo: Any) -> Team:
+        """
+        Build a team from the output of getTeamInfo(); the status is
+        either AVAILABLE or, if the team is in a game, MINING
+        """
+        (owner, crab1, crab2, crab3, battlePoint, timePoint, gameId, _) = teamInfo
+        team: dict[str, Any] = {
+            "team_id": teamId,
+            "owner": owner,
+            "crabada_id_1": crab1,
+            "crabada_id_2": crab2,
+            "crabada_id_3": crab3,
+            "battle_point": battlePoint,
+            "time_point": timePoint,
+            "game_id": gameId or None,
+            "status": "MINING" if gameId else "AVAILABLE",
+        }
+        return cast(Team, team)
+
+    @staticmethod
+    def makeGame(
+        gameId: int, basicInfo: Any, battleInfo: Any, lootingStats: Any, timePoints: Any
+    ) -> Game:
+        """
+        Build a game from the output of getGameBasicInfo(),
+        getGameBattleInfo(), getLootingStatsInfo() and getBattleTimePoint().
+
+        The contract only stores the time of the last reinforcement of
+        each side: earlier reinforcements are given the time of the
+        action before them.
+        """
+        (teamId, craReward, tusReward, startTime, duration, _) = basicInfo
+        (
+            attackTeamId,
+            attackTime,
+            lastAttackTime,
+            lastDefTime,
+            attackId1,
+            attackId2,
+            defId1,
+            defId2,
+        ) = battleInfo
+        timesDefenseReinforced = bool(defId1) + bool(defId2)
+        timesAttackReinforced = bool(attackId1) + bool(attackId2)
 
-        tx: TxParams = self.buildContractTransaction(contract_fn)
+        # Reconstruct the sequence of actions: the miner reinforces
+        # first, then the looter, and so on
+        process: List[GameProcess] = [
+            {"action": "create-game", "transaction_time": startTime}
+        ]
+        if attackTeamId:
+            process.append({"action": "attack", "transaction_time": attackTime})
+        for i in range(2):
+            if i < timesDefenseReinforced:
+                isLast = i == timesDefenseReinforced - 1
+                process.append({
+                    "action": "reinforce-defense",
+                    "transaction_time": lastDefTime if isLast else process[-1]["transaction_time"],
+                })
+            if i < timesAttackReinforced:
+                isLast = i == timesAttackReinforced - 1
+                process.append({
+                    "action": "reinforce-attack",
+                    "transaction_time": lastAttackTime if isLast else process[-1]["transaction_time"],
+                })
+
+        game: dict[str, Any] = {
+            "game_id": gameId,
+            "winner_team_id": None,
+            "status": "open",
+            "team_id": teamId,
+            "owner": None,
+            "defense_crabada_number": 3 + timesDefenseReinforced,
+            "defense_point": lootingStats[1],
+            "defense_mine_point": timePoints[1],
+            "attack_team_id": attackTeamId or None,
+            "attack_team_owner": None,
+            "attack_crabada_number": 3 + timesAttackReinforced if attackTeamId else None,
+            "attack_point": lootingStats[0] if attackTeamId else None,
+            "attack_mine_point": timePoints[0] if attackTeamId else None,
+            "tus_reward": tusReward,
+            "cra_reward": craReward,
+            "start_time": startTime,
+            "end_time": startTime + duration,
+            "round": timesDefenseReinforced + timesAttackReinforced,
+            "process": process,
+        }
+        return cast(Game, game)
+
+    ####################
+    # Utils
+    ####################
+
+    def simulateAndSend(self, contract_fn: ContractFunction) -> HexStr:
+        """
+        Simulate the transaction against the pending block and, if it
+        would succeed, send it; otherwise raise a ContractLogicError
+        with the revert reason.
+
+        All the write methods go through here: when the gas limit comes
+        from the cache, web3.py does not estimate the gas, and without
+        the simulation a tx that reverts would be sent and burn gas.
+
+        The simulation takes a single round trip, which also estimates
+        the gas limit if it is not cached already; building the tx may
+        take one more, to fetch the fee history if the cached one is
+        stale, and sending it takes the last one.
+        """
+        gasLimit = None
+        if self.gasLimitCache:
+            gasLimit = self.gasLimitCache.get(contract_fn.address, contract_fn.selector)
+
+        simulation = self.simulateContractTransaction(
+            contract_fn, estimateGas=gasLimit is None
+        )
+        if not simulation["success"]:
+            raise ContractLogicError(
+                f"execution reverted: {simulation['revertReason']}"
+            )
+
+        tx: TxParams = self.buildContractTransaction(
+            contract_fn, gasLimit=gasLimit or simulation["gasEstimate"]
+        )
         return self.signAndSendTransaction(tx)
@@ -0,0 +1,26 @@
+from sys import argv
+from time import perf_counter
+from src.common.config import nodeUri
+from src.libs.CrabadaWeb3Client.CrabadaWeb3Client import CrabadaWeb3Client
+from pprint import pprint
+
+# VARS
+client = CrabadaWeb3Client(nodeUri=nodeUri)
+
+gameIds = [int(id) for id in argv[1:]] or [284549, 284550]
+
+# TEST FUNCTIONS
+def test() -> None:
+    start = perf_counter()
+    games = client.getGames(gameIds)
+    print(f">>> GAMES {gameIds} [{perf_counter() - start:.3f}s]")
+    pprint(games)
+    teamIds = [g["team_id"] for g in games]
+    start = perf_counter()
+    teams = client.getTeams(teamIds)
+    print(f">>> TEAMS {teamIds} [{perf_counter() - start:.3f}s]")
+    pprint(teams)
+
+
+# EXECUTE
+test()
@@ -0,0 +1,24 @@
+from sys import argv
+from time import perf_counter
+from src.helpers.general import secondOrNone
+from src.common.config import nodeUri, users
+from src.libs.CrabadaWeb3Client.CrabadaWeb3Client import CrabadaWeb3Client
+from pprint import pprint
+
+# VARS
+client = CrabadaWeb3Client(nodeUri=nodeUri, privateKey=users[0]["privateKey"])
+
+gameId = int(secondOrNone(argv) or 284549)
+
+# TEST FUNCTIONS
+def test() -> None:
+    start = perf_counter()
+    simulation = client.simulateContractTransaction(
+        client.contract.functions.closeGame(gameId)
+    )
+    print(f">>> SIMULATION OF closeGame({gameId}) [{perf_counter() - start:.3f}s]")
+    pprint(simulation)
+
+
+# EXECUTE
+test()
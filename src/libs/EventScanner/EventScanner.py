@@ -0,0 +1,348 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging import Logger
+from time import sleep
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Type, cast
+from eth_typing.encoding import HexStr
+from hexbytes import HexBytes
+from requests.exceptions import RequestException
+from web3._utils.events import event_abi_to_log_topic
+from web3.contract import ContractEvent
+from web3.exceptions import BlockNotFound
+from web3.types import BlockData, LogReceipt
+from src.libs.EventScanner.EventScannerState import EventScannerState
+from src.libs.EventScanner.types import ScannedEvent
+from src.libs.Web3Client.Web3Client import Web3Client
+import logging
+
+PendingChunk = Tuple[int, int, int, "Future[Tuple[List[ScannedEvent], HexStr]]"]
+"""
+Chunk being fetched: first block, last block, attempt number, future
+with the events and the hash of the last block
+"""
+
+
+class EventScanner:
+    """
+    Scan the chain for the events of a smart contract, and store them
+    in an EventScannerState, one chunk of blocks at a time.
+
+    Each chunk takes a single eth_getLogs request, with the topics of
+    all the scanned events combined in the same filter, plus a batched
+    request for the timestamps of the blocks with events.
+
+    Several chunks can be fetched at the same time (see maxConcurrency),
+    to backfill the history faster; they are committed in order anyway.
+
+    The size of the chunks adapts to the density of events: it grows
+    over quiet stretches of the chain and shrinks where events are
+    many, or when the node fails to serve the request (e.g. range too
+    large, timeout).
+
+    Each chunk is committed to the state together with the hash of its
+    last block, so that a scan can be resumed where it stopped, and
+    reorgs can be detected and rolled back (see rollbackReorg).
+
+        scanner = EventScanner(client, state)
+        scanner.run(fromBlock=12345)  # backfill, then follow the chain
+
+    Attributes
+    ----------------------
+    client: Web3Client | Client connected to the node; the events of its contract are scanned
+    state: EventScannerState | Where to store the events and the checkpoints
+    events: List[Type[ContractEvent]] = all | Events to scan; by default, all the events in the ABI (optional)
+    minChunkSize: int = 10 | Minimum number of blocks per eth_getLogs request (optional)
+    maxChunkSize: int = 2048 | Maximum number of blocks per eth_getLogs request; public Avalanche nodes do not allow more (optional)
+    targetEventsPerChunk: int = 1000 | Grow or shrink the chunks so that they contain about this many events (optional)
+    confirmations: int = 1 | Do not scan the most recent blocks, which might still be reorganized (optional)
+    maxRetries: int = 10 | How many times to retry a failed request before giving up (optional)
+    retryDelayInSeconds: float = 2 | How long to wait before retrying a failed request (optional)
+    maxConcurrency: int = 1 | How many chunks to fetch at the same time; useful to backfill quickly (optional)
+    logger: Logger = logging | Where to log the progress of the scan (optional)
+    """
+
+    blocksPerBatch: int = 100
+    """
+    Maximum number of blocks to fetch in a single batch request
+    """
+
+    maxReorgDepth: int = 256
+    """
+    How many checkpoints to check, at most, to find where a reorg
+    started
+    """
+
+    def __init__(
+        self,
+        client: Web3Client,
+        state: EventScannerState,
+        events: List[Type[ContractEvent]] = None,
+        minChunkSize: int = 10,
+        maxChunkSize: int = 2048,
+        targetEventsPerChunk: int = 1000,
+        confirmations: int = 1,
+        maxRetries: int = 10,
+        retryDelayInSeconds: float = 2,
+        maxConcurrency: int = 1,
+        logger: Logger = logging,  # type: ignore
+    ) -> None:
+        self.client: Web3Client = client
+        self.state: EventScannerState = state
+        self.events: List[Type[ContractEvent]] = events or [
+            client.contract.events[e["name"]]
+            for e in client.contract.abi
+            if e["type"] == "event"
+        ]
+        self.minChunkSize: int = minChunkSize
+        self.maxChunkSize: int = maxChunkSize
+        self.targetEventsPerChunk: int = targetEventsPerChunk
+        self.confirmations: int = confirmations
+        self.maxRetries: int = maxRetries
+        self.retryDelayInSeconds: float = retryDelayInSeconds
+        self.maxConcurrency: int = maxConcurrency
+        self.logger: Logger = logger
+        self.chunkSize: int = minChunkSize
+        self.concurrency: int = maxConcurrency
+        self.eventsByTopic: dict[HexBytes, Type[ContractEvent]] = {
+            HexBytes(
+                event_abi_to_log_topic(cast(Dict[str, Any], e._get_event_abi()))
+            ): e
+            for e in self.events
+        }
+
+    def run(
+        self,
+        fromBlock: int = None,
+        follow: bool = True,
+        pollInterval: float = 2,
+        progressCallback: Callable[[int, int, int], Any] = None,
+    ) -> None:
+        """
+        Scan from where the previous scan stopped, or from the given
+        block if nothing was scanned yet, up to the head of the chain;
+        if follow is True, keep scanning new blocks as they come, every
+        pollInterval seconds, and never return.
+        """
+        lastScannedBlock = self.state.getLastScannedBlock()
+        if lastScannedBlock is None and fromBlock is None:
+            raise ValueError("Nothing scanned yet, specify the block to start from")
+        if lastScannedBlock is None:
+            self.state.rollback(fromBlock - 1)
+
+        while True:
+            self.rollbackReorg()
+            startBlock = self.state.getLastScannedBlock() + 1
+            endBlock = self.getSafeHeadBlock()
+            if startBlock <= endBlock:
+                self.scan(startBlock, endBlock, progressCallback)
+            if not follow:
+                return
+            sleep(pollInterval)
+
+    def scan(
+        self,
+        startBlock: int,
+        endBlock: int,
+        progressCallback: Callable[[int, int, int], Any] = None,
+    ) -> int:
+        """
+        Scan the given range of blocks, both included, committing each
+        chunk to the state as soon as it is scanned; return the number
+        of events found.
+
+        Up to `concurrency` chunks are fetched at the same time, over
+        disjoint ranges, but they are committed strictly in chain
+        order, so that the state never has gaps. When the node fails to
+        serve a chunk, its range is split in two and fetched again, and
+        the concurrency is halved; it then grows back by one chunk at a
+        time as requests succeed.
+
+        The progress callback, if given, is called after each chunk
+        with the range being scanned and the last block scanned.
+        """
+        nextBlock = startBlock
+        totalEvents = 0
+        successes = 0
+        pending: Deque[PendingChunk] = deque()
+        with ThreadPoolExecutor(max_workers=self.maxConcurrency) as executor:
+            while pending or nextBlock <= endBlock:
+
+                # Keep the pipeline full
+                while len(pending) < self.concurrency and nextBlock <= endBlock:
+                    toBlock = min(nextBlock + self.chunkSize - 1, endBlock)
+                    future = executor.submit(self.scanChunk, nextBlock, toBlock)
+                    pending.append((nextBlock, toBlock, 0, future))
+                    nextBlock = toBlock + 1
+
+                # Commit the oldest chunk, or split it if it failed
+                (fromBlock, toBlock, attempt, future) = pending.popleft()
+                try:
+                    (events, toBlockHash) = future.result()
+                except (ValueError, RequestException) as e:
+                    if attempt >= self.maxRetries:
+                        raise
+                    self.logger.warning(
+                        f"Error scanning blocks {fromBlock}-{toBlock}, retrying: {e}"
+                    )
+                    self.backOff()
+                    successes = 0
+                    sleep(self.retryDelayInSeconds)
+                    for (f, t) in reversed(self.splitRange(fromBlock, toBlock)):
+                        retry = executor.submit(self.scanChunk, f, t)
+                        pending.appendleft((f, t, attempt + 1, retry))
+                    continue
+
+                self.state.commitChunk(events, toBlock, toBlockHash)
+                self.logger.debug(
+                    f"Scanned blocks {fromBlock}-{toBlock}: {len(events)} events"
+                )
+                self.adaptChunkSize(len(events))
+                successes += 1
+                if successes >= self.concurrency:
+                    self.concurrency = min(self.maxConcurrency, self.concurrency + 1)
+                    successes = 0
+                totalEvents += len(events)
+                if progressCallback:
+                    progressCallback(startBlock, endBlock, toBlock)
+        return totalEvents
+
+    def scanChunk(
+        self, fromBlock: int, toBlock: int
+    ) -> Tuple[List[ScannedEvent], HexStr]:
+        """
+        Fetch and decode the events in the given range of blocks;
+        return the events and the hash of the last block
+        """
+        logs = self.getLogs(fromBlock, toBlock)
+        blocks = self.getBlocks(sorted({l["blockNumber"] for l in logs} | {toBlock}))
+        events = [self.decodeLog(l, blocks[l["blockNumber"]]) for l in logs]
+        return (events, blocks[toBlock]["hash"].hex())  # type: ignore
+
+    def getLogs(self, fromBlock: int, toBlock: int) -> List[LogReceipt]:
+        """
+        Fetch the logs of all the scanned events in the given range of
+        blocks, with a single request
+        """
+        return self.client.w3.eth.get_logs(
+            {
+                "address": self.client.contractAddress,
+                "fromBlock": fromBlock,
+                "toBlock": toBlock,
+                "topics": [[t.hex() for t in self.eventsByTopic]],  # type: ignore
+            }
+        )
+
+    def getBlocks(self, blockNumbers: List[int]) -> dict[int, BlockData]:
+        """
+        Fetch the headers of the given blocks, in batches; raise a
+        ValueError if any of them does not exist (yet)
+        """
+        blocks: dict[int, BlockData] = {}
+        for i in range(0, len(blockNumbers), self.blocksPerBatch):
+            numbers = blockNumbers[i : i + self.blocksPerBatch]
+            with self.client.batch() as batch:
+                results = [batch.getBlock(n) for n in numbers]
+            for (n, result) in zip(numbers, results):
+                block = result.get()
+                if block is None:
+                    raise ValueError(f"Block {n} not found")
+                blocks[n] = block
+        return blocks
+
+    def decodeLog(self, log: LogReceipt, block: BlockData) -> ScannedEvent:
+        """
+        Decode a raw log into an event that can be stored
+        """
+        event = self.eventsByTopic[HexBytes(log["topics"][0])]
+        decoded = event().processLog(log)
+        return {
+            "blockNumber": log["blockNumber"],
+            "blockHash": HexStr(HexBytes(log["blockHash"]).hex()),
+            "logIndex": log["logIndex"],
+            "transactionHash": HexStr(HexBytes(log["transactionHash"]).hex()),
+            "event": decoded["event"],
+            "args": {k: self.toJsonValue(v) for (k, v) in decoded["args"].items()},
+            "timestamp": block["timestamp"],
+        }
+
+    def rollbackReorg(self) -> Optional[int]:
+        """
+        Compare the stored checkpoints with the chain and, if the most
+        recent ones were orphaned by a reorg, delete the events after
+        the last checkpoint still on the chain, so that they will be
+        scanned again; return the block rolled back to, or None if
+        there was no reorg.
+        """
+        checkpoints = self.state.getCheckpoints(self.maxReorgDepth)
+        if not checkpoints:
+            return None
+        for (i, (blockNumber, blockHash)) in enumerate(checkpoints):
+            if blockHash is not None:
+                try:
+                    block = self.client.w3.eth.get_block(blockNumber)
+                except BlockNotFound:
+                    continue
+                if block["hash"].hex() != blockHash:
+                    continue
+            if i == 0:
+                return None
+            deleted = self.state.rollback(blockNumber)
+            self.logger.warning(
+                f"Reorg detected, rolled back to block {blockNumber} ({deleted} events deleted)"
+            )
+            return blockNumber
+        # The reorg is deeper than the checkpoints we have
+        blockNumber = checkpoints[-1][0] - 1
+        deleted = self.state.rollback(blockNumber)
+        self.logger.warning(
+            f"Deep reorg detected, rolled back to block {blockNumber} ({deleted} events deleted)"
+        )
+        return blockNumber
+
+    def getSafeHeadBlock(self) -> int:
+        """
+        Return the most recent block that can be scanned, taking into
+        account the confirmations
+        """
+        return self.client.w3.eth.block_number - self.confirmations
+
+    def backOff(self) -> None:
+        """
+        The node could not serve a request: halve both the chunk size
+        and the number of chunks fetched at the same time
+        """
+        self.chunkSize = max(self.minChunkSize, self.chunkSize // 2)
+        self.concurrency = max(1, self.concurrency // 2)
+
+    @staticmethod
+    def splitRange(fromBlock: int, toBlock: int) -> List[Tuple[int, int]]:
+        """
+        Split the given range of blocks in two halves, or return it as
+        it is if it is a single block
+        """
+        if fromBlock == toBlock:
+            return [(fromBlock, toBlock)]
+        middle = (fromBlock + toBlock) // 2
+        return [(fromBlock, middle), (middle + 1, toBlock)]
+
+    def adaptChunkSize(self, eventsFound: int) -> None:
+        """
+        Scale the chunk size so that the next chunk contains about
+        targetEventsPerChunk events, at most doubling or halving it
+        """
+        factor = self.targetEventsPerChunk / max(eventsFound, 1)
+        factor = min(2.0, max(0.5, factor))
+        self.chunkSize = int(
+            min(self.maxChunkSize, max(self.minChunkSize, self.chunkSize * factor))
+        )
+
+    @staticmethod
+    def toJsonValue(value: Any) -> Any:
+        """
+        Event arguments as they can be stored in JSON
+        """
+        if isinstance(value, (bytes, bytearray)):
+            return HexBytes(value).hex()
+        if isinstance(value, (list, tuple)):
+            return [EventScanner.toJsonValue(v) for v in value]
+        return value
@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+from eth_typing.encoding import HexStr
+from src.libs.EventScanner.types import ScannedEvent
+
+
+class EventScannerState(ABC):
+    """
+    Where an EventScanner stores the events it finds, and remembers
+    how far it got, so that a scan can be resumed after a crash or a
+    restart.
+
+    The scanner commits one chunk of blocks at a time, together with
+    the hash of its last block (a checkpoint); the checkpoints are used
+    to detect chain reorganizations and to roll back the events of the
+    orphaned blocks.
+    """
+
+    @abstractmethod
+    def getLastScannedBlock(self) -> Optional[int]:
+        """
+        Return the last block scanned, or None if nothing has been
+        scanned yet
+        """
+
+    @abstractmethod
+    def getCheckpoints(self, limit: int) -> List[Tuple[int, Optional[HexStr]]]:
+        """
+        Return the most recent checkpoints, as (block number, block
+        hash) tuples, most recent first; a None hash means that the
+        block is trusted without checking it
+        """
+
+    @abstractmethod
+    def commitChunk(
+        self, events: List[ScannedEvent], endBlock: int, endBlockHash: HexStr
+    ) -> None:
+        """
+        Store the events found in a chunk of blocks, and record the
+        last block of the chunk as scanned, all at once
+        """
+
+    @abstractmethod
+    def rollback(self, toBlock: int) -> int:
+        """
+        Delete the events and checkpoints after the given block, which
+        becomes the last block scanned; return the number of events
+        deleted
+        """
@@ -0,0 +1,199 @@
+import json
+import os
+import sqlite3
+from threading import Lock
+from typing import Any, List, Optional, Tuple
+from eth_typing.encoding import HexStr
+from src.libs.EventScanner.EventScannerState import EventScannerState
+from src.libs.EventScanner.types import ScannedEvent
+
+
+class SqliteEventScannerState(EventScannerState):
+    """
+    Store the events found by an EventScanner in a SQLite database,
+    in WAL mode, so that other processes can query the events while
+    the scanner writes them.
+
+    Event arguments are stored as JSON; the arguments listed in
+    indexedArgs get an index, so that getEvents() can filter on them
+    quickly (e.g. all the events of a game).
+
+    Only the most recent checkpoints are kept, enough to detect any
+    realistic reorg.
+
+    Attributes
+    ----------------------
+    filePath: str | Path of the SQLite database; use ":memory:" for a throwaway state
+    indexedArgs: List[str] = [] | Event arguments to index (optional)
+    maxCheckpoints: int = 256 | How many checkpoints to keep (optional)
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS events (
+            block_number INTEGER NOT NULL,
+            log_index INTEGER NOT NULL,
+            block_hash TEXT NOT NULL,
+            transaction_hash TEXT NOT NULL,
+            event TEXT NOT NULL,
+            args TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            PRIMARY KEY (block_number, log_index)
+        );
+        CREATE INDEX IF NOT EXISTS events_event ON events (event, block_number);
+
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            block_number INTEGER PRIMARY KEY,
+            block_hash TEXT
+        );
+    """
+
+    def __init__(
+        self, filePath: str, indexedArgs: List[str] = [], maxCheckpoints: int = 256
+    ) -> None:
+        self.filePath: str = filePath
+        self.indexedArgs: List[str] = indexedArgs
+        self.maxCheckpoints: int = maxCheckpoints
+        if filePath != ":memory:":
+            os.makedirs(os.path.dirname(filePath) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(filePath, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = Lock()
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript(self.schema)
+            for arg in indexedArgs:
+                self.connection.execute(
+                    f"""CREATE INDEX IF NOT EXISTS events_arg_{arg}
+                        ON events ({self.argExpression(arg)})"""
+                )
+
+    ####################
+    # EventScannerState
+    ####################
+
+    def getLastScannedBlock(self) -> Optional[int]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT MAX(block_number) AS n FROM checkpoints"
+            ).fetchone()
+        return row["n"]
+
+    def getCheckpoints(self, limit: int) -> List[Tuple[int, Optional[HexStr]]]:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT * FROM checkpoints ORDER BY block_number DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [(r["block_number"], r["block_hash"]) for r in rows]
+
+    def commitChunk(
+        self, events: List[ScannedEvent], endBlock: int, endBlockHash: HexStr
+    ) -> None:
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        e["blockNumber"],
+                        e["logIndex"],
+                        e["blockHash"],
+                        e["transactionHash"],
+                        e["event"],
+                        json.dumps(e["args"]),
+                        e["timestamp"],
+                    )
+                    for e in events
+                ],
+            )
+            self.connection.execute(
+                "REPLACE INTO checkpoints VALUES (?, ?)", (endBlock, endBlockHash)
+            )
+            self.connection.execute(
+                """DELETE FROM checkpoints WHERE block_number NOT IN (
+                    SELECT block_number FROM checkpoints
+                    ORDER BY block_number DESC LIMIT ?
+                )""",
+                (self.maxCheckpoints,),
+            )
+
+    def rollback(self, toBlock: int) -> int:
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM events WHERE block_number > ?", (toBlock,)
+            )
+            self.connection.execute(
+                "DELETE FROM checkpoints WHERE block_number > ?", (toBlock,)
+            )
+            self.connection.execute(
+                "INSERT OR IGNORE INTO checkpoints VALUES (?, NULL)", (toBlock,)
+            )
+            return cursor.rowcount
+
+    ####################
+    # Queries
+    ####################
+
+    def getEvents(
+        self,
+        eventNames: List[str] = None,
+        fromBlock: int = None,
+        toBlock: int = None,
+        **args: Any,
+    ) -> List[ScannedEvent]:
+        """
+        Return the stored events, in chain order, optionally filtered
+        by name, by block range and by the value of their arguments,
+        e.g. getEvents(["Fight"], gameId=123)
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        if eventNames:
+            conditions.append(f"event IN ({', '.join('?' for _ in eventNames)})")
+            params += eventNames
+        if fromBlock is not None:
+            conditions.append("block_number >= ?")
+            params.append(fromBlock)
+        if toBlock is not None:
+            conditions.append("block_number <= ?")
+            params.append(toBlock)
+        for (arg, value) in args.items():
+            conditions.append(f"{self.argExpression(arg)} = ?")
+            params.append(value)
+        where = " AND ".join(conditions) or "1"
+        with self.lock:
+            rows = self.connection.execute(
+                f"""SELECT * FROM events WHERE {where}
+                    ORDER BY block_number, log_index""",
+                params,
+            ).fetchall()
+        return [
+            {
+                "blockNumber": r["block_number"],
+                "blockHash": r["block_hash"],
+                "logIndex": r["log_index"],
+                "transactionHash": r["transaction_hash"],
+                "event": r["event"],
+                "args": json.loads(r["args"]),
+                "timestamp": r["timestamp"],
+            }
+            for r in rows
+        ]
+
+    def countEvents(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    ####################
+    # Utils
+    ####################
+
+    @staticmethod
+    def argExpression(arg: str) -> str:
+        """
+        SQL expression that extracts the given argument from the JSON
+        of an event; it must be the same in the indexes and in the
+        queries for the indexes to be used
+        """
+        if not arg.isidentifier():
+            raise ValueError(f"Invalid event argument name: {arg}")
+        return f"json_extract(args, '$.{arg}')"
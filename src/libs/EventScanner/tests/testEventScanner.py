@@ -0,0 +1,29 @@
+from sys import argv
+from src.common.clients import makeCrabadaWeb3Client
+from src.helpers.general import secondOrNone
+from src.libs.EventScanner.EventScanner import EventScanner
+from src.libs.EventScanner.SqliteEventScannerState import SqliteEventScannerState
+
+# VARS
+client = makeCrabadaWeb3Client()
+nBlocks = int(secondOrNone(argv) or 500)
+state = SqliteEventScannerState(":memory:", ["gameId"])
+scanner = EventScanner(client, state)
+
+# TEST FUNCTIONS
+def test() -> None:
+    fromBlock = client.w3.eth.block_number - nBlocks
+    print(f">>> SCAN THE LAST {nBlocks} BLOCKS")
+    scanner.run(fromBlock, follow=False)
+    events = state.getEvents()
+    print(f"Found {len(events)} events up to block {state.getLastScannedBlock()}")
+    print(f"Next chunk size: {scanner.chunkSize}")
+    if events:
+        print(">>> LAST EVENT")
+        print(events[-1])
+    print(">>> REORG CHECK")
+    print(scanner.rollbackReorg())
+
+
+# EXECUTE
+test()
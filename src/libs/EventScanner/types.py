@@ -0,0 +1,12 @@
+from typing import Any, TypedDict
+from eth_typing.encoding import HexStr
+
+
+class ScannedEvent(TypedDict):
+    blockNumber: int
+    blockHash: HexStr
+    logIndex: int
+    transactionHash: HexStr
+    event: str
+    args: dict[str, Any]
+    timestamp: int
@@ -0,0 +1,76 @@
+from time import monotonic
+from typing import Any, Callable, List
+
+
+class Digest:
+    """
+    Collect messages and send them as a single summary message.
+
+    The summary is sent when flush() is called, e.g. at the end of a
+    bot run, or when the digest is used as a context manager, on exit.
+    It is also sent as soon as it reaches maxLines messages, or when a
+    message is added more than windowInSeconds after the first one.
+
+    Attributes
+    ----------------------
+    send: Callable[[str], Any] | Function that sends the summary
+    title: str = None | First line of the summary (optional)
+    maxLines: int = 30 | Send the summary when it has this many messages (optional)
+    windowInSeconds: float = None | Send the summary when its first message is older than this (optional, default is no limit)
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Any],
+        title: str = None,
+        maxLines: int = 30,
+        windowInSeconds: float = None,
+    ) -> None:
+        self.send: Callable[[str], Any] = send
+        self.title: str = title
+        self.maxLines: int = maxLines
+        self.windowInSeconds: float = windowInSeconds
+        self.lines: List[str] = []
+        self.openedAt: float = None
+
+    def __enter__(self) -> "Digest":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def add(self, body: str) -> None:
+        """
+        Add a message to the summary, sending the summary if it is
+        full or too old
+        """
+        if not self.lines:
+            self.openedAt = monotonic()
+        self.lines.append(body)
+        if len(self.lines) >= self.maxLines or (
+            self.windowInSeconds is not None
+            and monotonic() - self.openedAt > self.windowInSeconds
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Send the messages collected so far, if any, as a single
+        summary
+        """
+        if not self.lines:
+            return
+        (lines, self.lines) = (self.lines, [])
+        self.send(self.format(lines))
+
+    def format(self, lines: List[str]) -> str:
+        """
+        Build the summary; a lone message is sent as it is
+        """
+        if len(lines) == 1 and not self.title:
+            return lines[0]
+        summary = "\n".join(f"- {line}" for line in lines)
+        return f"{self.title}\n{summary}" if self.title else summary
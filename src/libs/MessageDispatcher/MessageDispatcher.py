@@ -0,0 +1,148 @@
+import atexit
+from collections import deque
+from threading import Condition, Thread
+from time import monotonic, sleep
+from typing import Any, Callable, Deque, List, Tuple
+from logging import Logger
+import logging
+
+from src.libs.MessageDispatcher.exceptions import RateLimited
+
+
+class MessageDispatcher:
+    """
+    Send messages from a background thread, so that whoever sends
+    them never waits for the messaging service.
+
+    submit() puts the message in a bounded queue and returns at once;
+    a worker thread sends the queued messages one at a time, using the
+    given send function.
+
+    - If the queue is full, the oldest message is dropped; the next
+      message sent will mention how many were dropped.
+    - A message identical to the last one in the queue is not queued
+      again; it is sent once, with the number of repetitions.
+    - If the send function raises RateLimited, the worker waits for the
+      requested time and tries again, up to maxRetries times.
+    - When the program exits, the queue is flushed, waiting at most
+      flushTimeout seconds.
+
+    Attributes
+    ----------------------
+    send: Callable[..., Any] | Function that sends a message; it is called with the message body and options
+    maxSize: int = 100 | Max number of messages in the queue (optional)
+    maxRetries: int = 3 | Max number of times to retry a rate-limited message (optional)
+    flushTimeout: float = 10 | Max seconds to wait for the queue to be flushed on exit (optional)
+    logger: Logger = logging | Where to log the errors of the send function (optional)
+    """
+
+    def __init__(
+        self,
+        send: Callable[..., Any],
+        maxSize: int = 100,
+        maxRetries: int = 3,
+        flushTimeout: float = 10,
+        logger: Logger = logging,  # type: ignore
+    ) -> None:
+        self.send: Callable[..., Any] = send
+        self.maxSize: int = maxSize
+        self.maxRetries: int = maxRetries
+        self.flushTimeout: float = flushTimeout
+        self.logger: Logger = logger
+        self.queue: Deque[List[Any]] = deque()  # [body, options, repetitions]
+        self.condition = Condition()
+        self.busy: bool = False
+        self.dropped: int = 0
+        self.thread: Thread = None
+
+    def submit(self, body: str, **options: Any) -> bool:
+        """
+        Queue a message to be sent with the given options, without
+        waiting for it to be sent; return False if an older message had
+        to be dropped to make room for it
+        """
+        with self.condition:
+            self.startIfNeeded()
+            if self.queue and self.queue[-1][:2] == [body, options]:
+                self.queue[-1][2] += 1
+                return True
+            full = len(self.queue) >= self.maxSize
+            if full:
+                self.queue.popleft()
+                self.dropped += 1
+            self.queue.append([body, options, 1])
+            self.condition.notify()
+            return not full
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until all queued messages have been sent; return False if
+        the timeout expired first
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        with self.condition:
+            while self.queue or self.busy:
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def startIfNeeded(self) -> None:
+        """
+        Start the worker thread, unless it is already running; call
+        with the lock held
+        """
+        if self.thread:
+            return
+        self.thread = Thread(target=self.loop, daemon=True)
+        self.thread.start()
+        atexit.register(self.flush, self.flushTimeout)
+
+    def loop(self) -> None:
+        """
+        Send the queued messages, forever
+        """
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+                (body, options, repetitions) = self.queue.popleft()
+                (dropped, self.dropped) = (self.dropped, 0)
+                self.busy = True
+            try:
+                self.deliver(self.decorate(body, repetitions, dropped), options)
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
+
+    def deliver(self, body: str, options: dict[str, Any]) -> None:
+        """
+        Send a message, waiting and retrying if rate limited; errors
+        are logged, not raised
+        """
+        for attempt in range(self.maxRetries + 1):
+            try:
+                self.send(body, **options)
+                return
+            except RateLimited as e:
+                if attempt == self.maxRetries:
+                    self.logger.warning(f"Message dropped, still rate limited: {e}")
+                    return
+                sleep(e.retryAfter)
+            except Exception as e:
+                self.logger.warning(f"Message dropped, error sending it: {e}")
+                return
+
+    @staticmethod
+    def decorate(body: str, repetitions: int, dropped: int) -> str:
+        """
+        Add to the message body how many times it was repeated and how
+        many messages were dropped before it
+        """
+        if repetitions > 1:
+            body += f" (x{repetitions})"
+        if dropped:
+            body = f"[{dropped} older messages dropped]\n" + body
+        return body
@@ -0,0 +1,14 @@
+class MessageDispatcherException(Exception):
+    pass
+
+
+class RateLimited(MessageDispatcherException):
+    """
+    Raise it from the send function when the messaging service asks
+    to slow down; the message will be sent again after retryAfter
+    seconds
+    """
+
+    def __init__(self, retryAfter: float) -> None:
+        super().__init__(f"Rate limited, retry after {retryAfter} seconds")
+        self.retryAfter: float = retryAfter
@@ -0,0 +1,35 @@
+from time import perf_counter, sleep
+from src.libs.MessageDispatcher.MessageDispatcher import MessageDispatcher
+from src.libs.MessageDispatcher.exceptions import RateLimited
+
+# VARS
+sentMessages: list[str] = []
+
+
+def send(body: str) -> None:
+    sleep(0.5)  # a slow messaging service
+    if not sentMessages:
+        sentMessages.append("")  # rate limit the first attempt only
+        raise RateLimited(1)
+    sentMessages.append(body)
+    print(f"Sent: {body}")
+
+
+dispatcher = MessageDispatcher(send, maxSize=3)
+
+# TEST FUNCTIONS
+def test() -> None:
+    print(">>> SUBMIT 5 MESSAGES + 2 REPEATED, QUEUE SIZE 3")
+    start = perf_counter()
+    for i in range(5):
+        dispatcher.submit(f"Message {i}")
+    dispatcher.submit("Message 4")
+    dispatcher.submit("Message 4")
+    print(f"Submitted in {perf_counter() - start:.3f}s")
+    print(">>> FLUSH (the first message is rate limited)")
+    dispatcher.flush()
+    print(f"Flushed in {perf_counter() - start:.3f}s")
+
+
+# EXECUTE
+test()
@@ -0,0 +1,164 @@
+from heapq import heappop, heappush
+from logging import Logger
+from threading import Condition, Thread
+from time import time
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+import logging
+
+
+class DeadlineScheduler:
+    """
+    Run jobs at given timestamps.
+
+    Each job is scheduled under a key (e.g. the game ID and the kind
+    of action); scheduling a key again replaces its previous deadline,
+    so that deadlines can be updated incrementally as things change.
+
+    Deadlines are kept in a heap, so the next one is always known:
+    start() spawns a thread that sleeps exactly until the next deadline,
+    or until an earlier deadline is scheduled, and then runs the jobs
+    that are due, one at a time and in deadline order. Jobs may
+    schedule other jobs, including under their own key.
+
+    A job that raises does not stop the others: its error is logged,
+    and the scheduler goes on.
+
+    Attributes
+    ----------------------
+    clock: Callable[[], float] = time | Function returning the current timestamp (optional)
+    logger: Logger = logging | Where to log the errors raised by the jobs (optional)
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time,
+        logger: Logger = logging,  # type: ignore
+    ) -> None:
+        self.clock: Callable[[], float] = clock
+        self.logger: Logger = logger
+        self.heap: List[Tuple[float, int, Hashable]] = []
+        self.jobs: dict[Hashable, Tuple[float, int, Callable[[], Any]]] = {}
+        self.counter: int = 0
+        self.condition = Condition()
+        self.thread: Thread = None
+        self.stopped: bool = False
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.jobs
+
+    def schedule(self, key: Hashable, at: float, job: Callable[[], Any]) -> None:
+        """
+        Run the given job at the given timestamp, replacing any job
+        previously scheduled under the same key
+        """
+        with self.condition:
+            self.counter += 1
+            self.jobs[key] = (at, self.counter, job)
+            heappush(self.heap, (at, self.counter, key))
+            self.condition.notify()
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancel the job scheduled under the given key; return False if
+        there was none
+        """
+        with self.condition:
+            return self.jobs.pop(key, None) is not None
+
+    def getDeadline(self, key: Hashable) -> Optional[float]:
+        """
+        Return the deadline of the job scheduled under the given key,
+        or None if there is none
+        """
+        with self.condition:
+            entry = self.jobs.get(key)
+            return entry[0] if entry else None
+
+    def nextDeadline(self) -> Optional[float]:
+        """
+        Return the earliest deadline, or None if no job is scheduled
+        """
+        with self.condition:
+            self.dropStaleEntries()
+            return self.heap[0][0] if self.heap else None
+
+    def popDue(self, now: float = None) -> List[Tuple[Hashable, Callable[[], Any]]]:
+        """
+        Remove the jobs that are due and return them, in deadline
+        order, together with their keys
+        """
+        now = self.clock() if now is None else now
+        due: List[Tuple[Hashable, Callable[[], Any]]] = []
+        with self.condition:
+            self.dropStaleEntries()
+            while self.heap and self.heap[0][0] <= now:
+                (_, _, key) = heappop(self.heap)
+                (_, _, job) = self.jobs.pop(key)
+                due.append((key, job))
+                self.dropStaleEntries()
+        return due
+
+    def runDue(self, now: float = None) -> int:
+        """
+        Run the jobs that are due, in deadline order, logging rather
+        than raising their errors; return the number of jobs run
+        """
+        due = self.popDue(now)
+        for (key, job) in due:
+            try:
+                job()
+            except Exception as e:
+                self.logger.error(
+                    f"DeadlineScheduler: error in job with key {key}: {e}"
+                )
+        return len(due)
+
+    def start(self) -> None:
+        """
+        Run the jobs in a background thread, each at its deadline
+        """
+        self.stopped = False
+        self.thread = Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the background thread, once the running job is done
+        """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+
+    def loop(self) -> None:
+        """
+        Sleep until the next deadline, run the jobs that are due,
+        repeat
+        """
+        while True:
+            with self.condition:
+                while not self.stopped:
+                    nextDeadline = self.nextDeadline()
+                    if nextDeadline is not None and nextDeadline <= self.clock():
+                        break
+                    timeout = (
+                        None if nextDeadline is None else nextDeadline - self.clock()
+                    )
+                    self.condition.wait(timeout)
+                if self.stopped:
+                    return
+            self.runDue()
+
+    def dropStaleEntries(self) -> None:
+        """
+        Drop from the top of the heap the entries of jobs that were
+        cancelled or rescheduled; call with the lock held
+        """
+        while self.heap:
+            (_, counter, key) = self.heap[0]
+            entry = self.jobs.get(key)
+            if entry and entry[1] == counter:
+                return
+            heappop(self.heap)
@@ -0,0 +1,34 @@
+from time import sleep, time
+from src.libs.Scheduler.DeadlineScheduler import DeadlineScheduler
+
+# VARS
+scheduler = DeadlineScheduler()
+start = time()
+
+# TEST FUNCTIONS
+def report(name: str) -> None:
+    print(f"Job {name} ran after {time() - start:.3f}s")
+
+
+def fail() -> None:
+    raise ConnectionError("node down")
+
+
+def test() -> None:
+    print(">>> SCHEDULE C AT 3s, B AT 2s, A AT 1s; THEN MOVE C TO 1.5s")
+    scheduler.schedule("C", start + 3, lambda: report("C"))
+    scheduler.schedule("B", start + 2, lambda: report("B"))
+    scheduler.schedule("A", start + 1, lambda: report("A"))
+    scheduler.start()
+    scheduler.schedule("C", start + 1.5, lambda: report("C"))
+    print(">>> CANCEL B")
+    scheduler.cancel("B")
+    print(">>> D FAILS AT 2s, E STILL RUNS AT 2.5s")
+    scheduler.schedule("D", start + 2, fail)
+    scheduler.schedule("E", start + 2.5, lambda: report("E"))
+    sleep(3)
+    scheduler.stop()
+
+
+# EXECUTE
+test()
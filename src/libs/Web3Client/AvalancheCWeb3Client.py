@@ -1,5 +1,6 @@
-from typing import Any
+from typing import Any, Union
 from eth_typing import Address, HexStr
+from src.libs.Web3Client.ProviderPool import ProviderPool
 from src.libs.Web3Client.Web3Client import Web3Client
 from web3.middleware import geth_poa_middleware
 
@@ -15,7 +16,7 @@ class AvalancheCWeb3Client(Web3Client):
 
     def __init__(
         self,
-        nodeUri: str,
+        nodeUri: Union[str, ProviderPool],
         privateKey: str = None,
         maxPriorityFeePerGasInGwei: float = 1,
         upperLimitForBaseFeeInGwei: float = float("inf"),
@@ -1,7 +1,9 @@
-from typing import Any, Union
+from typing import Any, List, Union
 from eth_typing import Address, HexStr
 from web3 import Web3
+from src.libs.Web3Client.ProviderPool import ProviderPool
 from src.libs.Web3Client.Web3Client import Web3Client
+from src.libs.Web3Client.types import TokenInfo
 from web3.types import TxParams, Nonce
 import os
 
@@ -27,7 +29,7 @@ class Erc20Web3Client(Web3Client):
 
     def __init__(
         self,
-        nodeUri: str,
+        nodeUri: Union[str, ProviderPool],
         chainId: int = None,
         txType: int = 2,
         privateKey: str = None,
@@ -80,6 +82,34 @@ class Erc20Web3Client(Web3Client):
         """
         return self.contract.functions.decimals().call()
 
+    def balancesOf(self, addresses: List[Address]) -> List[int]:
+        """
+        Return the amounts held by the given addresses, fetched with
+        a single batch request
+        """
+        with self.batch() as batch:
+            results = [
+                batch.call(self.contract.functions.balanceOf(a)) for a in addresses
+            ]
+        return [r.get() for r in results]
+
+    def getTokenInfo(self) -> TokenInfo:
+        """
+        Return name, symbol, digits and total supply of the token,
+        fetched with a single batch request
+        """
+        with self.batch() as batch:
+            name = batch.call(self.contract.functions.name())
+            symbol = batch.call(self.contract.functions.symbol())
+            decimals = batch.call(self.contract.functions.decimals())
+            totalSupply = batch.call(self.contract.functions.totalSupply())
+        return {
+            "name": name.get(),
+            "symbol": symbol.get(),
+            "decimals": decimals.get(),
+            "totalSupply": totalSupply.get(),
+        }
+
     ####################
     # Write
     ####################
@@ -91,10 +121,8 @@ class Erc20Web3Client(Web3Client):
         """
 
         tx: TxParams = self.buildContractTransaction(
-            self.contract.functions.transfer(Web3.toChecksumAddress(to), amount)
+            self.contract.functions.transfer(Web3.toChecksumAddress(to), amount),
+            nonce,
         )
 
-        if nonce:
-            tx["nonce"] = nonce
-
         return self.signAndSendTransaction(tx)
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, List, Sequence
+from web3 import Web3
+from web3.types import Wei
+
+
+class FeeOracle:
+    """
+    Keep track of the base fee and of the priority fees paid on
+    chain, so that gas prices can be computed without fetching a
+    whole block for each transaction.
+
+    The oracle asks the node for the fee history of the latest block
+    (eth_feeHistory), which includes the base fee of the block and the
+    priority fees paid in it at the given percentiles; the result is
+    cached by block number and reused for maxAgeInSeconds.
+
+    If you are subscribed to new block headers, pass each header to
+    onNewHead(): the base fee will then be always up to date without
+    any extra request.
+
+    Attributes
+    ----------------------
+    w3: Web3 | Web3.py client to query
+    maxAgeInSeconds: float = 2 | For how long to reuse the fees of the latest block (optional)
+    rewardPercentiles: Sequence[float] = (10, 50, 90) | Percentiles of the priority fees to fetch (optional)
+    historySize: int = 16 | Number of blocks to keep in the cache (optional)
+    """
+
+    def __init__(
+        self,
+        w3: Web3,
+        maxAgeInSeconds: float = 2,
+        rewardPercentiles: Sequence[float] = (10, 50, 90),
+        historySize: int = 16,
+    ) -> None:
+        self.w3: Web3 = w3
+        self.maxAgeInSeconds: float = maxAgeInSeconds
+        self.rewardPercentiles: List[float] = sorted(rewardPercentiles)
+        self.historySize: int = historySize
+        self.baseFees: OrderedDict[int, Wei] = OrderedDict()
+        self.priorityFees: dict[int, List[Wei]] = {}
+        self.latestBlockNumber: int = None
+        self.updatedAt: float = 0
+        self.lock = Lock()
+
+    def getBaseFeeInWei(self, blockNumber: int = None) -> Wei:
+        """
+        Return the base fee of the given block or, if not given, of
+        the latest block
+        """
+        if blockNumber is None:
+            self.refreshIfStale()
+            blockNumber = self.latestBlockNumber
+        if blockNumber not in self.baseFees:
+            self.fetch(blockNumber)
+        return self.baseFees[blockNumber]
+
+    def getPriorityFeeInWei(self, percentile: float) -> Wei:
+        """
+        Return the priority fee paid in the latest block at the given
+        percentile (e.g. 50 for the median); the percentile must be one
+        of those in rewardPercentiles
+        """
+        if percentile not in self.rewardPercentiles:
+            raise ValueError(
+                f"Percentile {percentile} not tracked, use one of {self.rewardPercentiles}"
+            )
+        self.refreshIfStale()
+        if self.latestBlockNumber not in self.priorityFees:
+            self.fetch(self.latestBlockNumber)
+        return self.priorityFees[self.latestBlockNumber][
+            self.rewardPercentiles.index(percentile)
+        ]
+
+    def onNewHead(self, header: Any) -> None:
+        """
+        Update the oracle with a new block header, as received from
+        a newHeads subscription
+        """
+        blockNumber = self.toInt(header["number"])
+        with self.lock:
+            self.storeBaseFee(blockNumber, self.toInt(header["baseFeePerGas"]))
+            self.latestBlockNumber = blockNumber
+            self.updatedAt = monotonic()
+
+    def refreshIfStale(self) -> None:
+        """
+        Fetch the fees of the latest block, unless they were fetched
+        less than maxAgeInSeconds ago
+        """
+        if self.isStale():
+            self.fetch("latest")
+
+    def isStale(self) -> bool:
+        """
+        Whether the fees of the latest block need to be fetched again
+        """
+        return (
+            self.latestBlockNumber is None
+            or monotonic() - self.updatedAt > self.maxAgeInSeconds
+        )
+
+    def fetch(self, block: Any) -> None:
+        """
+        Fetch the base fee and the priority fees of the given block,
+        with a single eth_feeHistory call
+        """
+        history = self.w3.eth.fee_history(1, block, self.rewardPercentiles)
+        self.storeFeeHistory(history, block)
+
+    def storeFeeHistory(self, history: Any, block: Any) -> None:
+        """
+        Update the oracle with the result of an eth_feeHistory call
+        for a single block, made with our rewardPercentiles; useful if
+        the call was made elsewhere, e.g. in a batch request
+        """
+        blockNumber = self.toInt(history["oldestBlock"])
+        with self.lock:
+            self.storeBaseFee(blockNumber, history["baseFeePerGas"][0])
+            rewards = history.get("reward") or [[0] * len(self.rewardPercentiles)]
+            self.priorityFees[blockNumber] = [Wei(self.toInt(r)) for r in rewards[0]]
+            if block == "latest":
+                self.latestBlockNumber = blockNumber
+                self.updatedAt = monotonic()
+
+    def storeBaseFee(self, blockNumber: int, baseFee: Any) -> None:
+        """
+        Cache the base fee of the given block, forgetting the oldest
+        blocks if needed
+        """
+        self.baseFees[blockNumber] = Wei(self.toInt(baseFee))
+        self.baseFees.move_to_end(blockNumber)
+        while len(self.baseFees) > self.historySize:
+            (oldestBlockNumber, _) = self.baseFees.popitem(last=False)
+            self.priorityFees.pop(oldestBlockNumber, None)
+
+    @staticmethod
+    def toInt(value: Any) -> int:
+        """
+        Header fields might come as hex strings (e.g. from a raw
+        subscription) or as integers (from web3.py)
+        """
+        return int(value, 16) if isinstance(value, str) else int(value)
@@ -0,0 +1,98 @@
+import json
+import os
+from threading import Lock
+from typing import List
+
+
+class GasLimitCache:
+    """
+    Remember how much gas the functions of a contract actually use,
+    so that the gas limit of a new transaction can be set without
+    asking the node to estimate it.
+
+    For each function (identified by the hex address of the contract
+    and the selector) the cache keeps the gas used by its most recent
+    transactions; the gas limit is the highest of them, plus a safety
+    margin. If a function has no history, or if it recently ran out of
+    gas, get() returns None, and the gas limit should be estimated as
+    usual.
+
+    If a file path is given, the cache is persisted as JSON, so that
+    it survives across runs.
+
+    Attributes
+    ----------------------
+    filePath: str = None | JSON file where to persist the cache (optional)
+    margin: float = 0.2 | Safety margin over the highest gas used, 0.2 = 20% (optional)
+    windowSize: int = 20 | How many recent transactions to remember per function (optional)
+    """
+
+    def __init__(
+        self, filePath: str = None, margin: float = 0.2, windowSize: int = 20
+    ) -> None:
+        self.filePath: str = filePath
+        self.margin: float = margin
+        self.windowSize: int = windowSize
+        self.gasUsed: dict[str, List[int]] = {}
+        self.lock = Lock()
+        if filePath:
+            self.load()
+
+    def get(self, contractAddress: str, selector: str) -> int:
+        """
+        Return the gas limit to use for the given contract function,
+        or None if it should be estimated
+        """
+        samples = self.gasUsed.get(self.makeKey(contractAddress, selector))
+        if not samples:
+            return None
+        return int(max(samples) * (1 + self.margin))
+
+    def learn(self, contractAddress: str, selector: str, gasUsed: int) -> None:
+        """
+        Record the gas used by a successful transaction to the given
+        contract function
+        """
+        with self.lock:
+            samples = self.gasUsed.setdefault(
+                self.makeKey(contractAddress, selector), []
+            )
+            samples.append(gasUsed)
+            del samples[: -self.windowSize]
+            self.save()
+
+    def invalidate(self, contractAddress: str, selector: str) -> None:
+        """
+        Forget the history of the given contract function, e.g. after
+        one of its transactions ran out of gas
+        """
+        with self.lock:
+            self.gasUsed.pop(self.makeKey(contractAddress, selector), None)
+            self.save()
+
+    def load(self) -> None:
+        """
+        Read the cache from file; a missing or corrupt file is
+        treated as an empty cache
+        """
+        try:
+            with open(self.filePath) as file:
+                self.gasUsed = json.load(file)
+        except (FileNotFoundError, ValueError):
+            self.gasUsed = {}
+
+    def save(self) -> None:
+        """
+        Write the cache to file, if a file path was given
+        """
+        if not self.filePath:
+            return
+        os.makedirs(os.path.dirname(self.filePath) or ".", exist_ok=True)
+        tmpFilePath = self.filePath + ".tmp"
+        with open(tmpFilePath, "w") as file:
+            json.dump(self.gasUsed, file)
+        os.replace(tmpFilePath, self.filePath)
+
+    @staticmethod
+    def makeKey(contractAddress: str, selector: str) -> str:
+        return f"{contractAddress.lower()}:{selector.lower()}"
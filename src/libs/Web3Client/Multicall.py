@@ -0,0 +1,86 @@
+import json
+import os
+from typing import Any, List, Optional, Sequence, cast
+from eth_typing import Address
+from web3 import Web3
+from web3.contract import Contract, ContractFunction
+from web3.types import BlockIdentifier
+
+from src.libs.Web3Client.RpcBatch import RpcBatch
+
+
+class Multicall:
+    """
+    Read many contract functions with a single eth_call, through a
+    Multicall3 aggregator contract.
+
+    Multicall3 is deployed at the same address on most chains,
+    including Avalanche C-Chain; on other chains (e.g. a local test
+    chain) deploy it with Multicall.deploy().
+
+    Calls that revert do not make the whole request fail: their result
+    is None.
+
+    Attributes
+    ----------------------
+    w3: Web3 | Web3.py client to query
+    address: Address = multicall3Address | Address of the Multicall3 contract (optional)
+    maxCallsPerRequest: int = 200 | Split larger lists of calls in several eth_calls, to stay within the node's gas cap (optional)
+    """
+
+    multicall3Address = cast(Address, "0xcA11bde05977b3631167028862bE2a173976CA11")
+    abiDir = os.path.dirname(os.path.realpath(__file__)) + "/contracts"
+    with open(abiDir + "/multicall3Abi.json") as file:
+        abi = json.load(file)
+    with open(abiDir + "/multicall3Bytecode.txt") as file:
+        bytecode = file.read().strip()
+
+    def __init__(
+        self,
+        w3: Web3,
+        address: Address = multicall3Address,
+        maxCallsPerRequest: int = 200,
+    ) -> None:
+        self.w3: Web3 = w3
+        self.address: Address = cast(Address, Web3.toChecksumAddress(address))
+        self.maxCallsPerRequest: int = maxCallsPerRequest
+        self.contract: Contract = w3.eth.contract(address=self.address, abi=self.abi)
+
+    @classmethod
+    def deploy(cls, w3: Web3, maxCallsPerRequest: int = 200) -> "Multicall":
+        """
+        Deploy a Multicall3 contract from an unlocked account of the
+        node (the default account, or else the first one) and return a
+        Multicall pointing to it; meant for local test chains, e.g.
+        eth-tester, where Multicall3 is not deployed.
+        """
+        sender = w3.eth.default_account or w3.eth.accounts[0]
+        factory = w3.eth.contract(abi=cls.abi, bytecode=cls.bytecode)
+        txHash = factory.constructor().transact({"from": sender})
+        receipt = w3.eth.wait_for_transaction_receipt(txHash)
+        address = cast(Address, receipt["contractAddress"])
+        return cls(w3, address, maxCallsPerRequest)
+
+    def call(
+        self,
+        contractFunctions: Sequence[ContractFunction],
+        block: BlockIdentifier = "latest",
+    ) -> List[Optional[Any]]:
+        """
+        Call the given read-only contract functions and return their
+        decoded results, in the same order; functions with a single
+        output return the value, others return a tuple. The result of
+        calls that reverted is None.
+        """
+        results: List[Optional[Any]] = []
+        for i in range(0, len(contractFunctions), self.maxCallsPerRequest):
+            chunk = contractFunctions[i : i + self.maxCallsPerRequest]
+            calls = [(f.address, RpcBatch.encodeFunctionCall(f)) for f in chunk]
+            rawResults = self.contract.functions.tryAggregate(False, calls).call(
+                block_identifier=block
+            )
+            results += [
+                RpcBatch.decodeFunctionResult(f, data) if success and data else None
+                for (f, (success, data)) in zip(chunk, rawResults)
+            ]
+        return results
@@ -0,0 +1,155 @@
+from __future__ import annotations
+from heapq import heappop, heappush
+from threading import Lock, RLock
+from typing import Any, Callable, List, Set, Tuple
+from eth_typing import Address
+from web3.types import Nonce
+
+
+class NonceManager:
+    """
+    Hand out the nonces of an account locally, so that several
+    transactions can be built and sent back to back, without asking
+    the node for the transaction count each time.
+
+    The first nonce is read from the chain (including pending txs);
+    after that, nonces are handed out sequentially. If a nonce is not
+    used because building or sending the transaction failed, release()
+    it and it will be handed out again before any new one. If the node
+    complains about the nonce (e.g. 'nonce too low'), call sync() to
+    start over from the chain.
+
+    All methods are thread-safe. Since the nonce belongs to the account
+    and not to the client, use forAccount() to get the manager shared by
+    all clients of the same account on the same chain.
+
+    Attributes
+    ----------------------
+    fetchTransactionCount: Callable[[], int] | Function that returns the pending tx count of the account
+    """
+
+    managers: dict[Tuple[int, Address], NonceManager] = {}
+    managersLock = Lock()
+
+    nonceErrors: Tuple[str, ...] = (
+        "nonce too low",
+        "nonce too high",
+        "invalid nonce",
+        "replacement transaction underpriced",
+    )
+    """
+    Bits of the error messages returned by the nodes when the nonce
+    of a transaction is out of sync with the chain
+    """
+
+    def __init__(self, fetchTransactionCount: Callable[[], int]) -> None:
+        self.fetchTransactionCount = fetchTransactionCount
+        self.lock = RLock()
+        self.nextNonce: int = None
+        self.released: List[int] = []
+        self.issued: Set[int] = set()
+
+    @classmethod
+    def forAccount(
+        cls, chainId: int, address: Address, fetchTransactionCount: Callable[[], int]
+    ) -> NonceManager:
+        """
+        Return the manager shared by all clients of the given account
+        on the given chain, creating it if needed
+        """
+        with cls.managersLock:
+            key = (chainId, address)
+            if key not in cls.managers:
+                cls.managers[key] = cls(fetchTransactionCount)
+            return cls.managers[key]
+
+    def acquire(self) -> Nonce:
+        """
+        Return the nonce to use for the next transaction; released
+        nonces are handed out first, so that no gap is left behind
+        """
+        with self.lock:
+            if self.nextNonce is None:
+                self.sync()
+            if self.released:
+                nonce = heappop(self.released)
+            else:
+                nonce = self.nextNonce
+                self.nextNonce += 1
+            self.issued.add(nonce)
+            return Nonce(nonce)
+
+    def confirm(self, nonce: int) -> None:
+        """
+        Signal that a transaction with the given nonce was accepted
+        by the node, so the nonce cannot be released anymore
+        """
+        with self.lock:
+            self.issued.discard(nonce)
+
+    def release(self, nonce: int) -> None:
+        """
+        Give back a nonce that was acquired but not used, because the
+        transaction could not be built or sent; nonces that were not
+        handed out by the manager are ignored
+        """
+        with self.lock:
+            if nonce not in self.issued:
+                return
+            self.issued.discard(nonce)
+            if nonce == self.nextNonce - 1:
+                self.nextNonce -= 1
+                # Collapse the released nonces at the top of the range
+                while self.released and self.nextNonce - 1 in self.released:
+                    self.released.remove(self.nextNonce - 1)
+                    self.nextNonce -= 1
+                self.released.sort()
+            else:
+                heappush(self.released, nonce)
+
+    def isIssued(self, nonce: int) -> bool:
+        """
+        Whether the given nonce was handed out by the manager, and
+        neither confirmed nor released yet
+        """
+        with self.lock:
+            return nonce in self.issued
+
+    def observeTransactionCount(self, transactionCount: int) -> None:
+        """
+        Use a transaction count (pending txs included) that was fetched
+        anyway, e.g. in a batch request: if the manager has not synced
+        yet, or if the account has sent txs the manager does not know
+        about, start over from the given count
+        """
+        with self.lock:
+            if self.nextNonce is None or transactionCount > self.nextNonce:
+                self.nextNonce = transactionCount
+                self.released = []
+                self.issued = set()
+
+    def isSynced(self) -> bool:
+        """
+        Whether the manager has read the transaction count from the
+        chain at least once
+        """
+        return self.nextNonce is not None
+
+    def sync(self) -> None:
+        """
+        Forget the nonces handed out so far and start over from the
+        transaction count of the account, pending txs included
+        """
+        with self.lock:
+            self.nextNonce = self.fetchTransactionCount()
+            self.released = []
+            self.issued = set()
+
+    @classmethod
+    def isNonceError(cls, e: Any) -> bool:
+        """
+        Return True if the given error, raised while sending a
+        transaction, is due to a wrong nonce
+        """
+        message = str(e).lower()
+        return any(error in message for error in cls.nonceErrors)
@@ -0,0 +1,30 @@
+from typing import Any
+from web3.providers import BaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+from src.libs.Web3Client.ProviderPool import ProviderPool
+
+
+class PooledProvider(BaseProvider):
+    """
+    Web3.py provider that sends its requests through a ProviderPool.
+
+    Give each Web3 object its own PooledProvider, even when they share
+    the pool: web3.py caches on the provider the middlewares of the
+    Web3 object that uses it.
+
+    Attributes
+    ----------------------
+    pool: ProviderPool | Pool of nodes to send the requests to
+    """
+
+    def __init__(self, pool: ProviderPool) -> None:
+        self.pool: ProviderPool = pool
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        return self.pool.makeRequest(method, params)
+
+    def isConnected(self) -> bool:
+        return self.pool.isConnected()
+
+    def __str__(self) -> str:
+        return f"Pool of nodes {', '.join(self.pool.nodeUris)}"
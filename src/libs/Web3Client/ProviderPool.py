@@ -0,0 +1,453 @@
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging import Logger
+from math import ceil
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Deque, List, Optional, Tuple, TypedDict, TypeVar
+import logging
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from requests.sessions import Session
+from web3 import HTTPProvider, WebsocketProvider
+from web3.providers import BaseProvider
+from web3.types import RPCEndpoint, RPCError, RPCResponse
+
+T = TypeVar("T")
+
+
+class NodeStats(TypedDict):
+    uri: str
+    healthy: bool
+    requests: int
+    errorRate: float
+    p50: Optional[float]
+    p99: Optional[float]
+    inclusions: int
+
+
+class ProviderPool:
+    """
+    Pool of RPC nodes, meant to be shared by all the clients of the
+    process, so that they reuse the same open connections.
+
+    Each request goes to the fastest healthy node, i.e. the one with
+    the lowest median latency over its most recent requests. If the
+    node fails (connection error, timeout, HTTP error, rate limit...)
+    the request is sent to the next node, and the failed node is left
+    aside for cooldownInSeconds. Nodes that failed too often in the
+    last windowInSeconds are used only when all the others fail.
+
+    Errors returned by the node in the JSON-RPC response (e.g. a
+    reverted call) are not failures of the node: they are returned
+    as they are, without trying other nodes.
+
+    Filters only exist on the node that created them: the requests
+    about a filter (eth_getFilterChanges...) always go to that node.
+    If the node is down, they get a 'filter not found' error, as if
+    the node had forgotten the filter, so that the caller creates a
+    new one.
+
+    Transactions can be sent to all nodes at once with broadcast().
+    Call recordInclusion() with the node that was the first to accept
+    a transaction that got mined: transactions sent to a single node
+    will then go to the node that won most of the recent races.
+
+    Attributes
+    ----------------------
+    nodeUris: List[str] | URIs of the nodes, HTTP(S) or websocket
+    sampleSize: int = 100 | How many of the most recent latencies to keep for each node, and of the most recent inclusions (optional)
+    windowInSeconds: float = 300 | Period over which the error rate of each node is computed (optional)
+    maxErrorRate: float = 0.2 | Nodes with a larger error rate are used only as a last resort (optional)
+    cooldownInSeconds: float = 30 | For how long to leave aside a node after it fails (optional)
+    connectionsPerNode: int = 10 | How many HTTP connections to keep open with each node (optional)
+    logger: Logger = logging | Where to log the failures of the nodes (optional)
+    """
+
+    networkErrors = (RequestException, ValueError, OSError)
+    """
+    Errors that mean that a node could not serve a request
+    """
+
+    newFilterMethods = (
+        "eth_newFilter",
+        "eth_newBlockFilter",
+        "eth_newPendingTransactionFilter",
+    )
+    """
+    Methods that create a filter on the node
+    """
+
+    filterMethods = ("eth_getFilterChanges", "eth_getFilterLogs", "eth_uninstallFilter")
+    """
+    Methods that take as first param the ID of a filter
+    """
+
+    def __init__(
+        self,
+        nodeUris: List[str],
+        sampleSize: int = 100,
+        windowInSeconds: float = 300,
+        maxErrorRate: float = 0.2,
+        cooldownInSeconds: float = 30,
+        connectionsPerNode: int = 10,
+        logger: Logger = logging,  # type: ignore
+    ) -> None:
+        if not nodeUris:
+            raise ValueError("At least one node URI is needed")
+        self.nodeUris: List[str] = list(dict.fromkeys(nodeUris))
+        self.sampleSize: int = sampleSize
+        self.windowInSeconds: float = windowInSeconds
+        self.maxErrorRate: float = maxErrorRate
+        self.cooldownInSeconds: float = cooldownInSeconds
+        self.connectionsPerNode: int = connectionsPerNode
+        self.logger: Logger = logger
+        self.providers: dict[str, BaseProvider] = {
+            uri: self.makeProvider(uri) for uri in self.nodeUris
+        }
+        self.latencies: dict[str, Deque[float]] = {
+            uri: deque(maxlen=sampleSize) for uri in self.nodeUris
+        }
+        self.outcomes: dict[str, Deque[Tuple[float, bool]]] = {
+            uri: deque() for uri in self.nodeUris
+        }
+        self.requestCounts: dict[str, int] = {uri: 0 for uri in self.nodeUris}
+        self.downUntil: dict[str, float] = {}
+        self.inclusions: Deque[str] = deque(maxlen=sampleSize)
+        self.filterNodes: dict[str, str] = {}
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=2 * len(self.nodeUris))
+
+    ####################
+    # Requests
+    ####################
+
+    def makeRequest(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        """
+        Send a JSON-RPC request to the fastest healthy node, failing
+        over to the other nodes if needed; transactions go first to
+        the node that won most of the recent inclusion races, and
+        requests about a filter go to the node of the filter
+        """
+        send = lambda provider, requests: [
+            provider.make_request(m, p) for (m, p) in requests
+        ]
+        return self.sendRequests([(method, params)], send)[0]
+
+    def sendRequests(
+        self,
+        requests: List[Tuple[str, Any]],
+        send: Callable[[BaseProvider, List[Tuple[str, Any]]], List[RPCResponse]],
+    ) -> List[RPCResponse]:
+        """
+        Send the given (method, params) requests with the given function
+        (e.g. as a single batch), and return the responses in the same
+        order as the requests.
+
+        Requests about a filter are sent to the node of the filter,
+        together with the requests that can go to any node; if the
+        requests are about filters on different nodes, each node gets
+        its own share.
+        """
+        nodeIndexes: dict[Optional[str], List[int]] = {}
+        for (i, (method, params)) in enumerate(requests):
+            nodeIndexes.setdefault(self.getFilterNode(method, params), []).append(i)
+        freeIndexes = nodeIndexes.pop(None, [])
+        now = monotonic()
+        with self.lock:
+            upNodes = [u for u in nodeIndexes if self.downUntil.get(u, 0) <= now]
+        if upNodes:
+            # Spare a round trip for the requests that can go anywhere
+            nodeIndexes[upNodes[0]] += freeIndexes
+            freeIndexes = []
+
+        responses: List[RPCResponse] = [None] * len(requests)
+        answeredBy: dict[int, str] = {}
+        for (uri, indexes) in nodeIndexes.items():
+            group = [requests[i] for i in indexes]
+            try:
+                groupResponses = self.call(uri, lambda p: send(p, group))
+            except self.networkErrors:
+                # The filters of the node are lost, the other requests
+                # are sent to another node
+                for i in indexes:
+                    if requests[i][0] in self.filterMethods:
+                        responses[i] = self.makeFilterNotFoundResponse()
+                        answeredBy[i] = uri
+                    else:
+                        freeIndexes.append(i)
+                continue
+            for (i, response) in zip(indexes, groupResponses):
+                responses[i] = response
+                answeredBy[i] = uri
+
+        if freeIndexes:
+            freeIndexes.sort()
+            group = [requests[i] for i in freeIndexes]
+            preferInclusions = any(m == "eth_sendRawTransaction" for (m, _) in group)
+            (uri, groupResponses) = self.routeWithNode(
+                lambda p: send(p, group), preferInclusions
+            )
+            for (i, response) in zip(freeIndexes, groupResponses):
+                responses[i] = response
+                answeredBy[i] = uri
+
+        for (i, uri) in answeredBy.items():
+            self.trackFilter(uri, requests[i], responses[i])
+        return responses
+
+    def route(
+        self, fn: Callable[[BaseProvider], T], preferInclusions: bool = False
+    ) -> T:
+        """
+        Call fn with the provider of the fastest healthy node and
+        return its result; if fn raises a network error, call it again
+        with the next node, and so on. Raise the last error if all
+        nodes fail.
+        """
+        return self.routeWithNode(fn, preferInclusions)[1]
+
+    def routeWithNode(
+        self, fn: Callable[[BaseProvider], T], preferInclusions: bool = False
+    ) -> Tuple[str, T]:
+        """
+        Same as route(), but return also the URI of the node that
+        answered
+        """
+        lastError: Exception = None
+        for uri in self.rankNodes(preferInclusions):
+            try:
+                return (uri, self.call(uri, fn))
+            except self.networkErrors as e:
+                lastError = e
+        raise lastError
+
+    def broadcast(
+        self,
+        method: RPCEndpoint,
+        params: Any,
+        isAccepted: Callable[[RPCResponse], bool],
+        isFallback: Callable[[RPCResponse], bool] = None,
+    ) -> Tuple[str, RPCResponse]:
+        """
+        Send the same request to all nodes at the same time, and return
+        the URI of the first node whose response passes isAccepted,
+        together with the response, without waiting for the others.
+
+        If no node accepts the request, return the response of the best
+        node whose response passes isFallback, if any, otherwise of the
+        best node that answered; raise the last network error if no
+        node answered.
+        """
+        ranking = self.rankNodes(preferInclusions=True)
+        futures = {
+            self.executor.submit(
+                self.call, uri, lambda p: p.make_request(method, params)
+            ): uri
+            for uri in ranking
+        }
+        responses: dict[str, RPCResponse] = {}
+        lastError: Exception = None
+        for future in as_completed(futures):
+            uri = futures[future]
+            try:
+                response = future.result()
+            except self.networkErrors as e:
+                lastError = e
+                continue
+            if isAccepted(response):
+                return (uri, response)
+            responses[uri] = response
+        if not responses:
+            raise lastError
+        answered = [u for u in ranking if u in responses]
+        fallbacks = [u for u in answered if isFallback and isFallback(responses[u])]
+        uri = (fallbacks or answered)[0]
+        return (uri, responses[uri])
+
+    def call(self, uri: str, fn: Callable[[BaseProvider], T]) -> T:
+        """
+        Call fn with the provider of the given node, and record how
+        long it took, or that it failed
+        """
+        start = monotonic()
+        try:
+            result = fn(self.providers[uri])
+        except self.networkErrors as e:
+            self.recordFailure(uri, e)
+            raise
+        self.recordSuccess(uri, monotonic() - start)
+        return result
+
+    def warmUp(self) -> None:
+        """
+        Ping all nodes at the same time, to open the connections and
+        to have a first measure of their latency
+        """
+        ping = lambda p: p.make_request(RPCEndpoint("eth_blockNumber"), [])
+        futures = [self.executor.submit(self.call, uri, ping) for uri in self.nodeUris]
+        for future in futures:
+            future.exception()
+
+    def isConnected(self) -> bool:
+        return any(p.isConnected() for p in self.providers.values())
+
+    ####################
+    # Routing
+    ####################
+
+    def rankNodes(self, preferInclusions: bool = False) -> List[str]:
+        """
+        Return the node URIs, from the best to the worst: nodes that
+        failed recently come last, then nodes with a high error rate;
+        the others are sorted by median latency. Nodes never used come
+        first, so that they get measured.
+
+        With preferInclusions, healthy nodes are sorted first by how
+        many of the recent inclusion races they won.
+        """
+        now = monotonic()
+        with self.lock:
+            wins = Counter(self.inclusions) if preferInclusions else Counter()
+            return sorted(
+                self.nodeUris,
+                key=lambda uri: (
+                    self.downUntil.get(uri, 0) > now,
+                    self.getErrorRate(uri, now) > self.maxErrorRate,
+                    -wins[uri],
+                    self.getPercentile(uri, 50) or 0,
+                ),
+            )
+
+    def recordSuccess(self, uri: str, latency: float) -> None:
+        with self.lock:
+            self.latencies[uri].append(latency)
+            self.outcomes[uri].append((monotonic(), False))
+            self.requestCounts[uri] += 1
+            self.downUntil.pop(uri, None)
+
+    def recordInclusion(self, uri: str) -> None:
+        """
+        Record that the given node was the first to accept a
+        transaction that got mined
+        """
+        with self.lock:
+            self.inclusions.append(uri)
+
+    def recordFailure(self, uri: str, error: Exception) -> None:
+        self.logger.warning(f"ProviderPool: node {uri} failed ({error})")
+        with self.lock:
+            now = monotonic()
+            self.outcomes[uri].append((now, True))
+            self.requestCounts[uri] += 1
+            self.downUntil[uri] = now + self.cooldownInSeconds
+
+    ####################
+    # Filters
+    ####################
+
+    def getFilterNode(self, method: str, params: Any) -> Optional[str]:
+        """
+        Return the node the given request must go to, if it is about
+        a filter, or None if it can go to any node
+        """
+        if method not in self.filterMethods or not params:
+            return None
+        with self.lock:
+            return self.filterNodes.get(params[0])
+
+    def trackFilter(
+        self, uri: str, request: Tuple[str, Any], response: RPCResponse
+    ) -> None:
+        """
+        Remember on which node a filter was created, and forget it
+        once it is uninstalled or lost
+        """
+        (method, params) = request
+        if not response:
+            return
+        with self.lock:
+            if method in self.newFilterMethods and "result" in response:
+                self.filterNodes[response["result"]] = uri
+            elif method == "eth_uninstallFilter" or (
+                method in self.filterMethods and "error" in response
+            ):
+                self.filterNodes.pop(params[0], None)
+
+    @staticmethod
+    def makeFilterNotFoundResponse() -> RPCResponse:
+        """
+        Response to a request about a filter whose node is down
+        """
+        error: RPCError = {"code": -32000, "message": "filter not found", "data": None}
+        return {"jsonrpc": "2.0", "id": 0, "error": error}
+
+    ####################
+    # Stats
+    ####################
+
+    def getStats(self) -> List[NodeStats]:
+        """
+        Return the health, error rate and latency percentiles (in
+        seconds) of each node, from the best to the worst
+        """
+        ranking = self.rankNodes()
+        now = monotonic()
+        with self.lock:
+            return [
+                {
+                    "uri": uri,
+                    "healthy": self.downUntil.get(uri, 0) <= now
+                    and self.getErrorRate(uri, now) <= self.maxErrorRate,
+                    "requests": self.requestCounts[uri],
+                    "errorRate": self.getErrorRate(uri, now),
+                    "p50": self.getPercentile(uri, 50),
+                    "p99": self.getPercentile(uri, 99),
+                    "inclusions": self.inclusions.count(uri),
+                }
+                for uri in ranking
+            ]
+
+    def getErrorRate(self, uri: str, now: float) -> float:
+        """
+        Share of failed requests to the given node in the last
+        windowInSeconds; call it with the lock held
+        """
+        outcomes = self.outcomes[uri]
+        while outcomes and outcomes[0][0] < now - self.windowInSeconds:
+            outcomes.popleft()
+        if not outcomes:
+            return 0
+        return sum(failed for (_, failed) in outcomes) / len(outcomes)
+
+    def getPercentile(self, uri: str, percentile: float) -> Optional[float]:
+        """
+        Latency of the given node at the given percentile, over its
+        most recent requests, or None if it was never used; call it
+        with the lock held
+        """
+        latencies = sorted(self.latencies[uri])
+        if not latencies:
+            return None
+        rank = max(ceil(percentile / 100 * len(latencies)) - 1, 0)
+        return latencies[rank]
+
+    ####################
+    # Utils
+    ####################
+
+    def makeProvider(self, uri: str) -> BaseProvider:
+        """
+        Return the web3.py provider of the given node; HTTP providers
+        get their own session, with enough connections for the
+        threads of the process
+        """
+        if uri[0:2] == "ws":
+            return WebsocketProvider(uri)
+        if uri[0:4] != "http":
+            raise ValueError(f"Unsupported node URI: {uri}")
+        session = Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.connectionsPerNode)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return HTTPProvider(uri, session=session)
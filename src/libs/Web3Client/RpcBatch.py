@@ -0,0 +1,245 @@
+from __future__ import annotations
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+from eth_abi import decode_abi
+from eth_typing import Address
+from eth_typing.encoding import HexStr
+from hexbytes import HexBytes
+from web3._utils.abi import get_abi_output_types
+from web3._utils.method_formatters import PYTHONIC_RESULT_FORMATTERS
+from web3.contract import ContractFunction
+from web3.types import (
+    BlockData,
+    BlockIdentifier,
+    FeeHistory,
+    RPCEndpoint,
+    RPCResponse,
+    TxReceipt,
+    Wei,
+)
+
+if TYPE_CHECKING:
+    from src.libs.Web3Client.Web3Client import Web3Client
+
+T = TypeVar("T")
+
+
+class BatchResult(Generic[T]):
+    """
+    Result of a single request in a RpcBatch; it becomes available
+    once the batch has been sent.
+
+    Attributes
+    ----------------------
+    method: str | JSON-RPC method of the request
+    formatter: Callable[[Any], T] | Function that converts the raw result to its Python type
+    """
+
+    def __init__(self, method: str, formatter: Callable[[Any], T]) -> None:
+        self.method: str = method
+        self.formatter: Callable[[Any], T] = formatter
+        self.response: RPCResponse = None
+
+    def isReady(self) -> bool:
+        """
+        Whether the batch has been sent and the response received
+        """
+        return self.response is not None
+
+    def failed(self) -> bool:
+        """
+        Whether the node returned an error for the request
+        """
+        return self.isReady() and "error" in self.response
+
+    @property
+    def error(self) -> Any:
+        """
+        The error returned by the node, or None
+        """
+        return self.response.get("error") if self.isReady() else None
+
+    def get(self) -> T:
+        """
+        Return the formatted result of the request; raise an error if
+        the request failed or if the batch has not been sent yet
+        """
+        if not self.isReady():
+            raise RuntimeError(f"Batch not sent yet, no result for {self.method}")
+        if self.failed():
+            raise ValueError(self.error)
+        return self.formatter(self.response["result"])
+
+
+class RpcBatch:
+    """
+    Collect several independent JSON-RPC requests and send them to
+    the node in a single HTTP request.
+
+    Use it as a context manager: the batch is sent on exit, and the
+    typed results can be read right after.
+
+        with client.batch() as batch:
+            nonce = batch.getTransactionCount(address)
+            balance = batch.getBalance(address)
+        print(nonce.get(), balance.get())
+
+    Attributes
+    ----------------------
+    client: Web3Client | Client whose node will receive the batch
+    """
+
+    def __init__(self, client: Web3Client) -> None:
+        self.client: Web3Client = client
+        self.requests: List[Tuple[str, List[Any], BatchResult[Any]]] = []
+
+    def __enter__(self) -> RpcBatch:
+        return self
+
+    def __exit__(self, excType: Any, *args: Any) -> None:
+        if excType is None:
+            self.send()
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    def add(
+        self, method: str, params: List[Any], formatter: Callable[[Any], T] = None
+    ) -> BatchResult[T]:
+        """
+        Add a raw request to the batch; params must be JSON-ready. If
+        no formatter is given, the result is formatted as web3.py does
+        for the same method.
+        """
+        if formatter is None:
+            formatter = PYTHONIC_RESULT_FORMATTERS.get(RPCEndpoint(method), lambda r: r)
+        result: BatchResult[T] = BatchResult(method, formatter)
+        self.requests.append((method, params, result))
+        return result
+
+    def send(self) -> None:
+        """
+        Send all requests added so far, in a single HTTP request
+        """
+        requests, self.requests = self.requests, []
+        if not requests:
+            return
+        responses = self.client.sendBatchRequest([(m, p) for (m, p, _) in requests])
+        for ((_, _, result), response) in zip(requests, responses):
+            result.response = response
+
+    ####################
+    # Typed requests
+    ####################
+
+    def blockNumber(self) -> BatchResult[int]:
+        return self.add("eth_blockNumber", [])
+
+    def getBlock(
+        self, block: BlockIdentifier = "latest", fullTransactions: bool = False
+    ) -> BatchResult[Optional[BlockData]]:
+        """
+        The result is None if the block does not exist yet
+        """
+        return self.add(
+            "eth_getBlockByNumber", [self.toBlockParam(block), fullTransactions]
+        )
+
+    def getBalance(
+        self, address: Address, block: BlockIdentifier = "latest"
+    ) -> BatchResult[Wei]:
+        return self.add("eth_getBalance", [address, self.toBlockParam(block)])
+
+    def getTransactionCount(
+        self, address: Address, block: BlockIdentifier = "pending"
+    ) -> BatchResult[int]:
+        return self.add("eth_getTransactionCount", [address, self.toBlockParam(block)])
+
+    def feeHistory(
+        self,
+        blockCount: int,
+        newestBlock: BlockIdentifier = "latest",
+        rewardPercentiles: Sequence[float] = [],
+    ) -> BatchResult[FeeHistory]:
+        return self.add(
+            "eth_feeHistory",
+            [hex(blockCount), self.toBlockParam(newestBlock), list(rewardPercentiles)],
+        )
+
+    def estimateGas(self, tx: dict[str, Any]) -> BatchResult[int]:
+        return self.add("eth_estimateGas", [tx])
+
+    def getTransactionReceipt(self, txHash: HexStr) -> BatchResult[Optional[TxReceipt]]:
+        """
+        The result is None if the transaction has not been mined yet
+        """
+        formatter = PYTHONIC_RESULT_FORMATTERS[RPCEndpoint("eth_getTransactionReceipt")]
+        return self.add(
+            "eth_getTransactionReceipt",
+            [txHash],
+            lambda r: formatter(r) if r is not None else None,
+        )
+
+    def call(
+        self,
+        contractFunction: ContractFunction,
+        block: BlockIdentifier = "latest",
+        sender: Address = None,
+    ) -> BatchResult[Any]:
+        """
+        Call a read-only contract function; the result is decoded like
+        ContractFunction.call() would, i.e. functions with a single
+        output return the value, others return a tuple
+        """
+        tx: dict[str, Any] = {
+            "to": contractFunction.address,
+            "data": self.encodeFunctionCall(contractFunction),
+        }
+        if sender:
+            tx["from"] = sender
+        return self.add(
+            "eth_call",
+            [tx, self.toBlockParam(block)],
+            lambda r: self.decodeFunctionResult(contractFunction, HexBytes(r)),
+        )
+
+    ####################
+    # Utils
+    ####################
+
+    @staticmethod
+    def encodeFunctionCall(contractFunction: ContractFunction) -> HexStr:
+        """
+        Return the calldata of the given contract function, as a hex
+        string
+        """
+        return contractFunction.web3.eth.contract(
+            abi=contractFunction.contract_abi
+        ).encodeABI(fn_name=contractFunction.fn_name, args=contractFunction.args)
+
+    @staticmethod
+    def decodeFunctionResult(contractFunction: ContractFunction, data: bytes) -> Any:
+        """
+        Decode the data returned by the given contract function: like
+        ContractFunction.call(), return the value for functions with a
+        single output, a tuple otherwise
+        """
+        values = decode_abi(get_abi_output_types(contractFunction.abi), data)
+        return values[0] if len(values) == 1 else values
+
+    @staticmethod
+    def toBlockParam(block: BlockIdentifier) -> Any:
+        """
+        Block numbers must be sent as hex strings, tags (e.g. 'latest')
+        as they are
+        """
+        return hex(block) if isinstance(block, int) else block
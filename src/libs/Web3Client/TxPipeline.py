@@ -0,0 +1,103 @@
+from typing import Any, Callable, List, Tuple
+from eth_typing.encoding import HexStr
+from web3.exceptions import TimeExhausted
+from web3.types import TxReceipt
+
+from src.libs.Web3Client.Web3Client import Web3Client
+
+
+class TxPipeline:
+    """
+    Wait for the receipts of many transactions at once.
+
+    Send all of your transactions first, adding each tx hash to the
+    pipeline together with a callback; then call wait(), which polls
+    the receipts of all pending transactions with a single batch
+    request, and invokes each callback as soon as its receipt arrives.
+    This way, a batch of transactions takes about one block time to be
+    confirmed, instead of one block time per tx.
+
+    Callbacks are invoked one at a time, in the thread that called
+    wait(), so they do not need to be thread-safe.
+
+    Attributes
+    ----------------------
+    client: Web3Client | Client used to fetch the receipts
+    timeout: float = 120 | Seconds to wait for the receipts, before giving up (optional)
+    pollLatency: float = 0.5 | Seconds between two polls of the receipts (optional)
+    """
+
+    def __init__(
+        self, client: Web3Client, timeout: float = 120, pollLatency: float = 0.5
+    ) -> None:
+        self.client: Web3Client = client
+        self.timeout: float = timeout
+        self.pollLatency: float = pollLatency
+        self.txs: List[Tuple[HexStr, Callable[[TxReceipt], Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self.txs)
+
+    def add(self, txHash: HexStr, onReceipt: Callable[[TxReceipt], Any]) -> None:
+        """
+        Add a sent transaction to the pipeline; onReceipt will be
+        called with the tx receipt once the tx is mined
+        """
+        self.txs.append((txHash, onReceipt))
+
+    def wait(
+        self, onError: Callable[[HexStr, Exception], Any] = None
+    ) -> List[TxReceipt]:
+        """
+        Wait for the receipts of all transactions in the pipeline,
+        invoke the callbacks as the receipts arrive, and return the
+        receipts in the order they arrived.
+
+        If a receipt cannot be fetched (e.g. on timeout), or if a
+        callback raises, onError is called with the tx hash and the
+        exception; if onError is not given, the first exception is
+        raised once all other receipts have been handled. The pipeline
+        is emptied in any case.
+        """
+        txs, self.txs = self.txs, []
+        if not txs:
+            return []
+
+        callbacks = dict(txs)
+        receipts: List[TxReceipt] = []
+        errors: List[Tuple[HexStr, Exception]] = []
+        arrivals = self.client.waitForTransactionReceipts(
+            list(callbacks), self.timeout, self.pollLatency
+        )
+        while True:
+            try:
+                (txHash, txReceipt) = next(arrivals)
+            except StopIteration:
+                # Whatever is left was not mined in time
+                errors += [
+                    (
+                        txHash,
+                        TimeExhausted(
+                            f"Transaction {txHash} is not in the chain after {self.timeout} seconds"
+                        ),
+                    )
+                    for txHash in callbacks
+                ]
+                break
+            except Exception as e:
+                # The node could not be reached: all remaining txs failed
+                errors += [(txHash, e) for txHash in callbacks]
+                break
+            receipts.append(txReceipt)
+            try:
+                callbacks.pop(txHash)(txReceipt)
+            except Exception as e:
+                # Do not let a callback stop the others
+                errors.append((txHash, e))
+
+        for (txHash, error) in errors:
+            if onError:
+                onError(txHash, error)
+        if errors and not onError:
+            raise errors[0][1]
+        return receipts
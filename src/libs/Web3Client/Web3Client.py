@@ -1,16 +1,29 @@
 import json
-from typing import Any, List, Tuple, cast
+from collections import OrderedDict
+from time import monotonic, sleep
+from eth_abi import decode_abi
+from typing import Any, Iterator, List, Sequence, Tuple, Union, cast
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from eth_typing import Address
-from web3 import Web3
+from web3 import HTTPProvider, Web3
+from web3._utils.request import make_post_request
 from eth_account.datastructures import SignedTransaction
 from web3.contract import ContractFunction
 from web3.types import BlockData, Nonce, TxParams, TxReceipt, TxData
 from eth_typing.encoding import HexStr
 from src.libs.Web3Client.exceptions import TransactionTooExpensive
+from src.libs.Web3Client.FeeOracle import FeeOracle
+from src.libs.Web3Client.GasLimitCache import GasLimitCache
+from src.libs.Web3Client.Multicall import Multicall
+from src.libs.Web3Client.NonceManager import NonceManager
+from src.libs.Web3Client.PooledProvider import PooledProvider
+from src.libs.Web3Client.ProviderPool import ProviderPool
+from src.libs.Web3Client.RpcBatch import BatchResult, RpcBatch
 from web3.contract import Contract
-from web3.types import Middleware
+from web3.providers import BaseProvider
+from web3.types import Middleware, RPCEndpoint, RPCResponse
+from src.libs.Web3Client.types import TxSimulation
 
 
 class Web3Client:
@@ -30,11 +43,12 @@ class Web3Client:
 
     Attributes
     ----------------------
-    nodeUri: str | RPC node to use
+    nodeUri: str | ProviderPool | RPC node to use; pass several comma-separated URIs, or a ProviderPool, to spread the requests over several nodes
     chainId: int = None | ID of the chain
     txType: int = 2 | Type of transaction
     privateKey: str = None | Private key to use (optional)
     maxPriorityFeePerGasInGwei: float = 1 | Miner's tip (optional, default is 1)
+    priorityFeePercentile: float = None | If set, use as miner's tip the priority fee paid at this percentile in the latest block, rather than maxPriorityFeePerGasInGwei; must be one of FeeOracle.rewardPercentiles (optional)
     upperLimitForBaseFeeInGwei: float = inf | Raise an exception if baseFee is larger than this (optional, default is no limit)
     contractAddress: Address = None | Address of smart contract (optional)
     abi: dict[str, Any] = None | ABI of smart contract; to generate from a JSON file, use static method getContractAbiFromFile() (optional)
@@ -47,13 +61,18 @@ class Web3Client:
     account: LocalAccount = None | Account object for the user
     userAddress: Address = None | Address of the user
     contract: Contract = None | Contract object of web3.py
+    nonceManager: NonceManager = None | Hands out the nonces of the account, see getNonceManager()
+    feeOracle: FeeOracle = None | Caches the base fee and priority fees, see getFeeOracle()
+    gasLimitCache: GasLimitCache = None | Gas limits learnt from past txs, see setGasLimitCache()
+    multicall: Multicall = None | Reads many contract functions in one call, see getMulticall()
+    broadcastTxs: bool = False | Whether to send each tx to all the nodes of the pool at once, see setBroadcastTxs()
 
     TODO: Add support for pre-EIP-1559 transactions
     """
 
     def __init__(
         self,
-        nodeUri: str,
+        nodeUri: Union[str, ProviderPool],
         chainId: int = None,
         txType: int = 2,
         privateKey: str = None,
@@ -62,11 +81,20 @@ class Web3Client:
         contractAddress: Address = None,
         abi: dict[str, Any] = None,
         middlewares: List[Middleware] = [],
+        priorityFeePercentile: float = None,
     ) -> None:
         # Set attributes
+        self.nonceManager: NonceManager = None
+        self.feeOracle: FeeOracle = None
+        self.gasLimitCache: GasLimitCache = None
+        self.multicall: Multicall = None
+        self.gasTrackedTxs: dict[HexStr, Tuple[str, str, int]] = {}
+        self.broadcastTxs: bool = False
+        self.broadcastTxNodes: OrderedDict[HexStr, str] = OrderedDict()
         self.chainId: int = chainId
         self.txType: int = txType
         self.maxPriorityFeePerGasInGwei: float = maxPriorityFeePerGasInGwei
+        self.priorityFeePercentile: float = priorityFeePercentile
         self.upperLimitForBaseFeeInGwei: float = upperLimitForBaseFeeInGwei
         # Initialize web3.py provider
         if nodeUri:
@@ -89,9 +117,11 @@ class Web3Client:
     # Setters
     ####################
 
-    def setProvider(self, nodeUri: str) -> None:
-        self.nodeUri: str = nodeUri
+    def setProvider(self, nodeUri: Union[str, ProviderPool]) -> None:
+        self.nodeUri: Union[str, ProviderPool] = nodeUri
         self.w3 = self.getProvider(nodeUri)
+        self.feeOracle = None
+        self.multicall = None
 
     def setAccount(self, privateKey: str) -> None:
         self.privateKey: str = privateKey
@@ -110,6 +140,31 @@ class Web3Client:
         for (i, m) in enumerate(middlewares):
             self.w3.middleware_onion.inject(m, layer=i)
 
+    def setMulticall(self, multicall: Multicall) -> None:
+        """
+        Use the given Multicall, e.g. to point to an aggregator deployed
+        at a non-standard address
+        """
+        self.multicall = multicall
+
+    def setGasLimitCache(self, gasLimitCache: GasLimitCache) -> None:
+        """
+        Use the given cache to set the gas limit of contract txs, instead
+        of estimating it each time; the cache learns from the receipts
+        fetched with getTransactionReceipt()
+        """
+        self.gasLimitCache = gasLimitCache
+
+    def setBroadcastTxs(self, broadcastTxs: bool) -> None:
+        """
+        If the client uses a ProviderPool, send each tx to all of its
+        nodes at the same time, so that the tx reaches the validators
+        sooner; the node that is most often the first to accept a tx
+        that gets mined is then preferred for the txs sent to a
+        single node
+        """
+        self.broadcastTxs = broadcastTxs
+
     ####################
     # Build Tx
     ####################
@@ -125,10 +180,14 @@ class Web3Client:
         before invoking this method you need to have specified a chainId and
         called setNodeUri().
 
-        - If not given, the nonce will be computed on chain
+        - If not given, the nonce will be handed out by the nonce manager,
+          which keeps track of the nonces locally
+        - If both the nonce and the fees need to be read from the chain,
+          they are fetched with a single batch request
         - If not given, the gas limit will be estimated on chain using gas_estimate()
         - If not given, the miner's tip (maxPriorityFeePerGas) will be set to
-          self.maxPriorityFeePerGasInGwei
+          self.maxPriorityFeePerGasInGwei, or estimated from the latest block
+          if self.priorityFeePercentile is set
         - The gas price is estimated according to the usual formula
           maxMaxFeePerGas = 2 * baseFee + maxPriorityFeePerGas.
         """
@@ -140,9 +199,12 @@ class Web3Client:
             "from": self.userAddress,
         }
 
+        # Fetch from the chain what we need, in a single round trip
+        self.prefetchTransactionData(fetchNonce=nonce is None)
+
         # Miner's tip
         maxPriorityFeePerGasInGwei = (
-            maxPriorityFeePerGasInGwei or self.maxPriorityFeePerGasInGwei
+            maxPriorityFeePerGasInGwei or self.estimatePriorityFeePerGasInGwei()
         )
         tx["maxPriorityFeePerGas"] = Web3.toWei(maxPriorityFeePerGasInGwei, "gwei")
 
@@ -161,8 +223,8 @@ class Web3Client:
                 f"Gas too expensive [baseFee={baseFeeInGwei} gwei, max={self.upperLimitForBaseFeeInGwei} gwei]"
             )
 
-        # If not explicitly given, fetch the nonce on chain
-        tx["nonce"] = self.getNonce() if nonce is None else nonce
+        # If not explicitly given, get the next nonce from the manager
+        tx["nonce"] = self.getNonceManager().acquire() if nonce is None else nonce
 
         # If needed, let web3 compute the gas-limit on chain.
         # For more details, see docs of ContractFunction.transact in
@@ -189,11 +251,15 @@ class Web3Client:
             gasLimit,
             maxPriorityFeePerGasInGwei,
         )
-        extraParams: TxParams = {
-            "to": to,
-            "value": self.w3.toWei(valueInEth, "ether"),
-            "gas": self.estimateGasForTransfer(to, valueInEth),  # type: ignore
-        }
+        try:
+            extraParams: TxParams = {
+                "to": to,
+                "value": self.w3.toWei(valueInEth, "ether"),
+                "gas": self.estimateGasForTransfer(to, valueInEth),  # type: ignore
+            }
+        except:
+            self.getNonceManager().release(tx["nonce"])
+            raise
         return tx | extraParams
 
     def buildContractTransaction(
@@ -208,13 +274,75 @@ class Web3Client:
 
         Requires passing the contract function as detailed in the docs:
         https://web3py.readthedocs.io/en/stable/web3.eth.account.html#sign-a-contract-transaction
+
+        If not given, the gas limit is taken from the gas limit cache, if
+        set, and otherwise estimated on chain.
         """
+        if gasLimit is None and self.gasLimitCache:
+            gasLimit = self.gasLimitCache.get(
+                contractFunction.address, contractFunction.selector
+            )
         baseTx = self.buildBaseTransaction(
             nonce,
             gasLimit,
             maxPriorityFeePerGasInGwei,
         )
-        return contractFunction.buildTransaction(baseTx)
+        try:
+            return contractFunction.buildTransaction(baseTx)
+        except:
+            self.getNonceManager().release(baseTx["nonce"])
+            raise
+
+    ####################
+    # Simulate Tx
+    ####################
+
+    def simulateContractTransaction(
+        self, contractFunction: ContractFunction, estimateGas: bool = True
+    ) -> TxSimulation:
+        """
+        Check whether a contract transaction would succeed, without
+        sending it.
+
+        The transaction is executed with eth_call against the pending
+        block; in the same JSON-RPC batch request we also estimate its
+        gas (unless estimateGas is False) and fetch the transaction count
+        of the account, so that the simulation itself takes a single
+        round trip to the node.
+
+        The nonce manager is synced with the transaction count, if needed;
+        building the transaction afterwards does not need to fetch the
+        nonce again, but it may still fetch the fee history, if the fee
+        oracle has no recent one.
+        """
+        call = {
+            "from": self.userAddress,
+            "to": contractFunction.address,
+            "data": RpcBatch.encodeFunctionCall(contractFunction),
+        }
+        with self.batch() as batch:
+            callResult: BatchResult[HexStr] = batch.add("eth_call", [call, "pending"])
+            transactionCount = batch.getTransactionCount(self.userAddress)
+            gasEstimate = batch.estimateGas(call) if estimateGas else None
+
+        self.getNonceManager().observeTransactionCount(transactionCount.get())
+
+        if callResult.failed():
+            return {
+                "success": False,
+                "revertReason": self.decodeRevertReason(callResult.error),
+                "gasEstimate": None,
+                "transactionCount": transactionCount.get(),
+            }
+
+        return {
+            "success": True,
+            "revertReason": None,
+            "gasEstimate": None
+            if not gasEstimate or gasEstimate.failed()
+            else gasEstimate.get(),
+            "transactionCount": transactionCount.get(),
+        }
 
     ####################
     # Sign & send Tx
@@ -229,24 +357,121 @@ class Web3Client:
 
     def sendSignedTransaction(self, signedTx: SignedTransaction) -> HexStr:
         """
-        Send a signed transaction and return the tx hash
+        Send a signed transaction and return the tx hash.
+
+        If the node already knows the tx (e.g. because it was sent to
+        another node of the pool) the hash is returned, as if the tx
+        had just been accepted.
         """
-        tx_hash = self.w3.eth.send_raw_transaction(signedTx.rawTransaction)
-        return self.w3.toHex(tx_hash)
+        txHash = self.w3.toHex(signedTx.hash)
+        provider = self.w3.provider
+        if self.broadcastTxs and isinstance(provider, PooledProvider):
+            return self.broadcastSignedTransaction(provider.pool, signedTx)
+        try:
+            return self.w3.toHex(
+                self.w3.eth.send_raw_transaction(signedTx.rawTransaction)
+            )
+        except ValueError as e:
+            if not self.isAlreadyKnownError(e):
+                raise
+            return txHash
+
+    def broadcastSignedTransaction(
+        self, pool: ProviderPool, signedTx: SignedTransaction
+    ) -> HexStr:
+        """
+        Send a signed transaction to all the nodes of the given pool at
+        the same time, and return the tx hash as soon as one of them
+        accepts it; remember which node that was, so that it can be
+        credited once the tx is mined.
+
+        If no node accepts the tx, but some already have it (e.g. it
+        was sent before), the tx hash is returned all the same, and no
+        node is credited.
+        """
+        txHash = self.w3.toHex(signedTx.hash)
+        (nodeUri, response) = pool.broadcast(
+            RPCEndpoint("eth_sendRawTransaction"),
+            [self.w3.toHex(signedTx.rawTransaction)],
+            lambda r: "result" in r,
+            lambda r: self.isAlreadyKnownError(r.get("error")),
+        )
+        if "result" in response:
+            self.rememberBroadcastNode(txHash, nodeUri)
+        elif not self.isAlreadyKnownError(response.get("error")):
+            raise ValueError(response.get("error", response))
+        return txHash
 
     def signAndSendTransaction(self, tx: TxParams) -> HexStr:
         """
-        Sign a transaction and send it
+        Sign a transaction and send it.
+
+        If the node rejects the nonce of the transaction, sync the nonce
+        manager with the chain and try again once, with a fresh nonce;
+        if sending fails for any other reason, give the nonce back to
+        the manager.
         """
-        signedTx = self.signTransaction(tx)
-        return self.sendSignedTransaction(signedTx)
+        nonceManager = self.getNonceManager()
+        try:
+            txHash = self.sendSignedTransaction(self.signTransaction(tx))
+        except Exception as e:
+            if not NonceManager.isNonceError(e) or not nonceManager.isIssued(
+                tx["nonce"]
+            ):
+                nonceManager.release(tx["nonce"])
+                raise
+            nonceManager.sync()
+            tx = tx | {"nonce": nonceManager.acquire()}
+            try:
+                txHash = self.sendSignedTransaction(self.signTransaction(tx))
+            except:
+                nonceManager.release(tx["nonce"])
+                raise
+        nonceManager.confirm(tx["nonce"])
+        self.trackGasUsage(txHash, tx)
+        return txHash
 
     def getTransactionReceipt(self, txHash: HexStr) -> TxReceipt:
         """
         Given a transaction hash, wait for the blockchain to confirm
         it and return the tx receipt.
         """
-        return self.w3.eth.wait_for_transaction_receipt(txHash)
+        txReceipt = self.w3.eth.wait_for_transaction_receipt(txHash)
+        self.learnGasUsage(txHash, txReceipt)
+        self.learnInclusion(txHash)
+        return txReceipt
+
+    def waitForTransactionReceipts(
+        self, txHashes: Sequence[HexStr], timeout: float = 120, pollLatency: float = 0.5
+    ) -> Iterator[Tuple[HexStr, TxReceipt]]:
+        """
+        Wait for the blockchain to confirm the given transactions, and
+        yield each tx hash together with its receipt, as soon as the
+        receipt is available.
+
+        The receipts of all pending transactions are polled with a
+        single batch request, every pollLatency seconds. Transactions
+        that are not mined within timeout seconds are not yielded: it is
+        up to the caller to check for them.
+        """
+        pending = list(dict.fromkeys(txHashes))
+        deadline = monotonic() + timeout
+        while pending:
+            with self.batch() as batch:
+                results = [batch.getTransactionReceipt(h) for h in pending]
+            stillPending: List[HexStr] = []
+            for (txHash, result) in zip(pending, results):
+                txReceipt = None if result.failed() else result.get()
+                if txReceipt is None:
+                    stillPending.append(txHash)
+                    continue
+                self.learnGasUsage(txHash, txReceipt)
+                self.learnInclusion(txHash)
+                yield (txHash, txReceipt)
+            pending = stillPending
+            if not pending or monotonic() + pollLatency > deadline:
+                return
+            sleep(pollLatency)
 
     def getTransaction(self, txHash: HexStr) -> TxData:
         """
@@ -278,11 +503,102 @@ class Web3Client:
     # Utils
     ####################
 
+    def batch(self) -> RpcBatch:
+        """
+        Return a new batch of JSON-RPC requests, to be sent to the node
+        in a single HTTP request; use it as a context manager:
+
+            with client.batch() as batch:
+                count = batch.getTransactionCount(address)
+                balance = batch.getBalance(address)
+            print(count.get(), balance.get())
+        """
+        return RpcBatch(self)
+
+    def sendBatchRequest(
+        self, requests: List[Tuple[str, List[Any]]]
+    ) -> List[RPCResponse]:
+        """
+        Send several JSON-RPC requests, each given as a (method, params)
+        tuple, in a single HTTP request, and return the raw responses,
+        in the same order as the requests.
+
+        The responses are not formatted nor checked for errors: each of
+        them has either a 'result' or an 'error' key. Requests go
+        straight to the node, bypassing the web3.py middlewares; with
+        non-HTTP providers, they are sent one by one.
+
+        With a ProviderPool, the batch goes to the fastest healthy
+        node, and to the next one if it fails; requests about a filter
+        go to the node that created the filter.
+        """
+        provider = self.w3.provider
+        if isinstance(provider, PooledProvider):
+            return provider.pool.sendRequests(requests, self.postBatchRequest)
+        return self.postBatchRequest(provider, requests)
+
+    @staticmethod
+    def postBatchRequest(
+        provider: BaseProvider, requests: List[Tuple[str, List[Any]]]
+    ) -> List[RPCResponse]:
+        """
+        Send the given requests to the node of the given provider, in
+        a single HTTP request if possible; see sendBatchRequest()
+        """
+        if not isinstance(provider, HTTPProvider):
+            return [provider.make_request(m, p) for (m, p) in requests]  # type: ignore
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for (i, (method, params)) in enumerate(requests)
+        ]
+        rawResponse = make_post_request(
+            provider.endpoint_uri,
+            json.dumps(payload).encode(),
+            **dict(provider.get_request_kwargs()),
+        )
+        responses = json.loads(rawResponse)
+        if not isinstance(responses, list):
+            # The node refused the batch as a whole
+            raise ValueError(responses.get("error", responses))
+        responsesById = {r["id"]: r for r in responses}
+        return [responsesById[i] for i in range(len(requests))]
+
     def getNonce(self, address: Address = None) -> Nonce:
         if not address:
             address = self.userAddress
         return self.w3.eth.get_transaction_count(address)
 
+    def getNonceManager(self) -> NonceManager:
+        """
+        Return the nonce manager of the client's account; the manager
+        is shared with all the other clients of the same account on the
+        same chain, so that they never hand out the same nonce
+        """
+        if not self.nonceManager:
+            self.nonceManager = NonceManager.forAccount(
+                self.chainId,
+                self.userAddress,
+                lambda: self.w3.eth.get_transaction_count(self.userAddress, "pending"),
+            )
+        return self.nonceManager
+
+    def prefetchTransactionData(self, fetchNonce: bool = True) -> None:
+        """
+        If both the nonce manager and the fee oracle need to query
+        the node, fetch the transaction count and the fee history of the
+        latest block with a single batch request; otherwise do nothing,
+        and let them fetch what they need on their own
+        """
+        nonceManager = self.getNonceManager()
+        feeOracle = self.getFeeOracle()
+        if not (fetchNonce and not nonceManager.isSynced() and feeOracle.isStale()):
+            return
+        with self.batch() as batch:
+            transactionCount = batch.getTransactionCount(self.userAddress)
+            feeHistory = batch.feeHistory(1, "latest", feeOracle.rewardPercentiles)
+        nonceManager.observeTransactionCount(transactionCount.get())
+        feeOracle.storeFeeHistory(feeHistory.get(), "latest")
+
     def estimateMaxFeePerGasInGwei(
         self, maxPriorityFeePerGasInGwei: float
     ) -> Tuple[float, float]:
@@ -293,16 +609,89 @@ class Web3Client:
         This is the same formula used by web3 and here
         https://ethereum.stackexchange.com/a/113373/89782
 
-        The baseFee is fetched on chain from the latest block.
+        The baseFee is the one of the latest block, as given by the
+        fee oracle, which caches it.
 
         Returns both the estimate (in gwei) and the baseFee
         (also in gwei).
         """
-        latest_block = self.w3.eth.get_block("latest")
-        baseFeeInWei = latest_block["baseFeePerGas"]
+        baseFeeInWei = self.getFeeOracle().getBaseFeeInWei()
         baseFeeInGwei = float(Web3.fromWei(baseFeeInWei, "gwei"))
         return (2 * baseFeeInGwei + maxPriorityFeePerGasInGwei, baseFeeInGwei)
 
+    def estimatePriorityFeePerGasInGwei(self) -> float:
+        """
+        Return the miner's tip to use by default: if a percentile was
+        set, the tip paid at that percentile in the latest block,
+        otherwise the fixed value of maxPriorityFeePerGasInGwei
+        """
+        if self.priorityFeePercentile is None:
+            return self.maxPriorityFeePerGasInGwei
+        priorityFeeInWei = self.getFeeOracle().getPriorityFeeInWei(
+            self.priorityFeePercentile
+        )
+        return float(Web3.fromWei(priorityFeeInWei, "gwei"))
+
+    def trackGasUsage(self, txHash: HexStr, tx: TxParams) -> None:
+        """
+        Remember the contract function called by the given tx, so that
+        its gas usage can be learnt once the receipt is available
+        """
+        if self.gasLimitCache and tx.get("to") and tx.get("data"):
+            selector = cast(str, tx["data"])[:10]
+            self.gasTrackedTxs[txHash] = (cast(str, tx["to"]), selector, tx["gas"])
+
+    def learnGasUsage(self, txHash: HexStr, txReceipt: TxReceipt) -> None:
+        """
+        Update the gas limit cache with the gas used by the given tx;
+        if the tx ran out of gas, forget what we know about its function
+        """
+        tracked = self.gasTrackedTxs.pop(txHash, None)
+        if not tracked or not self.gasLimitCache:
+            return
+        (contractAddress, selector, gasLimit) = tracked
+        if txReceipt["status"] == 1:
+            self.gasLimitCache.learn(contractAddress, selector, txReceipt["gasUsed"])
+        elif txReceipt["gasUsed"] >= gasLimit:
+            self.gasLimitCache.invalidate(contractAddress, selector)
+
+    def rememberBroadcastNode(self, txHash: HexStr, nodeUri: str) -> None:
+        """
+        Remember which node was the first to accept the given tx;
+        forget the oldest txs beyond maxBroadcastTxNodes, as the
+        receipts of some txs are never fetched
+        """
+        self.broadcastTxNodes[txHash] = nodeUri
+        while len(self.broadcastTxNodes) > self.maxBroadcastTxNodes:
+            self.broadcastTxNodes.popitem(last=False)
+
+    def learnInclusion(self, txHash: HexStr) -> None:
+        """
+        Credit the node that was the first to accept the given tx, now
+        that it is mined, if the tx was broadcast
+        """
+        nodeUri = self.broadcastTxNodes.pop(txHash, None)
+        provider = self.w3.provider
+        if nodeUri and isinstance(provider, PooledProvider):
+            provider.pool.recordInclusion(nodeUri)
+
+    def getFeeOracle(self) -> FeeOracle:
+        """
+        Return the fee oracle of the client, creating it if needed
+        """
+        if not self.feeOracle:
+            self.feeOracle = FeeOracle(self.w3)
+        return self.feeOracle
+
+    def getMulticall(self) -> Multicall:
+        """
+        Return the Multicall of the client, creating it with the
+        standard Multicall3 address if needed
+        """
+        if not self.multicall:
+            self.multicall = Multicall(self.w3)
+        return self.multicall
+
     def getLatestBlock(self) -> BlockData:
         """
         Return the latest block
@@ -354,13 +743,19 @@ class Web3Client:
             return json.load(file)
 
     @staticmethod
-    def getProvider(nodeUri: str) -> Web3:
+    def getProvider(nodeUri: Union[str, ProviderPool]) -> Web3:
         """
-        Initialize provider (HTTPS & WS supported).
+        Initialize provider (HTTPS & WS supported); several
+        comma-separated URIs, or a ProviderPool, make a pooled
+        provider.
 
         TODO: Support autodetection with empty nodeUri
         docs here https://web3py.readthedocs.io/en/stable/providers.html#how-automated-detection-works
         """
+        if isinstance(nodeUri, ProviderPool):
+            return Web3(PooledProvider(nodeUri))
+        if "," in nodeUri:
+            return Web3(PooledProvider(ProviderPool(nodeUri.split(","))))
         if nodeUri[0:4] == "http":
             return Web3(Web3.HTTPProvider(nodeUri))
         elif nodeUri[0:2] == "ws":
@@ -368,6 +763,50 @@ class Web3Client:
         else:
             return Web3()
 
+    maxBroadcastTxNodes: int = 1024
+    """
+    How many broadcast txs to remember the first accepting node of
+    """
+
+    alreadyKnownErrors: Tuple[str, ...] = (
+        "already known",
+        "known transaction",
+        "already imported",
+        "already in mempool",
+    )
+    """
+    Bits of the error messages returned by the nodes when they
+    already have the tx being sent
+    """
+
+    @classmethod
+    def isAlreadyKnownError(cls, error: Any) -> bool:
+        """
+        Whether the given error, raised or returned while sending a
+        transaction, means that the node already has the transaction
+        """
+        message = str(error).lower()
+        return error is not None and any(e in message for e in cls.alreadyKnownErrors)
+
+    @staticmethod
+    def decodeRevertReason(error: Any) -> str:
+        """
+        Given the error returned by the node for a reverted eth_call,
+        return the revert reason in a readable form
+        """
+        message = str(error.get("message", "")) if isinstance(error, dict) else ""
+        data = error.get("data") if isinstance(error, dict) else None
+        if isinstance(data, dict):  # some nodes nest the revert data
+            data = data.get("data")
+        if isinstance(data, str) and data.startswith("0x08c379a0"):
+            # Error(string)
+            return decode_abi(["string"], bytes.fromhex(data[10:]))[0]
+        if isinstance(data, str) and data.startswith("0x4e487b71"):
+            # Panic(uint256)
+            code = decode_abi(["uint256"], bytes.fromhex(data[10:]))[0]
+            return f"panic code {hex(code)}"
+        return message.removeprefix("execution reverted: ") or str(error)
+
     @staticmethod
     def getGasSpentInEth(txReceipt: TxReceipt) -> float:
         """
@@ -1,13 +1,14 @@
-from typing import Any, Type, cast
+from typing import Any, Type, Union, cast
 from eth_typing import Address
 from src.libs.Web3Client.Erc20Web3Client import Erc20Web3Client
+from src.libs.Web3Client.ProviderPool import ProviderPool
 from src.libs.Web3Client.Web3Client import Web3Client
 from src.libs.Web3Client.networks import getNetworkConfig
 
 
 def makeWeb3Client(
     networkName: str,
-    nodeUri: str,
+    nodeUri: Union[str, ProviderPool],
     base: Type[Web3Client] = Web3Client,
     **clientArgs: Any
 ) -> Web3Client:
@@ -24,7 +25,10 @@ def makeWeb3Client(
 
 
 def makeErc20Client(
-    networkName: str, nodeUri: str, tokenAddress: Address, **clientArgs: Any
+    networkName: str,
+    nodeUri: Union[str, ProviderPool],
+    tokenAddress: Address,
+    **clientArgs: Any
 ) -> Erc20Web3Client:
     """
     Return a brand new client configured for the given blockchain
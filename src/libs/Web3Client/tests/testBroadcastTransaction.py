@@ -0,0 +1,40 @@
+from sys import argv
+from typing import cast
+from eth_typing import Address
+from src.common.config import nodeUris, users
+from src.libs.Web3Client.AvalancheCWeb3Client import AvalancheCWeb3Client
+from src.libs.Web3Client.ProviderPool import ProviderPool
+from src.libs.Web3Client.helpers.debug import printTxInfo
+from pprint import pprint
+
+# VARS
+pool = ProviderPool(nodeUris)
+client = AvalancheCWeb3Client(
+    nodeUri=pool,
+    privateKey=users[0]["privateKey"],
+)
+client.setBroadcastTxs(True)
+
+to = cast(Address, "0xBc3a38C981B13625FAF7729fF105Cb6E15bdDE3A")
+valueInEth = 0.00001  # ETH / AVAX / etc
+
+# TEST FUNCTIONS
+def testSend() -> None:
+    tx = client.buildTransactionWithValue(to, valueInEth)
+    signedTx = client.signTransaction(tx)
+    txHash = client.sendSignedTransaction(signedTx)
+    print(f">>> FIRST NODE TO ACCEPT THE TX")
+    pprint(client.broadcastTxNodes.get(txHash))
+    print(f">>> SAME TX AGAIN (ALREADY KNOWN)")
+    pprint(client.sendSignedTransaction(signedTx) == txHash)
+    client.getTransactionReceipt(txHash)
+    printTxInfo(client, txHash)
+    print(">>> NODES")
+    pprint(pool.getStats())
+
+
+# EXECUTE
+if len(argv) > 1 and argv[1] == "--send":
+    testSend()
+else:
+    print("Pass --send to broadcast a tx")
@@ -0,0 +1,20 @@
+from src.common.config import nodeUri
+from src.libs.Web3Client.FeeOracle import FeeOracle
+from src.libs.Web3Client.Web3Client import Web3Client
+from pprint import pprint
+
+# VARS
+oracle = FeeOracle(Web3Client.getProvider(nodeUri))
+
+# TEST FUNCTIONS
+def test() -> None:
+    print(">>> BASE FEE OF LATEST BLOCK (WEI)")
+    pprint(oracle.getBaseFeeInWei())
+    print(f">>> PRIORITY FEES AT PERCENTILES {oracle.rewardPercentiles} (WEI)")
+    pprint([oracle.getPriorityFeeInWei(p) for p in oracle.rewardPercentiles])
+    print(f">>> CACHED BLOCKS")
+    pprint(oracle.baseFees)
+
+
+# EXECUTE
+test()
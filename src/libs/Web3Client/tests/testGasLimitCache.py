@@ -0,0 +1,25 @@
+from src.libs.Web3Client.GasLimitCache import GasLimitCache
+from pprint import pprint
+
+# VARS
+cache = GasLimitCache("storage/cache/testGasLimits.json")
+contractAddress = "0x82a85407bd612f52577909f4a58bfc6873f14da8"
+selector = "0xe5ed1d59"  # startGame(uint256)
+
+# TEST FUNCTIONS
+def test() -> None:
+    print(">>> COLD CACHE")
+    pprint(cache.get(contractAddress, selector))
+    for gasUsed in [150000, 165000, 140000]:
+        cache.learn(contractAddress, selector, gasUsed)
+    print(">>> AFTER THREE TXS (HIGHEST GAS USED + 20%)")
+    pprint(cache.get(contractAddress, selector))
+    print(">>> RELOADED FROM FILE")
+    pprint(GasLimitCache(cache.filePath).get(contractAddress, selector))
+    cache.invalidate(contractAddress, selector)
+    print(">>> AFTER OUT OF GAS")
+    pprint(cache.get(contractAddress, selector))
+
+
+# EXECUTE
+test()
@@ -0,0 +1,41 @@
+from typing import cast
+from eth_typing import Address
+from src.common.config import nodeUri, users
+from src.libs.Web3Client.Multicall import Multicall
+from src.libs.Web3Client.Web3ClientFactory import makeErc20Client
+from pprint import pprint
+
+# VARS
+tusTokenAddress = cast(Address, "0xf693248F96Fe03422FEa95aC0aFbBBc4a8FdD172")
+client = makeErc20Client("Avalanche", nodeUri, tusTokenAddress)
+multicall = client.getMulticall()
+
+# The Multicall3 contract has no balanceOf, so this call reverts
+notAToken = client.w3.eth.contract(
+    address=Multicall.multicall3Address, abi=client.contract.abi
+)
+
+# TEST FUNCTIONS
+def test() -> None:
+    fns = client.contract.functions
+    contractFunctions = [
+        fns.name(),
+        fns.symbol(),
+        fns.decimals(),
+        fns.totalSupply(),
+        fns.balanceOf(users[0]["address"]),
+        notAToken.functions.balanceOf(users[0]["address"]),
+    ]
+    block = client.w3.eth.block_number
+    results = multicall.call(contractFunctions, block)
+    print(">>> MULTICALL RESULTS")
+    pprint(results)
+    print(">>> SAME AS SINGLE CALLS?")
+    singleResults = [f.call(block_identifier=block) for f in contractFunctions[:-1]]
+    pprint(results[:-1] == singleResults)
+    print(">>> REVERTED CALL IS NONE?")
+    pprint(results[-1] is None)
+
+
+# EXECUTE
+test()
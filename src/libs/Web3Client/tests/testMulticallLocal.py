@@ -0,0 +1,30 @@
+from web3 import EthereumTesterProvider, Web3
+from src.libs.Web3Client.Multicall import Multicall
+from src.libs.Web3Client.Web3Client import Web3Client
+from pprint import pprint
+
+# Needs eth-tester[py-evm], which is not among the requirements
+
+# VARS
+client = Web3Client(nodeUri=None)
+client.w3 = Web3(EthereumTesterProvider())
+client.setMulticall(Multicall.deploy(client.w3))
+multicall = client.getMulticall()
+
+# TEST FUNCTIONS
+def test() -> None:
+    print(">>> MULTICALL DEPLOYED AT")
+    print(multicall.address)
+    fns = multicall.contract.functions
+    contractFunctions = [fns.getBlockNumber(), fns.getCurrentBlockTimestamp()]
+    block = client.w3.eth.block_number
+    results = multicall.call(contractFunctions, block)
+    print(">>> MULTICALL RESULTS")
+    pprint(results)
+    print(">>> SAME AS SINGLE CALLS?")
+    singleResults = [f.call(block_identifier=block) for f in contractFunctions]
+    pprint(results == singleResults)
+
+
+# EXECUTE
+test()
@@ -0,0 +1,25 @@
+from src.common.config import nodeUri, users
+from src.libs.Web3Client.Web3Client import Web3Client
+from pprint import pprint
+
+# VARS
+client = Web3Client(
+    nodeUri=nodeUri,
+    privateKey=users[0]["privateKey"],
+)
+nonceManager = client.getNonceManager()
+
+# TEST FUNCTIONS
+def test() -> None:
+    print(">>> NONCE ON CHAIN")
+    pprint(client.getNonce())
+    print(">>> THREE NONCES FROM THE MANAGER")
+    nonces = [nonceManager.acquire() for _ in range(3)]
+    pprint(nonces)
+    print(">>> RELEASE THE SECOND ONE AND ACQUIRE AGAIN")
+    nonceManager.release(nonces[1])
+    pprint(nonceManager.acquire())
+
+
+# EXECUTE
+test()
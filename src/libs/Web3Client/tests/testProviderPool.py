@@ -0,0 +1,25 @@
+from src.common.config import nodeUris
+from src.libs.Web3Client.ProviderPool import ProviderPool
+from src.libs.Web3Client.Web3Client import Web3Client
+from pprint import pprint
+
+# VARS
+pool = ProviderPool(nodeUris + ["http://localhost:1"])  # the last node is down
+clients = [Web3Client(nodeUri=pool) for _ in range(3)]
+
+# TEST FUNCTIONS
+def test() -> None:
+    pool.warmUp()
+    print(">>> NODES AFTER WARM UP")
+    pprint(pool.getStats())
+    for client in clients:
+        with client.batch() as batch:
+            blockNumber = batch.blockNumber()
+        print(f">>> BLOCK NUMBER (SINGLE REQUEST, BATCH)")
+        pprint((client.w3.eth.block_number, blockNumber.get()))
+    print(">>> NODES")
+    pprint(pool.getStats())
+
+
+# EXECUTE
+test()
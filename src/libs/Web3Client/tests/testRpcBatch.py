@@ -0,0 +1,29 @@
+from src.common.config import nodeUri, users
+from src.libs.Web3Client.Web3Client import Web3Client
+from pprint import pprint
+
+# VARS
+client = Web3Client(
+    nodeUri=nodeUri,
+    privateKey=users[0]["privateKey"],
+)
+
+# TEST FUNCTIONS
+def test() -> None:
+    with client.batch() as batch:
+        blockNumber = batch.blockNumber()
+        nonce = batch.getTransactionCount(client.userAddress)
+        balance = batch.getBalance(client.userAddress)
+        feeHistory = batch.feeHistory(1, "latest", [10, 50, 90])
+    print(">>> BLOCK NUMBER")
+    pprint(blockNumber.get())
+    print(">>> NONCE (PENDING)")
+    pprint(nonce.get())
+    print(">>> BALANCE IN ETH")
+    pprint(client.w3.fromWei(balance.get(), "ether"))
+    print(">>> FEE HISTORY")
+    pprint(feeHistory.get())
+
+
+# EXECUTE
+test()
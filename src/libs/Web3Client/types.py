@@ -1,4 +1,4 @@
-from typing import List, TypedDict
+from typing import List, Optional, TypedDict
 from web3.types import Middleware
 
 
@@ -12,3 +12,26 @@ class NetworkConfig(TypedDict):
     txType: int
     chainId: int
     middlewares: List[Middleware]
+
+
+class TxSimulation(TypedDict):
+    """
+    Outcome of the pre-flight simulation of a transaction, see
+    Web3Client.simulateContractTransaction()
+    """
+
+    success: bool
+    revertReason: Optional[str]
+    gasEstimate: Optional[int]
+    transactionCount: int
+
+
+class TokenInfo(TypedDict):
+    """
+    Metadata of an ERC20 token, see Erc20Web3Client.getTokenInfo()
+    """
+
+    name: str
+    symbol: str
+    decimals: int
+    totalSupply: int
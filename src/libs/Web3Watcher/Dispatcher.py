@@ -0,0 +1,133 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from threading import Condition
+from typing import Any, Callable, Deque, Hashable, TypedDict
+import logging
+
+
+class DispatcherMetrics(TypedDict):
+    inflight: int
+    queued: int
+    running: int
+    maxQueued: int
+    processed: int
+    failed: int
+
+
+class Dispatcher:
+    """
+    Run jobs on a bounded pool of threads, so that a watcher can keep
+    polling while its handlers are busy (e.g. waiting for a receipt).
+
+    Jobs submitted under the same key (e.g. the game ID of an event)
+    run one at a time, in the order they were submitted; jobs with
+    different keys, or with no key, run concurrently.
+
+    At most maxInflight jobs can be queued or running at the same time:
+    beyond that, submit() blocks until a job is done, so that a slow
+    consumer slows down the producer instead of piling up entries.
+
+    Attributes
+    ----------------------
+    maxWorkers: int = 4 | How many jobs can run at the same time (optional)
+    maxInflight: int = 100 | How many jobs can be queued or running before submit() blocks (optional)
+    keyOf: Callable[[Any], Hashable] = None | Function that returns the ordering key of an item, or None for no ordering (optional)
+    logger: Logger = logging | Where to log the errors raised by the jobs (optional)
+    """
+
+    def __init__(
+        self,
+        maxWorkers: int = 4,
+        maxInflight: int = 100,
+        keyOf: Callable[[Any], Hashable] = None,
+        logger: Logger = logging,  # type: ignore
+    ) -> None:
+        self.maxWorkers: int = maxWorkers
+        self.maxInflight: int = maxInflight
+        self.keyOf: Callable[[Any], Hashable] = keyOf or (lambda item: None)
+        self.logger: Logger = logger
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers)
+        self.condition = Condition()
+        self.queues: dict[Hashable, Deque[Callable[[], Any]]] = {}
+        self.inflight: int = 0
+        self.running: int = 0
+        self.maxQueued: int = 0
+        self.processed: int = 0
+        self.failed: int = 0
+
+    def submit(self, item: Any, fn: Callable[[Any], Any]) -> None:
+        """
+        Run fn(item) in the pool, after the jobs previously submitted
+        with the same key; block while the dispatcher is full
+        """
+        key = self.keyOf(item)
+        job = lambda: fn(item)
+        with self.condition:
+            while self.inflight >= self.maxInflight:
+                self.condition.wait()
+            self.inflight += 1
+            self.maxQueued = max(self.maxQueued, self.inflight - self.running)
+            if key is None:
+                self.executor.submit(self.runJobs, None, deque([job]))
+            elif key in self.queues:
+                self.queues[key].append(job)
+            else:
+                self.queues[key] = deque([job])
+                self.executor.submit(self.runJobs, key, self.queues[key])
+
+    def runJobs(self, key: Hashable, jobs: Deque[Callable[[], Any]]) -> None:
+        """
+        Run the jobs of the given key, one after the other, until there
+        are no more
+        """
+        while True:
+            with self.condition:
+                if not jobs:
+                    if key is not None:
+                        del self.queues[key]
+                    return
+                job = jobs.popleft()
+                self.running += 1
+            try:
+                job()
+                failed = False
+            except Exception as e:
+                self.logger.error(f"Dispatcher: error in job with key {key}: {e}")
+                failed = True
+            with self.condition:
+                self.running -= 1
+                self.inflight -= 1
+                self.processed += 1
+                self.failed += failed
+                self.condition.notify_all()
+
+    def join(self, timeout: float = None) -> bool:
+        """
+        Wait until all submitted jobs are done; return False if the
+        timeout expired first
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.inflight == 0, timeout)
+
+    def shutdown(self) -> None:
+        """
+        Wait for the submitted jobs, then stop the threads
+        """
+        self.executor.shutdown(wait=True)
+
+    def getMetrics(self) -> DispatcherMetrics:
+        """
+        Return how many jobs are in flight, queued and running, the
+        longest queue seen, and how many jobs were processed so far
+        and how many of those failed
+        """
+        with self.condition:
+            return {
+                "inflight": self.inflight,
+                "queued": self.inflight - self.running,
+                "running": self.running,
+                "maxQueued": self.maxQueued,
+                "processed": self.processed,
+                "failed": self.failed,
+            }
@@ -0,0 +1,183 @@
+from __future__ import annotations
+from collections import deque
+from typing import Any, Deque, Hashable, List, Optional, Set, TypedDict
+from hexbytes import HexBytes
+from requests.exceptions import RequestException
+from web3.types import FilterParams, LogReceipt
+from src.libs.Web3Client.RpcBatch import BatchResult, RpcBatch
+from src.libs.Web3Client.Web3Client import Web3Client
+from src.libs.Web3Watcher.Watcher import Watcher
+
+
+class WatchedFilter(TypedDict):
+    params: dict[str, Any]
+    filterId: Optional[str]
+    syncedBlock: Optional[int]
+
+
+class MultiFilterWatcher(Watcher):
+    """
+    Watcher that polls many log filters at once (e.g. one per event or
+    per contract), with a single batched JSON-RPC request per poll.
+
+    Add the filters with addFilterParams(); log entries matching any
+    of them are passed to the handlers, in chain order.
+
+    Filters are installed on the node with eth_newFilter. If the node
+    forgets a filter (the infamous 'filter not found' error of HTTP
+    nodes), the filter is installed again on the next poll, and the
+    log entries missed in the meantime are fetched with eth_getLogs,
+    starting from the last block seen. Log entries received twice,
+    e.g. because filters overlap, are passed to the handlers only once.
+
+    Attributes
+    ----------------------
+    client: Web3Client | Client of the watched chain
+    """
+
+    maxBlocksPerGapRequest: int = 2048
+    """
+    Fetch the missed log entries in chunks of at most this many blocks
+    """
+
+    dedupWindow: int = 4096
+    """
+    How many of the most recent entries to remember, to skip duplicates
+    """
+
+    def __init__(self, client: Web3Client, doAsync: bool = False) -> None:
+        super().__init__(client, doAsync)
+        self.filters: List[WatchedFilter] = []
+        self.lastHead: Optional[int] = None
+        self.seenKeys: Set[Hashable] = set()
+        self.seenKeysOrder: Deque[Hashable] = deque()
+
+    def addFilterParams(self, params: FilterParams) -> MultiFilterWatcher:
+        """
+        Watch the log entries matching the given params (address and
+        topics, JSON-ready); if an integer fromBlock is given, the log
+        entries since that block are fetched on the first poll.
+        """
+        fromBlock = params.get("fromBlock")
+        self.filters.append(
+            {
+                "params": {
+                    k: v for (k, v) in params.items() if k in ["address", "topics"]
+                },
+                "filterId": None,
+                "syncedBlock": fromBlock - 1 if isinstance(fromBlock, int) else None,
+            }
+        )
+        return self
+
+    def setFilterParams(self, params: Any) -> Watcher:
+        """
+        A MultiFilterWatcher has many filters: use addFilterParams()
+        """
+        raise ValueError("Use addFilterParams() to add the filters")
+
+    def run(self, pollInterval: float) -> None:
+        """
+        Start watching for log entries
+        """
+        if not self.filters:
+            raise ValueError("No filter to watch, use addFilterParams() first")
+        super().run(pollInterval)
+
+    def getNewEntries(self, filter: Any = None) -> List[LogReceipt]:
+        """
+        Poll all filters with a single batch request, installing those
+        that are not installed yet, or not anymore, and return the new
+        log entries, in chain order
+        """
+        batch = self.client.batch()
+        headResult = batch.blockNumber()
+        requests = [(f, self.addFilterRequests(batch, f)) for f in self.filters]
+        try:
+            batch.send()
+        except (RequestException, ValueError) as e:
+            self.logger.warning(f"MultiFilterWatcher: error polling the node: {e}")
+            return []
+
+        head = None if headResult.failed() else headResult.get()
+        newEntries: List[LogReceipt] = []
+        for (f, results) in requests:
+            entries = self.processFilterResults(f, results, head)
+            newEntries += [e for e in entries if self.isNew(e)]
+        if head is not None:
+            self.lastHead = head
+        return sorted(newEntries, key=lambda e: (e["blockNumber"], e["logIndex"]))
+
+    def addFilterRequests(
+        self, batch: RpcBatch, f: WatchedFilter
+    ) -> List[BatchResult[Any]]:
+        """
+        Add to the batch the requests needed to poll the given filter:
+        either the changes since the last poll, or, if the filter is not
+        installed, the request to install it followed by the requests to
+        fetch the log entries missed since the last block seen
+        """
+        if f["filterId"] is not None:
+            return [batch.add("eth_getFilterChanges", [f["filterId"]])]
+        results: List[BatchResult[Any]] = [batch.add("eth_newFilter", [f["params"]])]
+        if f["syncedBlock"] is None:
+            return results
+        start = f["syncedBlock"] + 1
+        lastKnownBlock = self.lastHead if self.lastHead is not None else start
+        while start + self.maxBlocksPerGapRequest <= lastKnownBlock:
+            end = start + self.maxBlocksPerGapRequest - 1
+            results.append(self.addGetLogs(batch, f, start, hex(end)))
+            start = end + 1
+        results.append(self.addGetLogs(batch, f, start, "latest"))
+        return results
+
+    def processFilterResults(
+        self, f: WatchedFilter, results: List[BatchResult[Any]], head: Optional[int]
+    ) -> List[LogReceipt]:
+        """
+        Update the state of the given filter with the results of its
+        requests, and return the log entries they found
+        """
+        if f["filterId"] is not None:
+            if results[0].failed():
+                self.logger.info(
+                    f"MultiFilterWatcher: filter {f['filterId']} lost ({results[0].error}), reinstalling it"
+                )
+                f["filterId"] = None
+                return []
+            if head is not None:
+                f["syncedBlock"] = head
+            return results[0].get() or []
+
+        # Install request, followed by the gap requests, if any
+        (install, gaps) = (results[0], results[1:])
+        if install.failed() or any(r.failed() for r in gaps):
+            self.logger.warning(
+                f"MultiFilterWatcher: could not install filter {f['params']}, retrying"
+            )
+            return []
+        f["filterId"] = install.get()
+        if head is not None:
+            f["syncedBlock"] = head
+        return [e for r in gaps for e in r.get()]
+
+    @staticmethod
+    def addGetLogs(
+        batch: RpcBatch, f: WatchedFilter, fromBlock: int, toBlock: str
+    ) -> BatchResult[List[LogReceipt]]:
+        params = f["params"] | {"fromBlock": hex(fromBlock), "toBlock": toBlock}
+        return batch.add("eth_getLogs", [params])
+
+    def isNew(self, entry: LogReceipt) -> bool:
+        """
+        Whether the given log entry was not seen yet; it is identified
+        by its transaction hash and log index
+        """
+        key = (HexBytes(entry["transactionHash"]), entry["logIndex"])
+        if key in self.seenKeys:
+            return False
+        self.seenKeys.add(key)
+        self.seenKeysOrder.append(key)
+        if len(self.seenKeysOrder) > self.dedupWindow:
+            self.seenKeys.discard(self.seenKeysOrder.popleft())
+        return True
@@ -0,0 +1,256 @@
+from __future__ import annotations
+from collections import deque
+from itertools import count
+from typing import Any, Deque, Hashable, Iterator, List, Optional, Set, Union
+import asyncio
+import json
+from web3._utils.method_formatters import block_formatter, log_entry_formatter
+from web3.types import BlockParams, FilterParams
+from websockets.client import connect
+from websockets.exceptions import ConnectionClosed, InvalidHandshake, InvalidURI
+from src.libs.Web3Client.Web3Client import Web3Client
+from src.libs.Web3Watcher.Watcher import Watcher
+
+
+class SubscriptionWatcher(Watcher):
+    """
+    Watcher that, rather than polling a filter, subscribes to the node
+    via websocket (eth_subscribe), so that the handlers are fired as
+    soon as the node sees a new log entry or block.
+
+    Set the filter params with setFilterParams(): a dict of filter
+    params (address, topics) subscribes to the matching log entries,
+    while 'latest' subscribes to new blocks; in the latter case the
+    handlers receive the block headers.
+
+    Notifications are pushed into an asyncio queue, and the handlers
+    are run in a worker thread, one entry at a time and in order, so
+    that slow handlers do not stop the watcher from reading the socket.
+
+    If the connection drops, the watcher reconnects and subscribes
+    again; the log entries (or blocks) missed in the meantime are then
+    fetched with eth_getLogs (or eth_getBlockByNumber), so that none is
+    lost. Entries received twice are passed to the handlers only once.
+
+    Attributes
+    ----------------------
+    client: Web3Client | Client of the watched chain
+    wsUri: str | Websocket URI of the node, e.g. wss://api.avax.network/ext/bc/C/ws
+    maxReconnectDelayInSeconds: float = 30 | Longest wait between two reconnection attempts (optional)
+    """
+
+    maxBlocksPerGapRequest: int = 2048
+    """
+    Fetch the missed log entries in chunks of at most this many blocks
+    """
+
+    maxGapBlocks: int = 128
+    """
+    When subscribed to new blocks, fetch at most this many missed blocks
+    """
+
+    dedupWindow: int = 1024
+    """
+    How many of the most recent entries to remember, to skip duplicates
+    """
+
+    def __init__(
+        self, client: Web3Client, wsUri: str, maxReconnectDelayInSeconds: float = 30
+    ) -> None:
+        super().__init__(client, doAsync=True)
+        self.wsUri: str = wsUri
+        self.maxReconnectDelayInSeconds: float = maxReconnectDelayInSeconds
+        self.lastSyncedBlock: Optional[int] = None
+        self.seenKeys: Set[Hashable] = set()
+        self.seenKeysOrder: Deque[Hashable] = deque()
+        self.requestIds: Iterator[int] = count(1)
+        self.heldMessages: List[dict[str, Any]] = []
+
+    def setFilterParams(
+        self, params: Union[FilterParams, BlockParams]
+    ) -> SubscriptionWatcher:
+        """
+        Set what to subscribe to: log entries matching the given
+        params, or new blocks if params is 'latest'. Params must be
+        JSON-ready (e.g. topics as hex strings); block ranges are
+        ignored.
+        """
+        self.filterParams = params
+        return self
+
+    def run(self, pollInterval: float = None) -> None:
+        """
+        Start watching; pollInterval is ignored, as there is no polling
+        """
+        asyncio.run(self.asyncRun())
+
+    async def asyncRun(self) -> None:
+        """
+        Read the notifications from the node and fire the handlers;
+        never returns
+        """
+        queue: asyncio.Queue[Any] = asyncio.Queue()
+        consumer = asyncio.create_task(self.consume(queue))
+        try:
+            await self.produce(queue)
+        finally:
+            consumer.cancel()
+
+    async def produce(self, queue: asyncio.Queue[Any]) -> None:
+        """
+        Keep a subscription open, reconnecting whenever the connection
+        drops, and push the entries it receives into the queue
+        """
+        delay = 1.0
+        while True:
+            try:
+                async with connect(self.wsUri, max_size=None) as ws:
+                    await self.subscribe(ws, queue)
+                    delay = 1.0
+                    for heldMessage in self.heldMessages:
+                        self.handleMessage(heldMessage, queue)
+                    self.heldMessages.clear()
+                    async for message in ws:
+                        self.handleMessage(json.loads(message), queue)
+            except (
+                ConnectionClosed,
+                InvalidHandshake,
+                InvalidURI,
+                OSError,
+                ValueError,
+            ) as e:
+                self.logger.warning(
+                    f"SubscriptionWatcher: connection lost ({e}), reconnecting in {delay}s"
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.maxReconnectDelayInSeconds)
+
+    async def consume(self, queue: asyncio.Queue[Any]) -> None:
+        """
+        Pass the entries in the queue to the handlers, in a worker
+        thread so that the event loop is never blocked
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            entry = await queue.get()
+            try:
+                await loop.run_in_executor(None, self.handleLogEntry, entry)
+            except Exception as e:
+                self.logger.error(f"SubscriptionWatcher: error in handler: {e}")
+
+    async def subscribe(self, ws: Any, queue: asyncio.Queue[Any]) -> None:
+        """
+        Subscribe to the entries, then fetch those missed since the
+        last connection, if any
+        """
+        self.heldMessages.clear()
+        if self.isWatchingBlocks():
+            await self.request(ws, queue, "eth_subscribe", ["newHeads"])
+        else:
+            params = {
+                k: v
+                for (k, v) in dict(self.filterParams).items()  # type: ignore
+                if k in ["address", "topics"]
+            }
+            await self.request(ws, queue, "eth_subscribe", ["logs", params])
+
+        # The last synced block is fetched again: we may have received
+        # only some of its log entries, and the dedup drops the others
+        head = int(await self.request(ws, queue, "eth_blockNumber", []), 16)
+        if self.lastSyncedBlock is not None and head >= self.lastSyncedBlock:
+            await self.fillGap(ws, queue, self.lastSyncedBlock, head)
+        self.lastSyncedBlock = max(self.lastSyncedBlock or 0, head)
+        self.logger.debug("SubscriptionWatcher: subscribed")
+
+    async def fillGap(
+        self, ws: Any, queue: asyncio.Queue[Any], fromBlock: int, toBlock: int
+    ) -> None:
+        """
+        Push into the queue the entries of the given range of blocks
+        (inclusive), which were mined while we were not connected
+        """
+        self.logger.info(
+            f"SubscriptionWatcher: fetching blocks {fromBlock}-{toBlock} missed while disconnected"
+        )
+        if self.isWatchingBlocks():
+            fromBlock = max(fromBlock, toBlock - self.maxGapBlocks + 1)
+            for n in range(fromBlock, toBlock + 1):
+                block = await self.request(
+                    ws, queue, "eth_getBlockByNumber", [hex(n), False]
+                )
+                if block:
+                    self.enqueue(block_formatter(block), queue)
+            return
+        for start in range(fromBlock, toBlock + 1, self.maxBlocksPerGapRequest):
+            end = min(start + self.maxBlocksPerGapRequest - 1, toBlock)
+            params = dict(self.filterParams) | {  # type: ignore
+                "fromBlock": hex(start),
+                "toBlock": hex(end),
+            }
+            for log in await self.request(ws, queue, "eth_getLogs", [params]):
+                self.enqueue(log_entry_formatter(log), queue)
+
+    async def request(
+        self, ws: Any, queue: asyncio.Queue[Any], method: str, params: List[Any]
+    ) -> Any:
+        """
+        Send a JSON-RPC request over the websocket and return its
+        result; notifications received in the meantime are held, to be
+        handled after the missed entries
+        """
+        requestId = next(self.requestIds)
+        await ws.send(
+            json.dumps(
+                {"jsonrpc": "2.0", "id": requestId, "method": method, "params": params}
+            )
+        )
+        while True:
+            message = json.loads(await ws.recv())
+            if message.get("id") != requestId:
+                self.heldMessages.append(message)
+                continue
+            if "error" in message:
+                raise ValueError(message["error"])
+            return message["result"]
+
+    def handleMessage(self, message: dict[str, Any], queue: asyncio.Queue[Any]) -> None:
+        """
+        Push the entry of a subscription notification into the queue
+        """
+        if message.get("method") != "eth_subscription":
+            return
+        result = message["params"]["result"]
+        if self.isWatchingBlocks():
+            self.enqueue(block_formatter(result), queue)
+        else:
+            self.enqueue(log_entry_formatter(result), queue)
+
+    def enqueue(self, entry: Any, queue: asyncio.Queue[Any]) -> None:
+        """
+        Push the given entry into the queue, unless it was seen already,
+        and remember the last block seen
+        """
+        key = self.getEntryKey(entry)
+        if key in self.seenKeys:
+            return
+        self.seenKeys.add(key)
+        self.seenKeysOrder.append(key)
+        if len(self.seenKeysOrder) > self.dedupWindow:
+            self.seenKeys.discard(self.seenKeysOrder.popleft())
+        blockNumber = entry.get("number", entry.get("blockNumber"))
+        if blockNumber is not None:
+            self.lastSyncedBlock = max(self.lastSyncedBlock or 0, blockNumber)
+        queue.put_nowait(entry)
+
+    def isWatchingBlocks(self) -> bool:
+        return self.filterParams == "latest"
+
+    @staticmethod
+    def getEntryKey(entry: Any) -> Hashable:
+        """
+        Identify a block by its hash, and a log entry by its block hash
+        and index; removed log entries (after a reorg) count as new
+        """
+        if "logIndex" in entry:
+            return (entry["blockHash"], entry["logIndex"], entry.get("removed", False))
+        return entry["hash"]
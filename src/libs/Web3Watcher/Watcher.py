@@ -1,8 +1,9 @@
 from __future__ import annotations
-from typing import cast, Union, Any, Callable, List
+from typing import cast, Union, Any, Callable, List, Optional
 from logging import Logger
 
 from src.libs.Web3Client.Web3Client import Web3Client
+from src.libs.Web3Watcher.Dispatcher import Dispatcher
 from web3.types import FilterParams, LogReceipt
 from abc import ABC
 import logging
@@ -23,6 +24,10 @@ class Watcher(ABC):
     log entries; each time a log is found, it is passed to the handlers.
     The handlers are executed in the same order they are provided.
 
+    By default, the handlers run on the polling thread, so a slow
+    handler delays the next poll; to run them on a pool of threads
+    instead, set a Dispatcher with setDispatcher().
+
     Glossary: A log entry is an event submitted by a smart contract; for
     this reason, "log entry" will be used interchangeably with "event".
 
@@ -33,19 +38,18 @@ class Watcher(ABC):
     Docs: https://web3py.readthedocs.io/en/stable/filters.html
     """
 
-    # Settable
-    logger: Logger = logging  # type: ignore
-    filterParams: Union[FilterParams, BlockParams] = {}
-    handlers: List[Callable[[LogReceipt], None]] = []
-    notFoundHandlers: List[Callable[[], None]] = []
-
-    # Derived
-    filter: Any = None
-
     def __init__(self, client: Web3Client, doAsync: bool = False) -> None:
         self.client = client
         self.doAsync = doAsync
-        pass
+        # Settable
+        self.logger: Logger = logging  # type: ignore
+        self.filterParams: Union[FilterParams, BlockParams] = {}
+        self.handlers: List[Callable[[LogReceipt], None]] = []
+        self.notFoundHandlers: List[Callable[[], None]] = []
+        self.pollHandlers: List[Callable[[], None]] = []
+        self.dispatcher: Optional[Dispatcher] = None
+        # Derived
+        self.filter: Any = None
 
     def addHandler(self, handler: Callable[[LogReceipt], None]) -> Watcher:
         """
@@ -63,6 +67,15 @@ class Watcher(ABC):
         self.notFoundHandlers.append(notFoundHandler)
         return self
 
+    def addPollHandler(self, pollHandler: Callable[[], None]) -> Watcher:
+        """
+        Add a handler to the 'poll' queue; all handlers will be executed
+        after each poll, whether or not log entries were found, in the
+        order they were added.
+        """
+        self.pollHandlers.append(pollHandler)
+        return self
+
     def setFilterParams(self, params: Union[FilterParams, BlockParams]) -> Watcher:
         """
         Given valid filter parameters, create and set the filter to
@@ -76,46 +89,78 @@ class Watcher(ABC):
         """
         Set the filter to use to sieve the blockchain logs.
         """
-        self.filter: Any = filter
+        self.filter = filter
         return self
 
     def setLogger(self, logger: Logger) -> Watcher:
         self.logger = logger
         return self
 
+    def setDispatcher(self, dispatcher: Dispatcher) -> Watcher:
+        """
+        Run the handlers on the given dispatcher, rather than on the
+        polling thread; the handlers of a log entry still run in the
+        order they were added
+        """
+        self.dispatcher = dispatcher
+        return self
+
     def loop(self, filter: Any, pollInterval: float) -> None:
         """
         Infinite loop where we look for new log entries and fire
         the handlers to process them
         """
         while True:
-            newLogs = cast(List[LogReceipt], filter.get_new_entries())
+            newLogs = self.getNewEntries(filter)
             if not newLogs:
                 self.logger.debug("Watcher: No new log entry found")
                 self.handleNotFound()
             for logEntry in newLogs:
                 self.logger.debug("Watcher: New log entry!")
                 self.handleLogEntry(logEntry)
+            self.handlePoll()
             time.sleep(pollInterval)
 
     async def asyncLoop(self, filter: Any, pollInterval: float) -> None:
         """
         Infinite loop where we look for new log entries and fire
-        the handlers asynchronously to process them
+        the handlers asynchronously to process them.
+
+        The filter is polled in a worker thread, so that the blocking
+        HTTP request does not stall the event loop; for push-based
+        watching, see SubscriptionWatcher.
         """
+        loop = asyncio.get_running_loop()
         while True:
-            newLogs = cast(List[LogReceipt], filter.get_new_entries())
+            newLogs = await loop.run_in_executor(None, self.getNewEntries, filter)
             if not newLogs:
                 self.logger.debug("Watcher: No new log entry found")
                 self.handleNotFound()
             for logEntry in newLogs:
                 self.logger.debug("Watcher: New log entry!")
-                self.handleLogEntry(logEntry)
+                await loop.run_in_executor(None, self.handleLogEntry, logEntry)
+            self.handlePoll()
             await asyncio.sleep(pollInterval)
 
+    def getNewEntries(self, filter: Any) -> List[LogReceipt]:
+        """
+        Poll the filter for the log entries found since the last poll
+        """
+        return cast(List[LogReceipt], filter.get_new_entries())
+
     def handleLogEntry(self, logEntry: LogReceipt) -> None:
         """
         Given a log entry, run all handlers in the order they
+        were added, either right away or on the dispatcher, if any
+        """
+        if self.dispatcher:
+            self.dispatcher.submit(logEntry, self.runHandlers)
+        else:
+            self.runHandlers(logEntry)
+
+    def runHandlers(self, logEntry: LogReceipt) -> None:
+        """
+        Run all handlers on the given log entry, in the order they
         were added
         """
         for handler in self.handlers:
@@ -128,17 +173,18 @@ class Watcher(ABC):
         for notFoundHandler in self.notFoundHandlers:
             notFoundHandler()
 
+    def handlePoll(self) -> None:
+        """
+        What to do after each poll
+        """
+        for pollHandler in self.pollHandlers:
+            pollHandler()
+
     def run(self, pollInterval: float) -> None:
         """
         Start watching for log entries
         """
         if self.doAsync:
-            loop = asyncio.get_event_loop()
-            try:
-                loop.run_until_complete(
-                    asyncio.gather(self.asyncLoop(self.filter, pollInterval))
-                )
-            finally:
-                loop.close()
+            asyncio.run(self.asyncLoop(self.filter, pollInterval))
         else:
             self.loop(self.filter, pollInterval)
@@ -0,0 +1,38 @@
+from threading import Lock
+from time import perf_counter, sleep
+from typing import Tuple
+from src.libs.Web3Watcher.Dispatcher import Dispatcher
+
+# VARS
+handled: dict[str, list[int]] = {}
+lock = Lock()
+
+
+def handle(item: Tuple[str, int]) -> None:
+    (gameId, n) = item
+    sleep(0.1)  # a slow handler
+    with lock:
+        handled.setdefault(gameId, []).append(n)
+
+
+dispatcher = Dispatcher(maxWorkers=3, maxInflight=6, keyOf=lambda item: item[0])
+
+# TEST FUNCTIONS
+def test() -> None:
+    print(">>> SUBMIT 5 EVENTS FOR EACH OF 3 GAMES, MAX 6 IN FLIGHT")
+    start = perf_counter()
+    for n in range(5):
+        for gameId in ["A", "B", "C"]:
+            dispatcher.submit((gameId, n), handle)
+    print(f"Submitted in {perf_counter() - start:.3f}s (blocked when full)")
+    print(dispatcher.getMetrics())
+    dispatcher.join()
+    print(
+        f">>> ALL HANDLED in {perf_counter() - start:.3f}s, in order within each game"
+    )
+    print(handled)
+    print(dispatcher.getMetrics())
+
+
+# EXECUTE
+test()
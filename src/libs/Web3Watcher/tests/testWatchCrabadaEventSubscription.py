@@ -0,0 +1,26 @@
+from src.libs.Web3Watcher.SubscriptionWatcher import SubscriptionWatcher
+from src.common.config import nodeUri, nodeWsUri
+from src.libs.CrabadaWeb3Client.CrabadaWeb3Client import CrabadaWeb3Client
+from src.libs.Web3Client.helpers.debug import pprintAttributeDict
+from web3._utils.events import event_abi_to_log_topic
+from web3.types import FilterParams
+from eth_typing.encoding import HexStr
+from typing import Any, Dict, cast
+
+# VARS
+client = CrabadaWeb3Client(nodeUri=nodeUri)
+eventAbi = cast(Dict[str, Any], client.contract.events.StartGame._get_event_abi())
+filterParams: FilterParams = {
+    "address": client.contractAddress,
+    "topics": [HexStr(event_abi_to_log_topic(eventAbi).hex())],
+}
+
+# TEST FUNCTIONS
+def test() -> None:
+    watcher = SubscriptionWatcher(client, nodeWsUri).setFilterParams(filterParams)
+    watcher.addHandler(lambda log: pprintAttributeDict(log))
+    watcher.run()
+
+
+# EXECUTE
+test()
@@ -0,0 +1,38 @@
+"""
+Watch the StartGame, Fight and CloseGame events of the Crabada game
+contract, with one filter per event, polled together with the given
+polling interval (default: 2 seconds).
+"""
+from src.libs.Web3Watcher.MultiFilterWatcher import MultiFilterWatcher
+from src.common.config import nodeUri
+from src.libs.CrabadaWeb3Client.CrabadaWeb3Client import CrabadaWeb3Client
+from src.helpers.general import secondOrNone
+from src.libs.Web3Client.helpers.debug import pprintAttributeDict
+from web3._utils.events import event_abi_to_log_topic
+from eth_typing.encoding import HexStr
+from typing import Any, Dict, cast
+from sys import argv
+
+# VARS
+pollInterval = float(secondOrNone(argv) or 2)  # seconds
+client = CrabadaWeb3Client(nodeUri=nodeUri)
+events = ["StartGame", "Fight", "CloseGame"]
+
+# TEST FUNCTIONS
+def test() -> None:
+    watcher = MultiFilterWatcher(client)
+    for name in events:
+        eventAbi = cast(Dict[str, Any], client.contract.events[name]._get_event_abi())
+        watcher.addFilterParams(
+            {
+                "address": client.contractAddress,
+                "topics": [HexStr(event_abi_to_log_topic(eventAbi).hex())],
+            }
+        )
+    watcher.addHandler(lambda log: pprintAttributeDict(log))
+    watcher.addNotFoundHandler(lambda: print("No event found"))
+    watcher.run(pollInterval)
+
+
+# EXECUTE
+test()
@@ -1,5 +1,5 @@
 from typing import Any, List
-from src.libs.CrabadaWeb2Client.types import Game
+from src.libs.CrabadaWeb2Client.types import CrabForLending, Game
 from src.strategies.reinforce.ReinforceStrategy import ReinforceStrategy
 
 
@@ -8,9 +8,13 @@ class CheapestCrab(ReinforceStrategy):
     Strategy that always chooses the cheapest crab for reinforcements
     """
 
+    usesTavernBook = True
+
     def query(self, game: Game) -> dict[str, Any]:
-        return {
-            "limit": 1,
-            "orderBy": "price",
-            "order": "asc",
-        }
+        """
+        No need to query the tavern, we use the tavern book
+        """
+        return None
+
+    def process(self, game: Game, crabs: List[CrabForLending]) -> List[CrabForLending]:
+        return self.getTavernBook().listBy("price", limit=1)
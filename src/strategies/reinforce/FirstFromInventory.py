@@ -1,6 +1,7 @@
 from typing import Any, List
 from src.helpers.reinforce import convertCrabFromInventory
-from src.libs.CrabadaWeb2Client.types import CrabForLending, Game
+from src.libs.CrabadaWeb2Client.AsyncCrabadaWeb2Client import AsyncCrabadaWeb2Client
+from src.libs.CrabadaWeb2Client.types import CrabForLending, CrabFromInventory, Game
 from src.strategies.reinforce.ReinforceStrategy import ReinforceStrategy
 
 
@@ -9,6 +10,12 @@ class FirstFromInventory(ReinforceStrategy):
     If Inventory Crab is available, reinforce with it.
     """
 
+    prefetchedInventory: List[CrabFromInventory] = None
+    """
+    Crabs in the inventory, fetched by asyncPrefetch() for the next
+    call of process()
+    """
+
     def query(self, game: Game) -> dict[str, Any]:
         """
         No need to query the tavern
@@ -21,9 +28,20 @@ class FirstFromInventory(ReinforceStrategy):
         well; we can replace it with our custom ultimate-crab-getting-logic
         """
 
-        inventoryCrabs = self.web2Client.listCrabsFromInventory(self.user.address)
+        inventoryCrabs = self.prefetchedInventory
+        self.prefetchedInventory = None
+        if inventoryCrabs is None:
+            inventoryCrabs = self.web2Client.listCrabsFromInventory(self.user.address)
         crabs = [convertCrabFromInventory(c) for c in inventoryCrabs]
 
         crabs = super().process(game, crabs)
         
         return crabs
+
+    async def asyncPrefetch(self, client: AsyncCrabadaWeb2Client) -> None:
+        """
+        Fetch the inventory with the given client, rather than in
+        process(), so that the event loop is not blocked
+        """
+        address = self.user.address
+        self.prefetchedInventory = await client.listCrabsFromInventory(address)
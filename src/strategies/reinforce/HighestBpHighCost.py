@@ -1,21 +1,13 @@
-from typing import Any
-from src.libs.CrabadaWeb2Client.types import Game
 from src.strategies.reinforce.HighestBp import HighestBp
 
 
 class HighestBpHighCost(HighestBp):
     """
-    Fetch the highest-BP crabs in the tavern, then pick the
-    cheapest one that costs less than maxPrice.
+    Pick the highest-BP crab that costs less than maxPrice, among
+    the highest-BP crabs in the tavern; among crabs with the same
+    BP, pick the cheapest.
 
-    If the reinforcementToPick mechanism is active, it avoids
-    choosing highly requested crabs that could result in failed
-    txs.
+    Since the tavern book already includes the highest-BP crabs in
+    the tavern, this is now the same as HighestBp; the strategy is
+    kept so that existing configurations keep working.
     """
-
-    def query(self, game: Game) -> dict[str, Any]:
-        return {
-            "limit": 100,
-            "orderBy": "battle_point",
-            "order": "desc",
-        }
@@ -2,31 +2,38 @@ from typing import Any, List
 from src.libs.CrabadaWeb2Client.types import CrabForLending, Game
 from src.strategies.reinforce.ReinforceStrategy import ReinforceStrategy
 from src.helpers.general import nthOrLastOrNone
-from src.helpers.price import weiToTus
+from src.helpers.price import tusToWei
 
 
 class HighestMp(ReinforceStrategy):
     """
-    Fetch the cheapest crabs in the tavern, then pick the one
-    with the highest MP that costs less than maxPrice.
+    Look in the tavern book for the crabs that cost less than
+    maxPrice, then pick the one with the highest MP.
 
     If the reinforcementToPick mechanism is active, it avoids
     choosing highly requested crabs that could result in failed
     txs.
     """
 
+    usesTavernBook = True
+
     def query(self, game: Game) -> dict[str, Any]:
-        return {
-            "limit": 100,
-            "orderBy": "price",
-            "order": "asc",
-        }
+        """
+        No need to query the tavern, we use the tavern book
+        """
+        return None
 
     def process(self, game: Game, crabs: List[CrabForLending]) -> List[CrabForLending]:
+        """
+        Return the affordable crabs with the highest MP, as many as
+        needed by pick(); among crabs with the same MP, the cheapest
+        come first
+        """
+        n = self.teamConfig["reinforcementToPick"]
+        book = self.getTavernBook()
+        crabs = book.listBy("mine_point", tusToWei(self.maxPrice1), limit=n)
         crabs = super().process(game, crabs)
-
-        affordableCrabs = [c for c in crabs if weiToTus(c["price"]) < self.maxPrice1]
-        return sorted(affordableCrabs, key=lambda c: (-c["mine_point"], c["price"]))
+        return sorted(crabs, key=lambda c: (-c["mine_point"], c["price"]))
 
     def pick(self, game: Game, crabs: List[CrabForLending]) -> CrabForLending:
         """
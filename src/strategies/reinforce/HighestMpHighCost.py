@@ -1,21 +1,34 @@
-from typing import Any
-from src.libs.CrabadaWeb2Client.types import Game
+from typing import Any, List
+from src.helpers.price import weiToTus
+from src.libs.CrabadaWeb2Client.types import CrabForLending, Game
 from src.strategies.reinforce.HighestMp import HighestMp
+from src.strategies.reinforce.ReinforceStrategy import ReinforceStrategy
 
 
 class HighestMpHighCost(HighestMp):
     """
-    Fetch the highest-MP crabs in the tavern, then pick the
-    cheapest one that costs less than maxPrice.
+    Fetch the crabs in the tavern with the highest time points, then
+    pick the one with the highest MP that costs less than maxPrice.
+
+    The tavern book does not index time points, so this strategy
+    queries the tavern itself.
 
     If the reinforcementToPick mechanism is active, it avoids
     choosing highly requested crabs that could result in failed
     txs.
     """
 
+    usesTavernBook = False
+
     def query(self, game: Game) -> dict[str, Any]:
         return {
             "limit": 100,
             "orderBy": "time_point",
             "order": "desc",
         }
+
+    def process(self, game: Game, crabs: List[CrabForLending]) -> List[CrabForLending]:
+        crabs = ReinforceStrategy.process(self, game, crabs)
+
+        affordableCrabs = [c for c in crabs if weiToTus(c["price"]) < self.maxPrice1]
+        return sorted(affordableCrabs, key=lambda c: (-c["mine_point"], c["price"]))
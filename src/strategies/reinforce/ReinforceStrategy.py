@@ -1,7 +1,7 @@
 from __future__ import annotations
 from abc import abstractmethod
 from src.common.logger import logger
-from typing import Any, List, Tuple, cast
+from typing import Any, List, Literal, Tuple, cast
 from src.common.exceptions import (
     ReinforcementTooExpensive,
     NoSuitableReinforcementFound,
@@ -16,7 +16,15 @@ from src.helpers.reinforce import (
     looterCanReinforce,
     minerCanReinforce,
 )
+from src.helpers.tavern import (
+    asyncGetTavernBook,
+    getTavernBook,
+    pinTavernBook,
+    removeFromTavernBook,
+)
 from src.strategies.Strategy import Strategy
+from src.libs.CrabadaWeb2Client.AsyncCrabadaWeb2Client import AsyncCrabadaWeb2Client
+from src.libs.CrabadaWeb2Client.TavernBook import TavernBook
 from src.libs.CrabadaWeb2Client.types import CrabForLending, Game, TeamStatus
 
 
@@ -38,6 +46,12 @@ class ReinforceStrategy(Strategy):
     If needed, you can also call getCrab1() and getCrab2() which will
     always return a crab regardless of the status of the mine.
 
+    Strategies that pick from the tavern can skip the query altogether
+    (by returning None from query()) and instead look for crabs in the
+    shared tavern book, via getTavernBook(); such strategies set
+    usesTavernBook, so that the async methods fetch the book without
+    blocking the event loop.
+
     Attributes
     ----------
     game: Game
@@ -47,10 +61,60 @@ class ReinforceStrategy(Strategy):
 
     _BAD_CRABS = set()
 
+    reservedCrabs: set[int] = set()
+    """
+    Crabs assigned to a game in the current run, see reserveCrab()
+    """
+
+    usesTavernBook: bool = False
+    """
+    Whether process() looks for crabs in the tavern book, see
+    asyncPrefetch()
+    """
+
     @staticmethod
     def mark_crab_bad(crab):
         ReinforceStrategy._BAD_CRABS.add(crab['crabada_id'])
+        removeFromTavernBook(crab)
 
+    @staticmethod
+    def reserveCrab(crab: CrabForLending) -> None:
+        """
+        Prevent strategies from picking the given crab, because
+        it was already assigned to another game; the reservation
+        lasts until releaseReservedCrabs() is called
+        """
+        ReinforceStrategy.reservedCrabs.add(crab["crabada_id"])
+        removeFromTavernBook(crab)
+
+    @staticmethod
+    def releaseReservedCrabs() -> None:
+        """
+        Make the reserved crabs available again, e.g. at the start of
+        a new run, when the crabs that were not borrowed in the
+        previous one may be back in the tavern
+        """
+        ReinforceStrategy.reservedCrabs.clear()
+
+    @staticmethod
+    def isCrabAvailable(crab: CrabForLending) -> bool:
+        """
+        Whether the crab is neither bad nor already reserved
+        """
+        return (
+            crab["crabada_id"] not in ReinforceStrategy._BAD_CRABS
+            and crab["crabada_id"] not in ReinforceStrategy.reservedCrabs
+        )
+
+    def getTavernBook(self) -> TavernBook:
+        """
+        Return the shared book of the crabs available in the tavern,
+        without the bad crabs and the reserved ones
+        """
+        book = getTavernBook()
+        book.removeCrabs(ReinforceStrategy._BAD_CRABS)
+        book.removeCrabs(ReinforceStrategy.reservedCrabs)
+        return book
 
     def setParams(self, game: Game, maxPrice: Tus, maxPrice2: Tus = None) -> Strategy:
         """
@@ -82,11 +146,12 @@ class ReinforceStrategy(Strategy):
         A typical processing is to sort the list by price or stats,
         or filter it according to some criterion.
 
-        By default, return the list unchanged except for the bad crabs.
+        By default, return the list unchanged except for the bad crabs
+        and the reserved ones.
         """
         if crabs is not None:
             print(f'Before bad crabs: {len(crabs)}')
-            crabs = [crab for crab in crabs if crab['crabada_id'] not in ReinforceStrategy._BAD_CRABS]
+            crabs = [crab for crab in crabs if ReinforceStrategy.isCrabAvailable(crab)]
             print(f'After bad crabs: {len(crabs)}')
 
         return crabs
@@ -129,14 +194,7 @@ class ReinforceStrategy(Strategy):
         status, and it returns None if the game cannot be reinforced.
         """
 
-        if lootingOrMining == "LOOTING":
-            status = getLooterReinforcementStatus(self.game)
-        elif lootingOrMining == "MINING":
-            status = getMinerReinforcementStatus(self.game)
-        else:
-            raise StrategyException(
-                f"Team is neither LOOTING nor MINING, [value passed={lootingOrMining}]"
-            )
+        status = self.getReinforcementStatus(lootingOrMining)
 
         if status == 0:  # mine cannot be reinforced
             return None
@@ -145,6 +203,48 @@ class ReinforceStrategy(Strategy):
         elif status == 2:  # second reinforcement
             return self.getCrab2()
 
+    async def asyncGetCrab(
+        self, lootingOrMining: TeamStatus, client: AsyncCrabadaWeb2Client
+    ) -> CrabForLending:
+        """
+        Same as getCrab(), but the tavern is queried asynchronously
+        with the given client, so that the reinforcements of several
+        games can be searched concurrently.
+        """
+        status = self.getReinforcementStatus(lootingOrMining)
+
+        if status == 0:  # mine cannot be reinforced
+            return None
+        elif status == 1:  # first reinforcement
+            return await self.asyncGetCrab1(client)
+        elif status == 2:  # second reinforcement
+            return await self.asyncGetCrab2(client)
+
+    async def asyncPrefetch(self, client: AsyncCrabadaWeb2Client) -> None:
+        """
+        Fetch with the given client whatever process() needs besides
+        the crabs returned by query(), so that the async methods do not
+        block the event loop with HTTP calls.
+
+        By default, bring the tavern book up to date, if the strategy
+        uses it; the book is then pinned while the crab is chosen.
+        """
+        if self.usesTavernBook:
+            await asyncGetTavernBook(client)
+
+    def getReinforcementStatus(self, lootingOrMining: TeamStatus) -> Literal[0, 1, 2]:
+        """
+        Return which reinforcement (0 = none, 1 = first, 2 = second)
+        the team can make in the game
+        """
+        if lootingOrMining == "LOOTING":
+            return getLooterReinforcementStatus(self.game)
+        elif lootingOrMining == "MINING":
+            return getMinerReinforcementStatus(self.game)
+        raise StrategyException(
+            f"Team is neither LOOTING nor MINING, [value passed={lootingOrMining}]"
+        )
+
     def handleNoSuitableCrabFound(self) -> None:
         """
         By default, log a message if the strategy is unable to find
@@ -173,6 +273,24 @@ class ReinforceStrategy(Strategy):
         # Get the list of borrowable reinforcements from Crabada
         crabs = self.web2Client.listCrabsForLending(query) if query is not None else []
 
+        return self.chooseCrab1(crabs)
+
+    async def asyncGetCrab1(self, client: AsyncCrabadaWeb2Client) -> CrabForLending:
+        """
+        Same as getCrab1(), but fetches the list of borrowable
+        reinforcements asynchronously with the given client
+        """
+        query = self.query(self.game)
+        crabs = await client.listCrabsForLending(query) if query is not None else []
+        await self.asyncPrefetch(client)
+        with pinTavernBook():
+            return self.chooseCrab1(crabs)
+
+    def chooseCrab1(self, crabs: List[CrabForLending]) -> CrabForLending:
+        """
+        Given the borrowable reinforcements fetched with query(),
+        return the crab chosen by process() and pick()
+        """
         # Process the list of crabs
         processedCrabs = self.process(self.game, crabs)
 
@@ -199,6 +317,24 @@ class ReinforceStrategy(Strategy):
         # Get the list of borrowable reinforcements from Crabada
         crabs = self.web2Client.listCrabsForLending(query) if query is not None else []
 
+        return self.chooseCrab2(crabs)
+
+    async def asyncGetCrab2(self, client: AsyncCrabadaWeb2Client) -> CrabForLending:
+        """
+        Same as getCrab2(), but fetches the list of borrowable
+        reinforcements asynchronously with the given client
+        """
+        query = self.query2(self.game)
+        crabs = await client.listCrabsForLending(query) if query is not None else []
+        await self.asyncPrefetch(client)
+        with pinTavernBook():
+            return self.chooseCrab2(crabs)
+
+    def chooseCrab2(self, crabs: List[CrabForLending]) -> CrabForLending:
+        """
+        Given the borrowable reinforcements fetched with query2(),
+        return the crab chosen by process2() and pick2()
+        """
         # Process the list of crabs
         processedCrabs = self.process2(self.game, crabs)
 
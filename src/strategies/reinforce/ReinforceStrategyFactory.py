@@ -6,6 +6,7 @@ Also provides utility function to easily return products of
 strategies (mine, crab, etc) without having to type boilerplate.
 """
 
+from typing import List, Tuple
 from src.common.logger import logger
 from src.common.exceptions import (
     NoSuitableReinforcementFound,
@@ -14,6 +15,8 @@ from src.common.exceptions import (
 )
 from src.common.clients import makeCrabadaWeb2Client
 from src.common.types import ConfigTeam, Tus
+from src.helpers.mines import getLastAction
+from src.helpers.tavern import pinTavernBook
 from src.libs.CrabadaWeb2Client.types import CrabForLending, Game, Team, TeamStatus
 from src.strategies.reinforce.HighestBp import HighestBp
 from src.strategies.reinforce.HighestBpFromInventory import HighestBpFromInventory
@@ -94,6 +97,47 @@ def getBestReinforcement(
     )
 
 
+def planReinforcements(
+    user: User, mines: List[Game], maxPrice: Tus
+) -> List[Tuple[Game, CrabForLending]]:
+    """
+    Find the crabs to borrow for all of the given reinforceable games
+    in one go, and return them paired with their game.
+
+    Games are considered by urgency: the ones that have been waiting
+    longer for a reinforcement choose first. Each game follows the
+    strategies of its team, but the crabs chosen for the previous games
+    are reserved and thus skipped, so that no crab is assigned twice and
+    all of the reinforcements can be borrowed right away.
+
+    Games for which no suitable crab is found are left out of the plan.
+
+    The reservations of the previous plan are released first, so that
+    they only last for one run (the plan and the retries that follow).
+
+    The tavern book is fetched at most once for the whole plan,
+    whatever TAVERN_CACHE_TTL_IN_SECONDS.
+    """
+    ReinforceStrategy.releaseReservedCrabs()
+    plan: List[Tuple[Game, CrabForLending]] = []
+    with pinTavernBook():
+        for mine in sorted(mines, key=lambda m: getLastAction(m)["transaction_time"]):
+            try:
+                crab = getBestReinforcement(user, mine, maxPrice)
+            except NoSuitableReinforcementFound as e:
+                logger.warning(f"{e.__class__.__name__}: {e}")
+                continue
+
+            # Some strategies might return no reinforcement
+            if not crab:
+                continue
+
+            ReinforceStrategy.reserveCrab(crab)
+            plan.append((mine, crab))
+
+    return plan
+
+
 def makeReinforceStrategy(
     strategyName: str, user: User, teamConfig: ConfigTeam, mine: Game, maxPrice: Tus
 ) -> ReinforceStrategy:
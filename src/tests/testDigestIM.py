@@ -0,0 +1,18 @@
+from src.helpers.instantMessage import digestIM, dispatcher, sendIM
+
+# VARS
+title = "Avengers assembled"
+
+# TEST FUNCTIONS
+def test() -> None:
+    print(">>> TWO MESSAGES IN A DIGEST, PLUS AN URGENT ONE SENT RIGHT AWAY")
+    with digestIM(title):
+        sendIM("Iron Man joined", forceSend=True)
+        sendIM("Thor is late", forceSend=True, urgent=True)
+        sendIM("Hulk joined", forceSend=True)
+    print(">>> FLUSHED?")
+    print(dispatcher.flush(10))
+
+
+# EXECUTE
+test()
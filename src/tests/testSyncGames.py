@@ -0,0 +1,26 @@
+from sys import argv
+from src.common.clients import makeGameStore
+from src.helpers.general import secondOrNone
+from src.helpers.store import syncAvailableTeams, syncGames
+from src.models.User import User
+
+# VARS
+userNumber = int(secondOrNone(argv) or 1)
+
+# TEST FUNCTIONS
+def test() -> None:
+    user = User.find(userNumber)
+    syncGames(user, force=True)
+    syncAvailableTeams(user, force=True)
+    teamIds = [t["id"] for t in user.getTeams()]
+    store = makeGameStore()
+    print(">>> OPEN MINES")
+    print(store.listOpenGamesOfTeams(teamIds, "team_id"))
+    print(">>> OPEN LOOTS")
+    print(store.listOpenGamesOfTeams(teamIds, "attack_team_id"))
+    print(">>> AVAILABLE TEAMS")
+    print(store.listAvailableTeams(teamIds))
+
+
+# EXECUTE
+test()